@@ -0,0 +1,104 @@
+"""notify workers of changes to tournaments
+
+Revision ID: 3b8f1c2d9e47
+Revises: 75ab09c41db1
+Create Date: 2026-10-18 21:04:51.126540
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = "3b8f1c2d9e47"
+down_revision: str | None = "75ab09c41db1"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+TABLES = (
+    "tournaments",
+    "stages",
+    "stage_items",
+    "stage_item_inputs",
+    "rounds",
+    "matches",
+    "teams",
+    "players",
+    "courts",
+    "rankings",
+)
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_tournament_change() RETURNS trigger AS $$
+        DECLARE
+            changed_rows_query text;
+            changed record;
+        BEGIN
+            IF TG_TABLE_NAME = 'tournaments' THEN
+                changed_rows_query := 'SELECT id AS tournament_id, id FROM changed_rows';
+            ELSIF TG_TABLE_NAME = 'stage_items' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stages ON stages.id = changed_rows.stage_id';
+            ELSIF TG_TABLE_NAME = 'rounds' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stage_items ON stage_items.id = changed_rows.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSIF TG_TABLE_NAME = 'matches' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN rounds ON rounds.id = changed_rows.round_id
+                    JOIN stage_items ON stage_items.id = rounds.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSE
+                changed_rows_query := 'SELECT tournament_id, id FROM changed_rows';
+            END IF;
+
+            FOR changed IN EXECUTE
+                'SELECT tournament_id, array_agg(id ORDER BY id) AS ids
+                FROM (' || changed_rows_query || ') changed_rows_with_tournament
+                WHERE tournament_id IS NOT NULL
+                GROUP BY tournament_id
+                ORDER BY tournament_id'
+            LOOP
+                PERFORM pg_notify(
+                    'tournament_changes',
+                    json_build_object(
+                        'tournament_id', changed.tournament_id,
+                        'entity', TG_TABLE_NAME,
+                        'origin', current_setting('application_name')
+                    )::text
+                );
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    for table in TABLES:
+        for operation in OPERATIONS:
+            op.execute(
+                f"""
+                CREATE TRIGGER {table}_notify_tournament_change_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {"OLD" if operation == "DELETE" else "NEW"} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_tournament_change();
+                """
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for operation in OPERATIONS:
+            op.execute(
+                f"DROP TRIGGER {table}_notify_tournament_change_{operation.lower()} ON {table}"
+            )
+
+    op.execute("DROP FUNCTION notify_tournament_change")
@@ -0,0 +1,25 @@
+"""add indices on rounds.stage_item_id and matches.round_id
+
+Revision ID: 75ab09c41db1
+Revises: c1ab44651e79
+Create Date: 2026-10-18 19:30:12.512345
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = "75ab09c41db1"
+down_revision: str | None = "c1ab44651e79"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_rounds_stage_item_id"), "rounds", ["stage_item_id"], unique=False)
+    op.create_index(op.f("ix_matches_round_id"), "matches", ["round_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_matches_round_id"), table_name="matches")
+    op.drop_index(op.f("ix_rounds_stage_item_id"), table_name="rounds")
@@ -0,0 +1,155 @@
+"""add tournament_changes table
+
+Revision ID: 9c4e7a1f5b20
+Revises: 3b8f1c2d9e47
+Create Date: 2026-10-18 22:17:36.482913
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = "9c4e7a1f5b20"
+down_revision: str | None = "3b8f1c2d9e47"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tournament_changes",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("tournament_id", sa.BigInteger(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_tournament_changes_created"), "tournament_changes", ["created"], unique=False
+    )
+    op.create_index(
+        "ix_tournament_changes_tournament_id_id",
+        "tournament_changes",
+        ["tournament_id", "id"],
+        unique=False,
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_tournament_change() RETURNS trigger AS $$
+        DECLARE
+            changed_rows_query text;
+            changed record;
+        BEGIN
+            IF TG_TABLE_NAME = 'tournaments' THEN
+                changed_rows_query := 'SELECT id AS tournament_id, id FROM changed_rows';
+            ELSIF TG_TABLE_NAME = 'stage_items' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stages ON stages.id = changed_rows.stage_id';
+            ELSIF TG_TABLE_NAME = 'rounds' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stage_items ON stage_items.id = changed_rows.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSIF TG_TABLE_NAME = 'matches' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN rounds ON rounds.id = changed_rows.round_id
+                    JOIN stage_items ON stage_items.id = rounds.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSE
+                changed_rows_query := 'SELECT tournament_id, id FROM changed_rows';
+            END IF;
+
+            FOR changed IN EXECUTE
+                'SELECT tournament_id, array_agg(id ORDER BY id) AS ids
+                FROM (' || changed_rows_query || ') changed_rows_with_tournament
+                WHERE tournament_id IS NOT NULL
+                GROUP BY tournament_id
+                ORDER BY tournament_id'
+            LOOP
+                -- The first key is AdvisoryLockNamespace.TOURNAMENT_CHANGES.
+                PERFORM pg_advisory_xact_lock(1, changed.tournament_id::int);
+                INSERT INTO tournament_changes (tournament_id, entity, entity_id)
+                SELECT changed.tournament_id, TG_TABLE_NAME, unnest(changed.ids);
+
+                PERFORM pg_notify(
+                    'tournament_changes',
+                    json_build_object(
+                        'tournament_id', changed.tournament_id,
+                        'entity', TG_TABLE_NAME,
+                        'origin', current_setting('application_name')
+                    )::text
+                );
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_tournament_change() RETURNS trigger AS $$
+        DECLARE
+            changed_rows_query text;
+            changed record;
+        BEGIN
+            IF TG_TABLE_NAME = 'tournaments' THEN
+                changed_rows_query := 'SELECT id AS tournament_id, id FROM changed_rows';
+            ELSIF TG_TABLE_NAME = 'stage_items' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stages ON stages.id = changed_rows.stage_id';
+            ELSIF TG_TABLE_NAME = 'rounds' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN stage_items ON stage_items.id = changed_rows.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSIF TG_TABLE_NAME = 'matches' THEN
+                changed_rows_query := '
+                    SELECT stages.tournament_id, changed_rows.id
+                    FROM changed_rows
+                    JOIN rounds ON rounds.id = changed_rows.round_id
+                    JOIN stage_items ON stage_items.id = rounds.stage_item_id
+                    JOIN stages ON stages.id = stage_items.stage_id';
+            ELSE
+                changed_rows_query := 'SELECT tournament_id, id FROM changed_rows';
+            END IF;
+
+            FOR changed IN EXECUTE
+                'SELECT tournament_id, array_agg(id ORDER BY id) AS ids
+                FROM (' || changed_rows_query || ') changed_rows_with_tournament
+                WHERE tournament_id IS NOT NULL
+                GROUP BY tournament_id
+                ORDER BY tournament_id'
+            LOOP
+                PERFORM pg_notify(
+                    'tournament_changes',
+                    json_build_object(
+                        'tournament_id', changed.tournament_id,
+                        'entity', TG_TABLE_NAME,
+                        'origin', current_setting('application_name')
+                    )::text
+                );
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.drop_index("ix_tournament_changes_tournament_id_id", table_name="tournament_changes")
+    op.drop_index(op.f("ix_tournament_changes_created"), table_name="tournament_changes")
+    op.drop_table("tournament_changes")
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse
+from starlette import status
 from starlette.exceptions import HTTPException
 from starlette.middleware.base import RequestResponseEndpoint
 from starlette.middleware.cors import CORSMiddleware
@@ -15,6 +16,7 @@ from starlette.staticfiles import StaticFiles
 from bracket.config import Environment, config, environment, init_sentry
 from bracket.cronjobs.scheduling import start_cronjobs
 from bracket.database import database
+from bracket.logic.events import TOURNAMENT_EVENTS_CHANNEL, handle_tournament_event
 from bracket.models.metrics import RequestDefinition, get_request_metrics
 from bracket.routes import (
     auth,
@@ -32,10 +34,14 @@ from bracket.routes import (
     tournaments,
     users,
 )
+from bracket.schema import TOURNAMENT_CHANGES_CHANNEL
+from bracket.sql.cache import handle_tournament_change, invalidate_all_tournaments
 from bracket.utils.alembic import alembic_run_migrations
 from bracket.utils.asyncio import AsyncioTasksManager
 from bracket.utils.db_init import init_db_when_empty
 from bracket.utils.logging import logger
+from bracket.utils.notifications import notification_bus
+from bracket.utils.query_metrics import RequestQueries, current_request_queries, query_metrics
 
 init_sentry()
 
@@ -44,6 +50,13 @@ init_sentry()
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     await database.connect()
     await init_db_when_empty()
+    await notification_bus.connect(
+        {
+            TOURNAMENT_CHANGES_CHANNEL: handle_tournament_change,
+            TOURNAMENT_EVENTS_CHANNEL: handle_tournament_event,
+        },
+        on_reconnect=invalidate_all_tournaments,
+    )
 
     if config.auto_run_migrations and environment is not Environment.CI:
         alembic_run_migrations()
@@ -56,6 +69,7 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
 
     yield
 
+    await notification_bus.disconnect()
     if environment is not Environment.CI:
         await database.disconnect()
 
@@ -136,14 +150,27 @@ async def add_process_time_header(request: Request, call_next: RequestResponseEn
     start_time = time.time()
     request_metrics = get_request_metrics()
     request_metrics.request_count[RequestDefinition.from_request(request)] += 1
-    response = await call_next(request)
+    request_queries = RequestQueries()
+    token = current_request_queries.set(request_queries)
+    try:
+        response = await call_next(request)
+    finally:
+        current_request_queries.reset(token)
+
     process_time = time.time() - start_time
-    request_metrics.response_time[RequestDefinition.from_request(request)] = process_time
+    request_definition = RequestDefinition.from_request(request)
+    request_metrics.response_time[request_definition] = process_time
+    query_metrics.record_request(
+        request_definition.method.value, request_definition.url, request_queries
+    )
     return response
 
 
 @app.exception_handler(HTTPException)
-async def validation_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: HTTPException) -> Response:
+    if exc.status_code == status.HTTP_304_NOT_MODIFIED:
+        return Response(status_code=exc.status_code, headers=exc.headers)
+
     return JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
 
 
@@ -1,9 +1,11 @@
 import asyncio
 from collections.abc import Awaitable, Callable
 
-from heliclockter import timedelta
+from heliclockter import datetime_utc, timedelta
 
+from bracket.config import config
 from bracket.models.db.account import UserAccountType
+from bracket.sql.tournament_changes import sql_delete_tournament_changes_before
 from bracket.sql.users import delete_user_and_owned_clubs, get_expired_demo_users
 from bracket.utils.asyncio import AsyncioTasksManager
 from bracket.utils.logging import logger
@@ -25,6 +27,12 @@ async def delete_demo_accounts() -> None:
         await delete_user_and_owned_clubs(user_id)
 
 
+async def delete_old_tournament_changes() -> None:
+    await sql_delete_tournament_changes_before(
+        datetime_utc.now() - timedelta(days=config.tournament_changes_retention_days)
+    )
+
+
 async def run_cronjob(cronjob_entrypoint: CronjobT, delta_time: timedelta) -> None:
     while True:
         await asyncio.sleep(delta_time.total_seconds())
@@ -35,7 +43,10 @@ async def run_cronjob(cronjob_entrypoint: CronjobT, delta_time: timedelta) -> No
             logger.exception(f"Could not run cronjob {cronjob_entrypoint.__name__}: {e}")
 
 
-CRONJOBS = ((timedelta(minutes=5), delete_demo_accounts),)
+CRONJOBS = (
+    (timedelta(minutes=5), delete_demo_accounts),
+    (timedelta(hours=1), delete_old_tournament_changes),
+)
 
 
 def start_cronjobs() -> None:
@@ -1,27 +1,140 @@
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import sqlalchemy
 from databases import Database
-from heliclockter import datetime_utc
+from databases.backends.postgres import PostgresBackend, PostgresConnection
+from databases.interfaces import Record
+from heliclockter import datetime_utc, timedelta
+from sqlalchemy.sql import ClauseElement
 
 from bracket.config import config
+from bracket.utils.query_metrics import query_metrics
 
+# Identifies the connections of this worker, see `bracket/utils/notifications.py`.
+worker_application_name = f"bracket-{secrets.token_hex(4)}"
 
-def datetime_decoder(value: str) -> datetime_utc:
-    value = value.split(".")[0].replace("+00", "+00:00")
-    return datetime_utc.fromisoformat(value)
+POSTGRES_EPOCH = datetime_utc(2000, 1, 1, tzinfo=ZoneInfo("UTC"))
+
+
+def datetime_decoder(value: tuple[int]) -> datetime_utc:
+    """
+    Decodes the binary representation of a timestamp (microseconds since the Postgres epoch).
+    Microseconds are dropped, like in the textual representation that was used before.
+    """
+    return (POSTGRES_EPOCH + timedelta(microseconds=value[0])).replace(microsecond=0)
+
+
+def datetime_encoder(value: datetime_utc) -> tuple[int]:
+    return ((value - POSTGRES_EPOCH) // timedelta(microseconds=1),)
 
 
 async def asyncpg_init(connection: Any) -> None:
     for timestamp_type in ("timestamp", "timestamptz"):
         await connection.set_type_codec(
             timestamp_type,
-            encoder=datetime_utc.isoformat,
+            encoder=datetime_encoder,
             decoder=datetime_decoder,
             schema="pg_catalog",
+            format="tuple",
         )
 
 
-database = Database(str(config.pg_dsn), init=asyncpg_init)
+class PoolMetrics:
+    """
+    Keeps track of how often and how long requests wait for a connection of the pool, and of
+    how many connections of the pool are in use.
+    """
+
+    def __init__(self) -> None:
+        self.acquire_count = 0
+        self.acquire_wait_seconds = 0.0
+        self.pool: Any = None
+
+    @property
+    def size(self) -> int:
+        return self.pool.get_size() if self.pool is not None else 0
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self.pool.get_idle_size() if self.pool is not None else 0
+
+    @property
+    def utilisation(self) -> float:
+        return self.in_use / config.pg_pool_max_size
+
+
+pool_metrics = PoolMetrics()
+
+
+@contextmanager
+def measure_query(query: ClauseElement) -> Iterator[None]:
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        query_metrics.record_query(
+            getattr(query, "text", None) or str(query), time.perf_counter() - start_time
+        )
+
+
+class MeasuredPostgresConnection(PostgresConnection):
+    async def acquire(self) -> None:
+        start_time = time.perf_counter()
+        await super().acquire()
+        pool_metrics.acquire_wait_seconds += time.perf_counter() - start_time
+        pool_metrics.acquire_count += 1
+
+    async def fetch_all(self, query: ClauseElement) -> list[Record]:
+        with measure_query(query):
+            return await super().fetch_all(query)
+
+    async def fetch_one(self, query: ClauseElement) -> Record | None:
+        with measure_query(query):
+            return await super().fetch_one(query)
+
+    async def execute(self, query: ClauseElement) -> Any:
+        with measure_query(query):
+            return await super().execute(query)
+
+
+class MeasuredPostgresBackend(PostgresBackend):
+    async def connect(self) -> None:
+        await super().connect()
+        pool_metrics.pool = self._pool
+
+    async def disconnect(self) -> None:
+        pool_metrics.pool = None
+        await super().disconnect()
+
+    def connection(self) -> PostgresConnection:
+        return MeasuredPostgresConnection(self, self._dialect)
+
+
+class MeasuredDatabase(Database):
+    """
+    `databases.Database` on an asyncpg pool of which the time waiting for connections is measured.
+    """
+
+    SUPPORTED_BACKENDS = {
+        **Database.SUPPORTED_BACKENDS,
+        "postgresql": "bracket.database:MeasuredPostgresBackend",
+        "postgres": "bracket.database:MeasuredPostgresBackend",
+    }
+
+
+database = MeasuredDatabase(
+    str(config.pg_dsn),
+    init=asyncpg_init,
+    min_size=config.pg_pool_min_size,
+    max_size=config.pg_pool_max_size,
+    statement_cache_size=config.pg_statement_cache_size,
+    command_timeout=config.pg_command_timeout_seconds,
+    server_settings={"application_name": worker_application_name},
+)
 
 engine = sqlalchemy.create_engine(str(config.pg_dsn))
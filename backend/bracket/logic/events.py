@@ -0,0 +1,140 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import auto
+
+from pydantic import BaseModel
+
+from bracket.config import config
+from bracket.utils.id_types import TournamentId
+from bracket.utils.notifications import notification_bus
+from bracket.utils.types import EnumAutoStr, JsonDict
+
+TOURNAMENT_EVENTS_CHANNEL = "tournament_events"
+
+
+class TournamentEventType(EnumAutoStr):
+    MATCH_UPDATED = auto()
+    MATCHES_RESCHEDULED = auto()
+    ROUND_ACTIVATED = auto()
+    STAGE_ACTIVATED = auto()
+    # Sent to clients that couldn't keep up, which should fetch the whole tournament again.
+    RESYNC = auto()
+
+
+class TournamentEvent(BaseModel):
+    """
+    A change to a tournament, `ids` contains the ids of the changed matches, round or stage.
+
+    An empty list of ids means that the client should fetch all matches again.
+    """
+
+    type: TournamentEventType
+    tournament_id: TournamentId
+    ids: list[int] = []
+
+    def to_server_sent_event(self) -> str:
+        return f"event: {self.type.value}\ndata: {self.model_dump_json()}\n\n"
+
+
+class TournamentEventSubscriber:
+    """
+    A client listening for the events of a tournament, with a bounded queue of messages.
+
+    If the client reads slower than events are published, its queue is replaced by a single
+    resync event, so publishing never blocks and a slow client can't use unbounded memory.
+    """
+
+    def __init__(self, tournament_id: TournamentId) -> None:
+        self.tournament_id = tournament_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(config.event_queue_size)
+
+    def put(self, message: str) -> None:
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+            resync_event = TournamentEvent(
+                type=TournamentEventType.RESYNC, tournament_id=self.tournament_id
+            )
+            message = resync_event.to_server_sent_event()
+
+        self.queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class TournamentEventHub:
+    """
+    Broadcasts the events of a tournament to all clients of this worker that listen to it.
+
+    An event is serialized once, regardless of the number of clients.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: defaultdict[TournamentId, set[TournamentEventSubscriber]] = defaultdict(
+            set
+        )
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(
+        self, tournament_id: TournamentId
+    ) -> AsyncIterator[TournamentEventSubscriber]:
+        subscriber = TournamentEventSubscriber(tournament_id)
+        self.subscribers[tournament_id].add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self.subscribers[tournament_id].discard(subscriber)
+            if not self.subscribers[tournament_id]:
+                del self.subscribers[tournament_id]
+
+    def publish(self, event: TournamentEvent) -> None:
+        subscribers = self.subscribers.get(event.tournament_id)
+        if not subscribers:
+            return
+
+        message = event.to_server_sent_event()
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+
+tournament_event_hub = TournamentEventHub()
+
+
+async def stream_tournament_events(tournament_id: TournamentId) -> AsyncIterator[str]:
+    """
+    Yields the events of a tournament as server-sent events, with a comment as heartbeat when
+    no event was published for a while so that proxies don't close the connection.
+    """
+    async with tournament_event_hub.subscribe(tournament_id) as subscriber:
+        yield ": connected\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(subscriber.get(), config.event_heartbeat_seconds)
+            except TimeoutError:
+                yield ": heartbeat\n\n"
+
+
+def publish_tournament_event(
+    tournament_id: TournamentId, event_type: TournamentEventType, ids: list[int] | None = None
+) -> None:
+    """
+    Should be called after a change that is visible on dashboards has been written.
+    """
+    event = TournamentEvent(type=event_type, tournament_id=tournament_id, ids=ids or [])
+    tournament_event_hub.publish(event)
+    notification_bus.notify(TOURNAMENT_EVENTS_CHANNEL, event.model_dump(mode="json"))
+
+
+def handle_tournament_event(notification: JsonDict) -> None:
+    """
+    Forwards an event published by another worker to the clients of this worker.
+    """
+    tournament_event_hub.publish(TournamentEvent.model_validate(notification))
@@ -1,9 +1,18 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
+from datetime import timedelta
 
-from bracket.database import database
-from bracket.models.db.match import Match, MatchWithDetailsDefinitive
+from heliclockter import datetime_utc
+
+from bracket.config import config
+from bracket.models.db.match import Match, MatchWithDetails, MatchWithDetailsDefinitive
 from bracket.models.db.util import StageWithStageItems
-from bracket.utils.id_types import MatchId
+from bracket.sql.cache import get_foreign_bump_count, get_tournament_version, track_own_bumps
+from bracket.sql.matches import sql_set_conflicts_for_matches
+from bracket.utils.cache import LRUCache
+from bracket.utils.id_types import MatchId, StageItemInputId, TournamentId
+from bracket.utils.types import assert_some
 
 
 def matches_overlap(match1: Match, match2: Match) -> bool:
@@ -21,12 +30,23 @@ def matches_overlap(match1: Match, match2: Match) -> bool:
     )
 
 
+def matches_conflict(match_a: Match, match_b: Match) -> bool:
+    return matches_overlap(match_a, match_b) or matches_overlap(match_b, match_a)
+
+
 def get_conflicting_matches(
     stages: list[StageWithStageItems],
 ) -> tuple[
     defaultdict[MatchId, list[bool]],
     set[MatchId],
 ]:
+    """
+    Determines which inputs of which matches are scheduled in overlapping matches.
+
+    Matches are grouped per stage item input, and per input a sweep over the matches sorted by
+    start time only compares matches that are still running when the next one starts. This
+    takes O(N log N) time instead of comparing all pairs of matches in the tournament.
+    """
     matches = [
         match
         for stage in stages
@@ -36,80 +56,233 @@ def get_conflicting_matches(
         if isinstance(match, MatchWithDetailsDefinitive)
     ]
 
+    match_indices_per_input: defaultdict[StageItemInputId, set[int]] = defaultdict(set)
+    for index, match in enumerate(matches):
+        if match.start_time is not None:
+            for stage_item_input_id in match.stage_item_input_ids:
+                match_indices_per_input[stage_item_input_id].add(index)
+
     conflicts_to_set: defaultdict[MatchId, list[bool]] = defaultdict(lambda: [False, False])
-    matches_with_conflicts = set()
-    conflicts_to_clear = set()
 
-    for i, match1 in enumerate(matches):
-        for match2 in matches[i + 1 :]:
-            if match1.id == match2.id:
-                continue
+    for stage_item_input_id, match_indices in match_indices_per_input.items():
+        running_matches: list[tuple[datetime_utc, int]] = []
+        for index in sorted(
+            match_indices, key=lambda index: assert_some(matches[index].start_time)
+        ):
+            start_time = assert_some(matches[index].start_time)
+            while len(running_matches) > 0 and running_matches[0][0] < start_time:
+                heapq.heappop(running_matches)
 
-            conflicting_input_ids = []
+            for _, other_index in running_matches:
+                match1, match2 = matches[index], matches[other_index]
+                if not matches_conflict(match1, match2):
+                    continue
 
-            if match2.stage_item_input1_id in match1.stage_item_input_ids:
-                conflicting_input_ids.append(match2.stage_item_input1_id)
-            if match2.stage_item_input2_id in match1.stage_item_input_ids:
-                conflicting_input_ids.append(match2.stage_item_input2_id)
+                for match in (match1, match2):
+                    conflict = conflicts_to_set[match.id]
+                    conflict[0] = conflict[0] or match.stage_item_input1_id == stage_item_input_id
+                    conflict[1] = conflict[1] or match.stage_item_input2_id == stage_item_input_id
 
-            if len(conflicting_input_ids) < 1:
-                continue
+            heapq.heappush(running_matches, (matches[index].end_time, index))
 
-            if matches_overlap(match1, match2):
-                for match in (match1, match2):
-                    if not conflicts_to_set[match.id][0]:
-                        conflicts_to_set[match.id][0] = (
-                            match.stage_item_input1_id in conflicting_input_ids
-                        )
-                    if not conflicts_to_set[match.id][1]:
-                        conflicts_to_set[match.id][1] = (
-                            match.stage_item_input2_id in conflicting_input_ids
-                        )
-
-                matches_with_conflicts.add(match1.id)
-                matches_with_conflicts.add(match2.id)
-
-    for match in matches:
-        if match.id not in matches_with_conflicts:
-            conflicts_to_clear.add(match.id)
-
-    assert set(conflicts_to_set.keys()).intersection(conflicts_to_clear) == set()
+    conflicts_to_clear = {match.id for match in matches if match.id not in conflicts_to_set}
     return conflicts_to_set, conflicts_to_clear
 
 
-async def set_conflicts(
-    conflicts_to_set: dict[MatchId, list[bool]],
-    conflicts_to_clear: set[MatchId],
-) -> None:
-    for match_id, conflict in conflicts_to_set.items():
-        await database.execute(
-            """
-            UPDATE matches
-            SET
-                stage_item_input1_conflict = :conflict1_id,
-                stage_item_input2_conflict = :conflict2_id
-            WHERE id = :match_id
-            """,
-            values={
-                "match_id": match_id,
-                "conflict1_id": conflict[0],
-                "conflict2_id": conflict[1],
-            },
+type Interval = tuple[datetime_utc, datetime_utc, MatchId]
+
+
+class ConflictIndex:
+    """
+    Index of the scheduled matches of a tournament per stage item input, sorted by start time.
+
+    When matches are rescheduled, only the matches that overlap with their old or new time slot
+    are checked again, which takes O(k log N) time for k rescheduled matches instead of
+    checking the whole tournament.
+    """
+
+    def __init__(self, stages: list[StageWithStageItems]) -> None:
+        self.matches: dict[MatchId, MatchWithDetailsDefinitive] = {}
+        self.intervals_per_input: defaultdict[StageItemInputId, list[Interval]] = defaultdict(list)
+        self.max_duration_per_input: defaultdict[StageItemInputId, timedelta] = defaultdict(
+            timedelta
         )
+        self.stored_conflicts: dict[MatchId, tuple[bool, bool]] = {}
+        self.conflicts: dict[MatchId, tuple[bool, bool]] = {}
+        self.changed_match_ids: set[MatchId] = set()
+        # Modifications of the tournament by others when the index was taken out of the cache.
+        self.foreign_bump_count = 0
+
+        for stage in stages:
+            for stage_item in stage.stage_items:
+                for round_ in stage_item.rounds:
+                    for match in round_.matches:
+                        if isinstance(match, MatchWithDetailsDefinitive):
+                            self._insert(match)
+
+        conflicts_to_set, _ = get_conflicting_matches(stages)
+        for match_id, stored_conflict in self.stored_conflicts.items():
+            conflict = conflicts_to_set.get(match_id, [False, False])
+            self.conflicts[match_id] = (conflict[0], conflict[1])
+            if self.conflicts[match_id] != stored_conflict:
+                self.changed_match_ids.add(match_id)
 
-    for match_id in conflicts_to_clear:
-        await database.execute(
-            """
-            UPDATE matches
-            SET
-                stage_item_input1_conflict = false,
-                stage_item_input2_conflict = false
-            WHERE id = :match_id
-            """,
-            values={"match_id": match_id},
+    def _insert(self, match: MatchWithDetailsDefinitive) -> None:
+        self.matches[match.id] = match
+        self.stored_conflicts[match.id] = (
+            match.stage_item_input1_conflict,
+            match.stage_item_input2_conflict,
         )
+        if match.start_time is None:
+            return
+
+        for stage_item_input_id in set(match.stage_item_input_ids):
+            insort(
+                self.intervals_per_input[stage_item_input_id],
+                (match.start_time, match.end_time, match.id),
+            )
+            self.max_duration_per_input[stage_item_input_id] = max(
+                self.max_duration_per_input[stage_item_input_id],
+                match.end_time - match.start_time,
+            )
+
+    def _remove(self, match: MatchWithDetailsDefinitive) -> None:
+        del self.matches[match.id]
+        del self.stored_conflicts[match.id]
+        self.conflicts.pop(match.id, None)
+        self.changed_match_ids.discard(match.id)
+        if match.start_time is None:
+            return
+
+        for stage_item_input_id in set(match.stage_item_input_ids):
+            intervals = self.intervals_per_input[stage_item_input_id]
+            del intervals[bisect_left(intervals, (match.start_time, match.end_time, match.id))]
+
+    def _get_conflicting_match_ids(
+        self, match: MatchWithDetailsDefinitive, stage_item_input_id: StageItemInputId
+    ) -> list[MatchId]:
+        if match.start_time is None:
+            return []
+
+        # Only matches that start at most the longest match duration before this match, and
+        # before this match ends, can overlap with it.
+        intervals = self.intervals_per_input[stage_item_input_id]
+        lowest_start_time = match.start_time - self.max_duration_per_input[stage_item_input_id]
+        return [
+            other_match_id
+            for _, _, other_match_id in intervals[
+                bisect_left(intervals, lowest_start_time, key=lambda interval: interval[0]) : (
+                    bisect_right(intervals, match.end_time, key=lambda interval: interval[0])
+                )
+            ]
+            if other_match_id != match.id and matches_conflict(match, self.matches[other_match_id])
+        ]
 
+    def _get_neighbours(self, match: MatchWithDetailsDefinitive) -> set[MatchId]:
+        return {
+            other_match_id
+            for stage_item_input_id in set(match.stage_item_input_ids)
+            for other_match_id in self._get_conflicting_match_ids(match, stage_item_input_id)
+        }
 
-async def handle_conflicts(stages: list[StageWithStageItems]) -> None:
-    conflicts_to_set, conflicts_to_clear = get_conflicting_matches(stages)
-    await set_conflicts(conflicts_to_set, conflicts_to_clear)
+    def _determine_conflict(self, match: MatchWithDetailsDefinitive) -> tuple[bool, bool]:
+        conflict1, conflict2 = (
+            stage_item_input_id is not None
+            and len(self._get_conflicting_match_ids(match, stage_item_input_id)) > 0
+            for stage_item_input_id in match.stage_item_input_ids
+        )
+        return conflict1, conflict2
+
+    def update_matches(
+        self, matches: list[MatchWithDetailsDefinitive | MatchWithDetails]
+    ) -> dict[MatchId, tuple[bool, bool]]:
+        """
+        Updates the index with matches as they are stored after being created or rescheduled.
+
+        Returns the conflict flags that should be stored, for all matches of which the flags
+        differ from the stored flags, and assumes that those will be written.
+        """
+        affected_match_ids = set()
+        moved_match_ids = set()
+        for match in matches:
+            old_match = self.matches.get(match.id)
+            if (
+                old_match is not None
+                and isinstance(match, MatchWithDetailsDefinitive)
+                and (old_match.start_time, old_match.duration_minutes, old_match.margin_minutes)
+                == (match.start_time, match.duration_minutes, match.margin_minutes)
+                and old_match.stage_item_input_ids == match.stage_item_input_ids
+            ):
+                self.matches[match.id] = match
+                continue
+
+            if old_match is not None:
+                affected_match_ids |= self._get_neighbours(old_match)
+                self._remove(old_match)
+
+            if isinstance(match, MatchWithDetailsDefinitive):
+                self._insert(match)
+                moved_match_ids.add(match.id)
+
+        for match_id in moved_match_ids:
+            affected_match_ids |= {match_id, *self._get_neighbours(self.matches[match_id])}
+
+        for match_id in affected_match_ids & self.matches.keys():
+            self.conflicts[match_id] = self._determine_conflict(self.matches[match_id])
+            if self.conflicts[match_id] != self.stored_conflicts[match_id]:
+                self.changed_match_ids.add(match_id)
+            else:
+                self.changed_match_ids.discard(match_id)
+
+        conflicts_to_update = {
+            match_id: self.conflicts[match_id] for match_id in self.changed_match_ids
+        }
+        self.stored_conflicts.update(conflicts_to_update)
+        self.changed_match_ids.clear()
+        return conflicts_to_update
+
+
+conflict_index_cache = LRUCache[TournamentId, tuple[int, ConflictIndex]](
+    "conflict_index", config.tournament_cache_size
+)
+
+
+def get_conflict_index(
+    tournament_id: TournamentId, stages: list[StageWithStageItems]
+) -> ConflictIndex:
+    """
+    Returns the cached conflict index of a tournament, or builds it from `stages` if the
+    tournament was modified since the index was cached.
+
+    `stages` should be the current state of the tournament. The index is taken out of the cache,
+    `update_conflicts_for_matches` puts it back once the changes have been applied.
+    """
+    cached = conflict_index_cache.get(tournament_id)
+    conflict_index_cache.pop(tournament_id)
+    if cached is not None and cached[0] == get_tournament_version(tournament_id):
+        conflict_index = cached[1]
+    else:
+        conflict_index = ConflictIndex(stages)
+
+    track_own_bumps()
+    conflict_index.foreign_bump_count = get_foreign_bump_count(tournament_id)
+    return conflict_index
+
+
+async def update_conflicts_for_matches(
+    tournament_id: TournamentId,
+    conflict_index: ConflictIndex,
+    matches: list[MatchWithDetailsDefinitive | MatchWithDetails],
+) -> None:
+    """
+    Updates the conflict flags after `matches` have been created or rescheduled, without
+    reloading the tournament.
+
+    The index is only cached again if the tournament wasn't modified by another request or worker
+    since `get_conflict_index`, because those changes are not part of the index.
+    """
+    await sql_set_conflicts_for_matches(tournament_id, conflict_index.update_matches(matches))
+    if conflict_index.foreign_bump_count == get_foreign_bump_count(tournament_id):
+        conflict_index_cache.set(
+            tournament_id, (get_tournament_version(tournament_id), conflict_index)
+        )
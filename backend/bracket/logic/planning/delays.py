@@ -0,0 +1,156 @@
+import math
+from collections import defaultdict, deque
+
+from heliclockter import datetime_utc, timedelta
+
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.id_types import CourtId, MatchId
+from bracket.utils.types import assert_some
+
+type AnyMatch = MatchWithDetailsDefinitive | MatchWithDetails
+
+
+class MatchDelayPropagation:
+    """
+    Shifts the matches after a match that overran, using the schedule of a tournament snapshot.
+
+    Start times of matches on a court follow from the duration and margin of the previous
+    match. A delay is first absorbed by the margin of a match, as far as that margin is longer
+    than the default margin of the tournament. The remaining delay shifts the next match on the
+    court. Only the matches that actually move are visited.
+    """
+
+    def __init__(self, stages: list[StageWithStageItems], tournament: Tournament) -> None:
+        self.tournament = tournament
+        self.matches: dict[MatchId, AnyMatch] = {}
+        self.matches_per_court: defaultdict[CourtId, list[MatchId]] = defaultdict(list)
+        self.dependent_match_ids: defaultdict[MatchId, list[MatchId]] = defaultdict(list)
+        self.shifted_matches: dict[MatchId, AnyMatch] = {}
+
+        for stage in stages:
+            for stage_item in stage.stage_items:
+                for round_ in stage_item.rounds:
+                    for match in round_.matches:
+                        self.matches[match.id] = match
+                        for winner_from_match_id in (
+                            match.stage_item_input1_winner_from_match_id,
+                            match.stage_item_input2_winner_from_match_id,
+                        ):
+                            if winner_from_match_id is not None:
+                                self.dependent_match_ids[winner_from_match_id].append(match.id)
+
+                        if match.court_id is not None and match.start_time is not None:
+                            self.matches_per_court[match.court_id].append(match.id)
+
+        for match_ids in self.matches_per_court.values():
+            match_ids.sort(
+                key=lambda match_id: assert_some(self.matches[match_id].position_in_schedule)
+            )
+
+        self.index_on_court = {
+            match_id: i
+            for match_ids in self.matches_per_court.values()
+            for i, match_id in enumerate(match_ids)
+        }
+
+    def _update(self, match: AnyMatch, update: dict[str, datetime_utc | int]) -> AnyMatch:
+        updated_match = match.model_copy(update=update)
+        self.matches[match.id] = self.shifted_matches[match.id] = updated_match
+        return updated_match
+
+    def _delay_end_of_match(self, match: AnyMatch, delay_minutes: int) -> list[AnyMatch]:
+        """
+        Handles that the end of `match` (including its margin) moves `delay_minutes` later, and
+        returns the matches that start later because of that.
+        """
+        shifted_matches = []
+        court_match_ids = self.matches_per_court[assert_some(match.court_id)]
+
+        for next_match_id in court_match_ids[self.index_on_court[match.id] + 1 :]:
+            absorbed_minutes = min(
+                max(0, match.margin_minutes - self.tournament.margin_minutes), delay_minutes
+            )
+            if absorbed_minutes > 0:
+                margin_minutes = match.margin_minutes - absorbed_minutes
+                self._update(
+                    match,
+                    {"margin_minutes": margin_minutes, "custom_margin_minutes": margin_minutes},
+                )
+                delay_minutes -= absorbed_minutes
+
+            if delay_minutes <= 0:
+                break
+
+            match = self.matches[next_match_id]
+            match = self._update(
+                match,
+                {"start_time": assert_some(match.start_time) + timedelta(minutes=delay_minutes)},
+            )
+            shifted_matches.append(match)
+
+        return shifted_matches
+
+    def _delay_start_of_match(self, match: AnyMatch, delay_minutes: int) -> list[AnyMatch]:
+        """
+        Starts `match` `delay_minutes` later. The gap with the previous match on the court is
+        added to the margin of that match, so the schedule of the court stays consistent.
+        """
+        index = self.index_on_court[match.id]
+        if index > 0:
+            court_match_ids = self.matches_per_court[assert_some(match.court_id)]
+            previous_match = self.matches[court_match_ids[index - 1]]
+            margin_minutes = previous_match.margin_minutes + delay_minutes
+            self._update(
+                previous_match,
+                {"margin_minutes": margin_minutes, "custom_margin_minutes": margin_minutes},
+            )
+
+        match = self._update(
+            match, {"start_time": assert_some(match.start_time) + timedelta(minutes=delay_minutes)}
+        )
+        return [match, *self._delay_end_of_match(match, delay_minutes)]
+
+    def _shift_dependent_matches(self, shifted_matches: list[AnyMatch]) -> None:
+        queue = deque(shifted_matches)
+        while len(queue) > 0:
+            match = self.matches[queue.popleft().id]
+            for dependent_match_id in self.dependent_match_ids[match.id]:
+                dependent_match = self.matches[dependent_match_id]
+                if (
+                    dependent_match.start_time is None
+                    or dependent_match.court_id is None
+                    or dependent_match.start_time >= match.end_time
+                ):
+                    continue
+
+                delay_minutes = math.ceil(
+                    (match.end_time - dependent_match.start_time).total_seconds() / 60
+                )
+                queue.extend(self._delay_start_of_match(dependent_match, delay_minutes))
+
+    def delay_match(
+        self, match_id: MatchId, actual_end_time: datetime_utc, shift_dependent_matches: bool
+    ) -> list[AnyMatch]:
+        """
+        Sets the duration of a match such that it ends at `actual_end_time`, shifts the matches
+        after it on the same court and, optionally, matches on other courts that take the
+        winner of a shifted match. Returns all matches that changed.
+        """
+        match = self.matches[match_id]
+        start_time = assert_some(match.start_time)
+        duration_minutes = max(0, math.ceil((actual_end_time - start_time).total_seconds() / 60))
+        delay_minutes = duration_minutes - match.duration_minutes
+        if delay_minutes <= 0:
+            return []
+
+        match = self._update(
+            match,
+            {"duration_minutes": duration_minutes, "custom_duration_minutes": duration_minutes},
+        )
+        shifted_matches = [match, *self._delay_end_of_match(match, delay_minutes)]
+        if shift_dependent_matches:
+            self._shift_dependent_matches(shifted_matches)
+
+        return list(self.shifted_matches.values())
@@ -1,9 +1,10 @@
 from collections import defaultdict
 from typing import NamedTuple
 
-from heliclockter import timedelta
+from heliclockter import datetime_utc, timedelta
 
 from bracket.models.db.match import (
+    Match,
     MatchRescheduleBody,
     MatchWithDetails,
     MatchWithDetailsDefinitive,
@@ -11,60 +12,80 @@ from bracket.models.db.match import (
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.util import StageWithStageItems
 from bracket.sql.courts import get_all_courts_in_tournament
-from bracket.sql.matches import (
-    sql_reschedule_match_and_determine_duration_and_margin,
-)
+from bracket.sql.matches import sql_reschedule_matches
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.id_types import CourtId, MatchId, TournamentId
 from bracket.utils.types import assert_some
 
 
-async def schedule_all_unscheduled_matches(
-    tournament_id: TournamentId, stages: list[StageWithStageItems]
-) -> None:
-    tournament = await sql_get_tournament(tournament_id)
-    courts = await get_all_courts_in_tournament(tournament_id)
-
-    if len(stages) < 1 or len(courts) < 1:
-        return
-
-    time_last_match_from_previous_stage = tournament.start_time
-    position_last_match_from_previous_stage = 0
-
-    for stage in stages:
-        stage_items = sorted(stage.stage_items, key=lambda x: x.name)
-
-        stage_start_time = time_last_match_from_previous_stage
-        stage_position_in_schedule = position_last_match_from_previous_stage
-
-        for i, stage_item in enumerate(stage_items):
-            court = courts[min(i, len(courts) - 1)]
-            start_time = stage_start_time
-            position_in_schedule = stage_position_in_schedule
-            for round_ in sorted(stage_item.rounds, key=lambda r: r.id):
-                for match in round_.matches:
-                    if match.start_time is None and match.position_in_schedule is None:
-                        await sql_reschedule_match_and_determine_duration_and_margin(
-                            court.id,
-                            start_time,
-                            position_in_schedule,
-                            match,
-                            tournament,
-                        )
+def get_rescheduled_match[MatchT: Match](
+    court_id: CourtId | None,
+    start_time: datetime_utc,
+    position_in_schedule: int | None,
+    match: MatchT,
+    tournament: Tournament,
+) -> MatchT:
+    duration_minutes = (
+        tournament.duration_minutes
+        if match.custom_duration_minutes is None
+        else match.custom_duration_minutes
+    )
+    margin_minutes = (
+        tournament.margin_minutes
+        if match.custom_margin_minutes is None
+        else match.custom_margin_minutes
+    )
+    return match.model_copy(
+        update={
+            "court_id": court_id,
+            "start_time": start_time,
+            "position_in_schedule": position_in_schedule,
+            "duration_minutes": duration_minutes,
+            "margin_minutes": margin_minutes,
+        }
+    )
 
-                    start_time += timedelta(minutes=match.duration_minutes)
-                    position_in_schedule += 1
 
-                    time_last_match_from_previous_stage = max(
-                        time_last_match_from_previous_stage, start_time
-                    )
+def get_schedule_of_match(match: Match) -> tuple[object, ...]:
+    return (
+        match.court_id,
+        match.start_time,
+        match.position_in_schedule,
+        match.duration_minutes,
+        match.margin_minutes,
+        match.custom_duration_minutes,
+        match.custom_margin_minutes,
+    )
 
-                    position_last_match_from_previous_stage = max(
-                        position_last_match_from_previous_stage, position_in_schedule
-                    )
 
-    await update_start_times_of_matches(tournament_id)
+async def write_rescheduled_matches(
+    tournament_id: TournamentId,
+    stages: list[StageWithStageItems],
+    rescheduled_matches: list[MatchWithDetailsDefinitive | MatchWithDetails],
+) -> list[MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Stores the matches of which the schedule differs from the schedule in `stages`, using a
+    single query. If a match is rescheduled multiple times, the last schedule is used.
+
+    Returns the matches that changed.
+    """
+    matches_by_id = {
+        match.id: match
+        for stage in stages
+        for stage_item in stage.stage_items
+        for round_ in stage_item.rounds
+        for match in round_.matches
+    }
+    latest_matches = {match.id: match for match in rescheduled_matches}
+    changed_matches = [
+        match
+        for match in latest_matches.values()
+        if match.id not in matches_by_id
+        or get_schedule_of_match(match) != get_schedule_of_match(matches_by_id[match.id])
+    ]
+    await sql_reschedule_matches(tournament_id, changed_matches)
+    return changed_matches
 
 
 class MatchPosition(NamedTuple):
@@ -72,38 +93,50 @@ class MatchPosition(NamedTuple):
     position: float
 
 
-async def reorder_matches_for_court(
+def get_matches_reordered_for_court(
     tournament: Tournament,
     scheduled_matches: list[MatchPosition],
     court_id: CourtId,
-) -> None:
+) -> list[MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Determines the schedule of the matches on a court, without storing it.
+    """
     matches_this_court = sorted(
         (match_pos for match_pos in scheduled_matches if match_pos.match.court_id == court_id),
         key=lambda mp: mp.position,
     )
 
+    rescheduled_matches = []
     last_start_time = tournament.start_time
     for i, match_pos in enumerate(matches_this_court):
-        await sql_reschedule_match_and_determine_duration_and_margin(
-            court_id,
-            last_start_time,
-            position_in_schedule=i,
-            match=match_pos.match,
-            tournament=tournament,
+        rescheduled_matches.append(
+            get_rescheduled_match(
+                court_id,
+                last_start_time,
+                position_in_schedule=i,
+                match=match_pos.match,
+                tournament=tournament,
+            )
         )
         last_start_time = last_start_time + timedelta(
             minutes=match_pos.match.duration_minutes + match_pos.match.margin_minutes
         )
 
+    return rescheduled_matches
 
-async def handle_match_reschedule(
-    tournament: Tournament, body: MatchRescheduleBody, match_id: MatchId
-) -> None:
-    if body.old_position == body.new_position and body.old_court_id == body.new_court_id:
-        return
 
-    stages = await get_full_tournament_details(tournament.id)
-    scheduled_matches_old = get_scheduled_matches(stages)
+def get_matches_moved_in_schedule(
+    tournament: Tournament,
+    body: MatchRescheduleBody,
+    match_id: MatchId,
+    scheduled_matches_old: list[MatchPosition],
+) -> list[MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Determines the schedule of the courts after moving a match to another position in the
+    schedule, without storing it.
+    """
+    if body.old_position == body.new_position and body.old_court_id == body.new_court_id:
+        return []
 
     # For match in prev position: set new position
     scheduled_matches = []
@@ -129,10 +162,31 @@ async def handle_match_reschedule(
         else:
             scheduled_matches.append(match_pos)
 
-    await reorder_matches_for_court(tournament, scheduled_matches, body.new_court_id)
+    rescheduled_matches = get_matches_reordered_for_court(
+        tournament, scheduled_matches, body.new_court_id
+    )
 
     if body.new_court_id != body.old_court_id:
-        await reorder_matches_for_court(tournament, scheduled_matches, body.old_court_id)
+        rescheduled_matches += get_matches_reordered_for_court(
+            tournament, scheduled_matches, body.old_court_id
+        )
+
+    return rescheduled_matches
+
+
+async def handle_match_reschedule(
+    tournament: Tournament,
+    body: MatchRescheduleBody,
+    match_id: MatchId,
+    stages: list[StageWithStageItems],
+) -> list[MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Moves a match to another position in the schedule and returns the rescheduled matches.
+    """
+    rescheduled_matches = get_matches_moved_in_schedule(
+        tournament, body, match_id, get_scheduled_matches(stages)
+    )
+    return await write_rescheduled_matches(tournament.id, stages, rescheduled_matches)
 
 
 async def update_start_times_of_matches(tournament_id: TournamentId) -> None:
@@ -141,8 +195,15 @@ async def update_start_times_of_matches(tournament_id: TournamentId) -> None:
     courts = await get_all_courts_in_tournament(tournament_id)
     scheduled_matches = get_scheduled_matches(stages)
 
-    for court in courts:
-        await reorder_matches_for_court(tournament, scheduled_matches, court.id)
+    await write_rescheduled_matches(
+        tournament_id,
+        stages,
+        [
+            match
+            for court in courts
+            for match in get_matches_reordered_for_court(tournament, scheduled_matches, court.id)
+        ],
+    )
 
 
 def get_scheduled_matches(stages: list[StageWithStageItems]) -> list[MatchPosition]:
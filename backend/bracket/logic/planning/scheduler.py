@@ -0,0 +1,258 @@
+import heapq
+from dataclasses import dataclass
+
+from heliclockter import datetime_utc, timedelta
+from pydantic import BaseModel
+
+from bracket.logic.planning.matches import get_rescheduled_match, write_rescheduled_matches
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import RoundWithMatches, StageWithStageItems
+from bracket.sql.courts import get_all_courts_in_tournament
+from bracket.sql.tournaments import sql_get_tournament
+from bracket.utils.id_types import CourtId, MatchId, StageItemInputId, TournamentId
+
+type AnyMatch = MatchWithDetailsDefinitive | MatchWithDetails
+
+
+class ScheduleResult(BaseModel):
+    scheduled_match_count: int
+    end_time: datetime_utc
+    makespan_minutes: int
+
+
+@dataclass
+class CourtTimeline:
+    court_id: CourtId
+    free_at: datetime_utc
+    next_position: int = 0
+    last_match: AnyMatch | None = None
+
+
+@dataclass
+class StageItemProgress:
+    rounds: list[RoundWithMatches]
+    next_round_index: int = 0
+    remaining_in_round: int = 0
+    latest_start_in_round: datetime_utc | None = None
+
+
+def is_unscheduled(match: AnyMatch) -> bool:
+    return match.start_time is None and match.position_in_schedule is None
+
+
+class ListScheduler:
+    """
+    Assigns unscheduled matches to the court that is free first, using list scheduling.
+
+    Matches are released round by round per stage item, and stage by stage. Of the released
+    matches, the one that can start first is scheduled next on the court that is free first. A
+    match can't start:
+    - before the last match of the previous round of its stage item has started,
+    - before its inputs have rested `min_rest_minutes` after their previous match,
+    - before the matches it takes its winners from have finished (plus the rest time),
+    - before all matches of previous stages have finished.
+
+    Takes O(N log N + N log C) time for N matches and C courts.
+    """
+
+    def __init__(
+        self, court_ids: list[CourtId], tournament: Tournament, min_rest_minutes: int
+    ) -> None:
+        self.tournament = tournament
+        self.min_rest = timedelta(minutes=min_rest_minutes)
+        self.matches: dict[MatchId, AnyMatch] = {}
+        self.available_at_per_input: dict[StageItemInputId, datetime_utc] = {}
+        self.rescheduled_matches: dict[MatchId, AnyMatch] = {}
+        self.scheduled_match_count = 0
+        self.timelines = {
+            court_id: CourtTimeline(court_id=court_id, free_at=tournament.start_time)
+            for court_id in court_ids
+        }
+
+    def _add_scheduled_match(self, match: AnyMatch) -> None:
+        self.matches[match.id] = match
+        if match.start_time is None:
+            return
+
+        rested_at = match.end_time + self.min_rest
+        for stage_item_input_id in (match.stage_item_input1_id, match.stage_item_input2_id):
+            if stage_item_input_id is not None:
+                self.available_at_per_input[stage_item_input_id] = max(
+                    self.available_at_per_input.get(stage_item_input_id, rested_at), rested_at
+                )
+
+        timeline = self.timelines.get(match.court_id) if match.court_id is not None else None
+        if timeline is None or match.position_in_schedule is None:
+            return
+
+        timeline.free_at = max(timeline.free_at, match.end_time)
+        if match.position_in_schedule >= timeline.next_position:
+            timeline.next_position = match.position_in_schedule + 1
+            timeline.last_match = match
+
+    def _get_earliest_start(self, match: AnyMatch, lower_bound: datetime_utc) -> datetime_utc:
+        earliest_start = lower_bound
+        for stage_item_input_id in (match.stage_item_input1_id, match.stage_item_input2_id):
+            if stage_item_input_id in self.available_at_per_input:
+                earliest_start = max(
+                    earliest_start, self.available_at_per_input[stage_item_input_id]
+                )
+
+        for winner_from_match_id in (
+            match.stage_item_input1_winner_from_match_id,
+            match.stage_item_input2_winner_from_match_id,
+        ):
+            winner_from_match = (
+                self.matches.get(winner_from_match_id) if winner_from_match_id else None
+            )
+            if winner_from_match is not None and winner_from_match.start_time is not None:
+                earliest_start = max(earliest_start, winner_from_match.end_time + self.min_rest)
+
+        return earliest_start
+
+    def _assign(self, match: AnyMatch, timeline: CourtTimeline, start_time: datetime_utc) -> None:
+        # Extend the margin of the previous match on the court to keep gaps in the schedule when
+        # the matches of the court are reordered later on.
+        gap_minutes = int((start_time - timeline.free_at).total_seconds() // 60)
+        if gap_minutes > 0 and timeline.last_match is not None:
+            previous_match = timeline.last_match.model_copy(
+                update={
+                    "custom_margin_minutes": timeline.last_match.margin_minutes + gap_minutes,
+                    "margin_minutes": timeline.last_match.margin_minutes + gap_minutes,
+                }
+            )
+            self.matches[previous_match.id] = previous_match
+            self.rescheduled_matches[previous_match.id] = previous_match
+
+        scheduled_match = get_rescheduled_match(
+            timeline.court_id, start_time, timeline.next_position, match, self.tournament
+        )
+        self.rescheduled_matches[scheduled_match.id] = scheduled_match
+        self.scheduled_match_count += 1
+        self._add_scheduled_match(scheduled_match)
+
+    def _schedule_stage(
+        self, stage: StageWithStageItems, stage_start_time: datetime_utc
+    ) -> datetime_utc:
+        """
+        Schedules the unscheduled matches of a stage and returns when the stage ends.
+        """
+        ready_heap: list[tuple[datetime_utc, int, int, MatchId]] = []
+        lower_bound_per_match: dict[MatchId, datetime_utc] = {}
+        progress_per_stage_item = [
+            StageItemProgress(rounds=sorted(stage_item.rounds, key=lambda r: r.id))
+            for stage_item in sorted(stage.stage_items, key=lambda x: x.name)
+        ]
+
+        def release_next_round(stage_item_index: int, lower_bound: datetime_utc) -> None:
+            progress = progress_per_stage_item[stage_item_index]
+            while progress.next_round_index < len(progress.rounds):
+                round_ = progress.rounds[progress.next_round_index]
+                progress.next_round_index += 1
+                start_times = [match.start_time for match in round_.matches if match.start_time]
+                progress.latest_start_in_round = max(start_times, default=None)
+
+                unscheduled_matches = [match for match in round_.matches if is_unscheduled(match)]
+                if len(unscheduled_matches) > 0:
+                    progress.remaining_in_round = len(unscheduled_matches)
+                    for match in unscheduled_matches:
+                        lower_bound_per_match[match.id] = lower_bound
+                        heapq.heappush(
+                            ready_heap,
+                            (
+                                self._get_earliest_start(match, lower_bound),
+                                stage_item_index,
+                                len(lower_bound_per_match),
+                                match.id,
+                            ),
+                        )
+                    return
+
+                lower_bound = max(lower_bound, progress.latest_start_in_round or lower_bound)
+
+        for stage_item_index in range(len(progress_per_stage_item)):
+            release_next_round(stage_item_index, stage_start_time)
+
+        court_heap = [
+            (timeline.free_at, i, timeline.court_id)
+            for i, timeline in enumerate(self.timelines.values())
+        ]
+        heapq.heapify(court_heap)
+
+        while len(ready_heap) > 0:
+            earliest_start, stage_item_index, priority, match_id = heapq.heappop(ready_heap)
+            match = self.matches[match_id]
+            updated_earliest_start = self._get_earliest_start(
+                match, lower_bound_per_match[match_id]
+            )
+            if updated_earliest_start > earliest_start:
+                heapq.heappush(
+                    ready_heap, (updated_earliest_start, stage_item_index, priority, match_id)
+                )
+                continue
+
+            _, court_index, court_id = heapq.heappop(court_heap)
+            timeline = self.timelines[court_id]
+            start_time = max(timeline.free_at, earliest_start)
+            self._assign(match, timeline, start_time)
+            heapq.heappush(court_heap, (timeline.free_at, court_index, court_id))
+
+            progress = progress_per_stage_item[stage_item_index]
+            progress.latest_start_in_round = max(
+                start_time, progress.latest_start_in_round or start_time
+            )
+            progress.remaining_in_round -= 1
+            if progress.remaining_in_round == 0:
+                release_next_round(stage_item_index, progress.latest_start_in_round)
+
+        return max(
+            [
+                stage_start_time,
+                *(
+                    self.matches[match.id].end_time
+                    for stage_item in stage.stage_items
+                    for round_ in stage_item.rounds
+                    for match in round_.matches
+                    if self.matches[match.id].start_time is not None
+                ),
+            ]
+        )
+
+    def schedule(self, stages: list[StageWithStageItems]) -> ScheduleResult:
+        for stage in stages:
+            for stage_item in stage.stage_items:
+                for round_ in stage_item.rounds:
+                    for match in round_.matches:
+                        self._add_scheduled_match(match)
+
+        if len(self.timelines) > 0:
+            stage_start_time = self.tournament.start_time
+            for stage in stages:
+                stage_start_time = self._schedule_stage(stage, stage_start_time)
+
+        end_time = max(
+            [
+                self.tournament.start_time,
+                *(match.end_time for match in self.matches.values() if match.start_time),
+            ]
+        )
+        return ScheduleResult(
+            scheduled_match_count=self.scheduled_match_count,
+            end_time=end_time,
+            makespan_minutes=int((end_time - self.tournament.start_time).total_seconds() // 60),
+        )
+
+
+async def schedule_all_unscheduled_matches(
+    tournament_id: TournamentId, stages: list[StageWithStageItems], min_rest_minutes: int = 0
+) -> ScheduleResult:
+    tournament = await sql_get_tournament(tournament_id)
+    courts = await get_all_courts_in_tournament(tournament_id)
+
+    scheduler = ListScheduler([court.id for court in courts], tournament, min_rest_minutes)
+    result = scheduler.schedule(stages)
+    await write_rescheduled_matches(
+        tournament_id, stages, list(scheduler.rescheduled_matches.values())
+    )
+    return result
@@ -0,0 +1,151 @@
+from heliclockter import datetime_utc
+from pydantic import BaseModel
+
+from bracket.logic.planning.conflicts import get_conflicting_matches
+from bracket.logic.planning.matches import (
+    get_matches_moved_in_schedule,
+    get_matches_reordered_for_court,
+    get_scheduled_matches,
+)
+from bracket.logic.planning.scheduler import ListScheduler, ScheduleResult
+from bracket.models.db.match import (
+    MatchWithDetails,
+    MatchWithDetailsDefinitive,
+    ScheduleSimulationBody,
+)
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.id_types import CourtId, MatchId
+from bracket.utils.types import assert_some
+
+type AnyMatch = MatchWithDetailsDefinitive | MatchWithDetails
+
+
+class SimulatedMatch(BaseModel):
+    id: MatchId
+    court_id: CourtId | None
+    start_time: datetime_utc
+    end_time: datetime_utc
+    position_in_schedule: int | None
+    stage_item_input1_conflict: bool
+    stage_item_input2_conflict: bool
+
+
+class ScheduleSimulation(ScheduleResult):
+    conflicting_match_count: int
+    matches: list[SimulatedMatch]
+
+
+def get_stages_with_matches(
+    stages: list[StageWithStageItems], matches: dict[MatchId, AnyMatch]
+) -> list[StageWithStageItems]:
+    """
+    Returns a copy of `stages` in which the matches are replaced by the ones in `matches`.
+    """
+    if len(matches) < 1:
+        return stages
+
+    return [
+        stage.model_copy(
+            update={
+                "stage_items": [
+                    stage_item.model_copy(
+                        update={
+                            "rounds": [
+                                round_.model_copy(
+                                    update={
+                                        "matches": [
+                                            matches.get(match.id, match) for match in round_.matches
+                                        ]
+                                    }
+                                )
+                                for round_ in stage_item.rounds
+                            ]
+                        }
+                    )
+                    for stage_item in stage.stage_items
+                ]
+            }
+        )
+        for stage in stages
+    ]
+
+
+def simulate_schedule(
+    tournament: Tournament,
+    court_ids: list[CourtId],
+    stages: list[StageWithStageItems],
+    body: ScheduleSimulationBody,
+) -> ScheduleSimulation:
+    """
+    Determines what the schedule of a tournament would look like after the changes in `body`,
+    without storing anything.
+
+    The changes are applied to a copy of `stages` in the same way as when they are stored: the
+    match is moved, the start times of all courts are recalculated using the (new) durations and
+    margins of the tournament and optionally the unscheduled matches are scheduled, using
+    `extra_court_count` additional courts.
+    """
+    tournament = tournament.model_copy(
+        update={
+            key: value
+            for key, value in (
+                ("start_time", body.start_time),
+                ("duration_minutes", body.duration_minutes),
+                ("margin_minutes", body.margin_minutes),
+            )
+            if value is not None
+        }
+    )
+
+    if body.move is not None:
+        moved_matches = get_matches_moved_in_schedule(
+            tournament, body.move, body.move.match_id, get_scheduled_matches(stages)
+        )
+        stages = get_stages_with_matches(stages, {match.id: match for match in moved_matches})
+
+    scheduled_matches = get_scheduled_matches(stages)
+    stages = get_stages_with_matches(
+        stages,
+        {
+            match.id: match
+            for court_id in court_ids
+            for match in get_matches_reordered_for_court(tournament, scheduled_matches, court_id)
+        },
+    )
+
+    scheduled_match_count = 0
+    if body.schedule_unscheduled_matches:
+        lowest_court_id = min([0, *court_ids])
+        extra_court_ids = [
+            CourtId(lowest_court_id - i) for i in range(1, body.extra_court_count + 1)
+        ]
+        scheduler = ListScheduler([*court_ids, *extra_court_ids], tournament, body.min_rest_minutes)
+        scheduled_match_count = scheduler.schedule(stages).scheduled_match_count
+        stages = get_stages_with_matches(stages, scheduler.rescheduled_matches)
+
+    conflicts, _ = get_conflicting_matches(stages)
+    matches = [
+        SimulatedMatch(
+            id=match.id,
+            court_id=match.court_id,
+            start_time=assert_some(match.start_time),
+            end_time=match.end_time,
+            position_in_schedule=match.position_in_schedule,
+            stage_item_input1_conflict=conflicts.get(match.id, [False, False])[0],
+            stage_item_input2_conflict=conflicts.get(match.id, [False, False])[1],
+        )
+        for stage in stages
+        for stage_item in stage.stage_items
+        for round_ in stage_item.rounds
+        for match in round_.matches
+        if match.start_time is not None
+    ]
+    end_time = max([tournament.start_time, *(match.end_time for match in matches)])
+    return ScheduleSimulation(
+        scheduled_match_count=scheduled_match_count,
+        end_time=end_time,
+        makespan_minutes=int((end_time - tournament.start_time).total_seconds() // 60),
+        conflicting_match_count=len(conflicts),
+        matches=sorted(matches, key=lambda match: (match.start_time, match.id)),
+    )
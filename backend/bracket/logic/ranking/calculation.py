@@ -1,15 +1,20 @@
 import math
-from collections import defaultdict
+from collections import Counter, defaultdict
 from decimal import Decimal
 
+from bracket.database import database
 from bracket.logic.ranking.statistics import START_ELO, TeamStatistics
-from bracket.models.db.match import MatchWithDetailsDefinitive
+from bracket.models.db.match import Match, MatchBody, MatchWithDetailsDefinitive
 from bracket.models.db.ranking import Ranking
 from bracket.models.db.stage_item import StageType
 from bracket.models.db.util import StageItemWithRounds
+from bracket.schema import AdvisoryLockNamespace
+from bracket.sql.cache import bump_tournament_version
+from bracket.sql.locks import lock_until_end_of_transaction
 from bracket.sql.rankings import get_ranking_for_stage_item
+from bracket.sql.stage_items import sql_get_stage_item_with_rounds
 from bracket.sql.teams import update_team_stats
-from bracket.utils.id_types import StageItemInputId, TournamentId
+from bracket.utils.id_types import StageItemId, StageItemInputId, TournamentId
 
 K = 32
 D = 400
@@ -91,6 +96,39 @@ def determine_ranking_for_stage_item(
     return input_x_stats
 
 
+def determine_ranking_delta_for_match(
+    old_match: MatchWithDetailsDefinitive,
+    new_match: MatchWithDetailsDefinitive,
+    ranking: Ranking,
+    stage_item: StageItemWithRounds,
+) -> dict[StageItemInputId, TeamStatistics]:
+    """
+    Determines how the statistics of the inputs of a match change when its result changes.
+
+    This is only exact for stage item types of which the statistics of a match don't depend on
+    the results of other matches, so not for Swiss stage items.
+    """
+    assert stage_item.type is not StageType.SWISS
+    old_stats: defaultdict[StageItemInputId, TeamStatistics] = defaultdict(TeamStatistics)
+    new_stats: defaultdict[StageItemInputId, TeamStatistics] = defaultdict(TeamStatistics)
+
+    for match, stats in ((old_match, old_stats), (new_match, new_stats)):
+        for team_index, stage_item_input in enumerate(match.stage_item_inputs):
+            set_statistics_for_stage_item_input(
+                team_index, stats, match, stage_item_input.id, ranking, stage_item
+            )
+
+    return {
+        stage_item_input.id: TeamStatistics(
+            wins=new_stats[stage_item_input.id].wins - old_stats[stage_item_input.id].wins,
+            draws=new_stats[stage_item_input.id].draws - old_stats[stage_item_input.id].draws,
+            losses=new_stats[stage_item_input.id].losses - old_stats[stage_item_input.id].losses,
+            points=new_stats[stage_item_input.id].points - old_stats[stage_item_input.id].points,
+        )
+        for stage_item_input in new_match.stage_item_inputs
+    }
+
+
 def determine_team_ranking_for_stage_item(
     stage_item: StageItemWithRounds,
     ranking: Ranking,
@@ -101,21 +139,116 @@ def determine_team_ranking_for_stage_item(
 
 async def recalculate_ranking_for_stage_item(
     tournament_id: TournamentId,
-    stage_item: StageItemWithRounds,
+    stage_item_id: StageItemId,
 ) -> None:
-    ranking = await get_ranking_for_stage_item(tournament_id, stage_item.id)
-    assert stage_item, "Stage item not found"
-    assert ranking, "Ranking not found"
+    async with database.transaction():
+        await lock_until_end_of_transaction(AdvisoryLockNamespace.STAGE_ITEM_RANKING, stage_item_id)
+        # The matches are read after acquiring the lock, so results that are updated concurrently
+        # are either included here or added to the statistics afterwards.
+        stage_item = await sql_get_stage_item_with_rounds(tournament_id, stage_item_id)
+        ranking = await get_ranking_for_stage_item(tournament_id, stage_item_id)
+        assert stage_item, "Stage item not found"
+        assert ranking, "Ranking not found"
+
+        elo_per_input = determine_ranking_for_stage_item(stage_item, ranking)
+        await update_team_stats(
+            tournament_id,
+            {
+                stage_item_input.id: elo_per_input[stage_item_input.id]
+                for stage_item_input in stage_item.inputs
+                if stage_item_input.team_id is not None
+            },
+        )
 
-    team_x_stage_item_input_lookup = {
-        stage_item_input.team_id: stage_item_input.id
-        for stage_item_input in stage_item.inputs
-        if stage_item_input.team_id is not None
-    }
+    # Another request could have cached the tournament before this transaction was committed.
+    bump_tournament_version(tournament_id)
 
-    elo_per_input = determine_ranking_for_stage_item(stage_item, ranking)
 
-    for stage_item_input_id in team_x_stage_item_input_lookup.values():
-        await update_team_stats(
-            tournament_id, stage_item_input_id, elo_per_input[stage_item_input_id]
-        )
+def get_match_count_per_input(stage_item: StageItemWithRounds) -> Counter[StageItemInputId]:
+    """
+    Counts the matches that are included in the statistics of each input of a stage item.
+    """
+    return Counter(
+        stage_item_input_id
+        for round_ in stage_item.rounds
+        if not round_.is_draft
+        for match in round_.matches
+        if isinstance(match, MatchWithDetailsDefinitive)
+        for stage_item_input_id in match.stage_item_input_ids
+    )
+
+
+async def update_ranking_for_match_result(
+    tournament_id: TournamentId,
+    stage_item: StageItemWithRounds,
+    match_before_update: Match,
+    match_body: MatchBody,
+) -> None:
+    """
+    Updates the statistics of the inputs of a match after its result has been changed.
+
+    Only the difference between the old and new result of the match is added to the stored
+    statistics, instead of replaying all matches of the stage item. If that's not exact, e.g. for
+    Swiss stage items or when the match moved to another round, we fall back to a full
+    recalculation. We also fall back to it if the updated statistics don't add up to the number of
+    matches of the inputs, which happens if `stage_item` is outdated.
+
+    This should be called in the same transaction as the update of the match, after acquiring the
+    ranking lock of the stage item. `match_before_update` should be the match as returned by that
+    update, so that concurrent updates of the same match add up.
+    """
+    match = next(
+        (
+            match
+            for round_ in stage_item.rounds
+            if round_.id == match_before_update.round_id and not round_.is_draft
+            for match in round_.matches
+            if match.id == match_before_update.id
+        ),
+        None,
+    )
+    ranking = await get_ranking_for_stage_item(tournament_id, stage_item.id)
+    if (
+        stage_item.type is StageType.SWISS
+        or not isinstance(match, MatchWithDetailsDefinitive)
+        or match.stage_item_input_ids
+        != [match_before_update.stage_item_input1_id, match_before_update.stage_item_input2_id]
+        or match_body.round_id != match_before_update.round_id
+        or ranking is None
+    ):
+        await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
+        return
+
+    old_match = match.model_copy(
+        update={
+            "stage_item_input1_score": match_before_update.stage_item_input1_score,
+            "stage_item_input2_score": match_before_update.stage_item_input2_score,
+        }
+    )
+    new_match = match.model_copy(
+        update={
+            "stage_item_input1_score": match_body.stage_item_input1_score,
+            "stage_item_input2_score": match_body.stage_item_input2_score,
+        }
+    )
+    delta_per_input = determine_ranking_delta_for_match(old_match, new_match, ranking, stage_item)
+
+    # The delta is added to the stored statistics in SQL, since `stage_item` can be a cached
+    # snapshot that doesn't include updates of other matches (possibly by other workers).
+    stats_per_input = await update_team_stats(
+        tournament_id,
+        {
+            stage_item_input.id: delta_per_input[stage_item_input.id]
+            for stage_item_input in stage_item.inputs
+            if stage_item_input.team_id is not None and stage_item_input.id in delta_per_input
+        },
+        add_to_existing=True,
+    )
+
+    match_count_per_input = get_match_count_per_input(stage_item)
+    if any(
+        min(stats.wins, stats.draws, stats.losses) < 0
+        or stats.wins + stats.draws + stats.losses != match_count_per_input[stage_item_input_id]
+        for stage_item_input_id, stats in stats_per_input.items()
+    ):
+        await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
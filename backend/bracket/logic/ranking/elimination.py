@@ -1,15 +1,68 @@
-from bracket.models.db.match import Match
-from bracket.models.db.stage_item_inputs import StageItemInput
+from collections import defaultdict, deque
+
+from bracket.models.db.match import Match, MatchWithDetails, MatchWithDetailsDefinitive
 from bracket.models.db.util import StageItemWithRounds
 from bracket.sql.matches import (
-    sql_set_input_ids_for_match,
+    sql_set_input_ids_for_matches,
 )
 from bracket.utils.id_types import (
     MatchId,
     RoundId,
+    TournamentId,
 )
 
 
+def propagate_winners_in_elimination_tree(
+    stage_item: StageItemWithRounds,
+    source_match_ids: list[MatchId],
+) -> dict[MatchId, MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Walks the elimination tree once, starting from the given matches, and returns the matches of
+    which an input changed (with the updated inputs).
+
+    Matches are indexed by the matches they take their winners from, so only the part of the
+    tree that depends on the source matches is visited. A match is only visited again when one of
+    its inputs changed.
+    """
+    matches_by_id = {match.id: match for round_ in stage_item.rounds for match in round_.matches}
+    dependent_matches: defaultdict[MatchId, list[tuple[int, MatchId]]] = defaultdict(list)
+    for match in matches_by_id.values():
+        for input_index, winner_from_match_id in enumerate(
+            (
+                match.stage_item_input1_winner_from_match_id,
+                match.stage_item_input2_winner_from_match_id,
+            )
+        ):
+            if winner_from_match_id is not None:
+                dependent_matches[winner_from_match_id].append((input_index, match.id))
+
+    updated_matches: dict[MatchId, MatchWithDetailsDefinitive | MatchWithDetails] = {}
+    queue = deque(source_match_ids)
+    while len(queue) > 0:
+        source_match = matches_by_id[queue.popleft()]
+        winner = source_match.get_winner()
+
+        for input_index, match_id in dependent_matches[source_match.id]:
+            match = matches_by_id[match_id]
+            inputs = [match.stage_item_input1, match.stage_item_input2]
+            if inputs[input_index] == winner:
+                continue
+
+            inputs[input_index] = winner
+            updated_match = match.model_copy(
+                update={
+                    "stage_item_input1_id": inputs[0].id if inputs[0] else None,
+                    "stage_item_input2_id": inputs[1].id if inputs[1] else None,
+                    "stage_item_input1": inputs[0],
+                    "stage_item_input2": inputs[1],
+                }
+            )
+            matches_by_id[match_id] = updated_matches[match_id] = updated_match
+            queue.append(match_id)
+
+    return updated_matches
+
+
 def get_inputs_to_update_in_subsequent_elimination_rounds(
     current_round_id: RoundId,
     stage_item: StageItemWithRounds,
@@ -22,72 +75,58 @@ def get_inputs_to_update_in_subsequent_elimination_rounds(
     rounds, because of the tree-like structure of elimination stage items.
     """
     current_round = next(round_ for round_ in stage_item.rounds if round_.id == current_round_id)
-    affected_matches: dict[MatchId, Match] = {
-        match.id: match
-        for match in current_round.matches
-        if match_ids is None or match.id in match_ids
-    }
-    subsequent_rounds = [round_ for round_ in stage_item.rounds if round_.id > current_round.id]
-    subsequent_rounds.sort(key=lambda round_: round_.id)
-    subsequent_matches = [match for round_ in subsequent_rounds for match in round_.matches]
-
-    for subsequent_match in subsequent_matches:
-        updated_inputs: list[StageItemInput | None] = [
-            subsequent_match.stage_item_input1,
-            subsequent_match.stage_item_input2,
-        ]
-        original_inputs = updated_inputs.copy()
-
-        if subsequent_match.stage_item_input1_winner_from_match_id is not None and (
-            affected_match1 := affected_matches.get(
-                subsequent_match.stage_item_input1_winner_from_match_id
-            )
-        ):
-            updated_inputs[0] = affected_match1.get_winner()
-
-        if subsequent_match.stage_item_input2_winner_from_match_id is not None and (
-            affected_match2 := affected_matches.get(
-                subsequent_match.stage_item_input2_winner_from_match_id
-            )
-        ):
-            updated_inputs[1] = affected_match2.get_winner()
-
-        if original_inputs != updated_inputs:
-            input_ids = [input_.id if input_ else None for input_ in updated_inputs]
+    return dict(
+        propagate_winners_in_elimination_tree(
+            stage_item,
+            [
+                match.id
+                for match in current_round.matches
+                if match_ids is None or match.id in match_ids
+            ],
+        )
+    )
 
-            affected_matches[subsequent_match.id] = subsequent_match.model_copy(
-                update={
-                    "stage_item_input1_id": input_ids[0],
-                    "stage_item_input2_id": input_ids[1],
-                    "stage_item_input1": updated_inputs[0],
-                    "stage_item_input2": updated_inputs[1],
-                }
-            )
 
-    # All affected matches need to be updated except for the inputs.
-    return {
-        match_id: match
-        for match_id, match in affected_matches.items()
-        if match_ids is None or match.id not in match_ids
-    }
+async def update_inputs_of_matches(
+    tournament_id: TournamentId, updates: dict[MatchId, Match]
+) -> None:
+    await sql_set_input_ids_for_matches(
+        tournament_id,
+        {
+            match_id: (match.stage_item_input1_id, match.stage_item_input2_id)
+            for match_id, match in updates.items()
+        },
+    )
 
 
 async def update_inputs_in_subsequent_elimination_rounds(
+    tournament_id: TournamentId,
     current_round_id: RoundId,
     stage_item: StageItemWithRounds,
     match_ids: set[MatchId] | None = None,
-) -> None:
+) -> set[MatchId]:
+    """
+    Returns the IDs of the matches of which an input changed.
+    """
     updates = get_inputs_to_update_in_subsequent_elimination_rounds(
         current_round_id, stage_item, match_ids
     )
-    for _, match in updates.items():
-        await sql_set_input_ids_for_match(
-            match.round_id, match.id, [match.stage_item_input1_id, match.stage_item_input2_id]
-        )
+    await update_inputs_of_matches(tournament_id, updates)
+    return set(updates.keys())
 
 
 async def update_inputs_in_complete_elimination_stage_item(
+    tournament_id: TournamentId,
     stage_item: StageItemWithRounds,
 ) -> None:
-    for round_ in stage_item.rounds:
-        await update_inputs_in_subsequent_elimination_rounds(round_.id, stage_item)
+    """
+    Propagates the winners of all matches through the elimination tree in a single pass and
+    writes the changed inputs with a single query.
+    """
+    all_match_ids = [
+        match.id
+        for round_ in sorted(stage_item.rounds, key=lambda round_: round_.id)
+        for match in round_.matches
+    ]
+    updates = propagate_winners_in_elimination_tree(stage_item, all_match_ids)
+    await update_inputs_of_matches(tournament_id, dict(updates))
@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 
+from bracket.database import database
 from bracket.logic.ranking.calculation import recalculate_ranking_for_stage_item
 from bracket.logic.scheduling.elimination import (
     build_single_elimination_stage_item,
@@ -19,7 +20,8 @@ from bracket.models.db.stage_item_inputs import (
 )
 from bracket.models.db.team import FullTeamWithPlayers
 from bracket.models.db.util import StageWithStageItems
-from bracket.sql.rounds import get_next_round_name, sql_create_round
+from bracket.sql.cache import bump_tournament_version
+from bracket.sql.rounds import get_next_round_names, sql_create_rounds
 from bracket.sql.stage_items import get_stage_item
 from bracket.utils.id_types import StageId, StageItemId, TournamentId
 from tests.integration_tests.mocks import MOCK_NOW
@@ -39,35 +41,46 @@ async def create_rounds_for_new_stage_item(
         case other:
             raise NotImplementedError(f"No round creation implementation for {other}")
 
-    for _ in range(rounds_count):
-        await sql_create_round(
+    round_names = await get_next_round_names(tournament_id, stage_item.id, rounds_count)
+    await sql_create_rounds(
+        tournament_id,
+        [
             RoundInsertable(
                 created=MOCK_NOW,
                 is_draft=False,
                 stage_item_id=stage_item.id,
-                name=await get_next_round_name(tournament_id, stage_item.id),
-            ),
-        )
+                name=name,
+            )
+            for name in round_names
+        ],
+    )
 
 
 async def build_matches_for_stage_item(stage_item: StageItem, tournament_id: TournamentId) -> None:
-    await create_rounds_for_new_stage_item(tournament_id, stage_item)
-    stage_item_with_rounds = await get_stage_item(tournament_id, stage_item.id)
-
-    match stage_item.type:
-        case StageType.ROUND_ROBIN:
-            await build_round_robin_stage_item(tournament_id, stage_item_with_rounds)
-        case StageType.SINGLE_ELIMINATION:
-            await build_single_elimination_stage_item(tournament_id, stage_item_with_rounds)
-        case StageType.SWISS:
-            return None
-
-        case _:
-            raise HTTPException(
-                400, f"Cannot automatically create matches for stage type {stage_item.type}"
-            )
-
-    await recalculate_ranking_for_stage_item(tournament_id, stage_item_with_rounds)
+    """
+    Creates all rounds and matches of a stage item in a single transaction, using multi-row
+    inserts.
+    """
+    async with database.transaction():
+        await create_rounds_for_new_stage_item(tournament_id, stage_item)
+        stage_item_with_rounds = await get_stage_item(tournament_id, stage_item.id)
+
+        match stage_item.type:
+            case StageType.ROUND_ROBIN:
+                await build_round_robin_stage_item(tournament_id, stage_item_with_rounds)
+            case StageType.SINGLE_ELIMINATION:
+                await build_single_elimination_stage_item(tournament_id, stage_item_with_rounds)
+            case StageType.SWISS:
+                return None
+
+            case _:
+                raise HTTPException(
+                    400, f"Cannot automatically create matches for stage type {stage_item.type}"
+                )
+
+    # Another request could have cached the tournament before this transaction was committed.
+    bump_tournament_version(tournament_id)
+    await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
 
 
 def determine_available_inputs(
@@ -4,8 +4,7 @@ from starlette import status
 from bracket.models.db.match import Match, MatchCreateBody
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
-from bracket.sql.matches import sql_create_match
-from bracket.sql.rounds import get_rounds_for_stage_item
+from bracket.sql.matches import sql_create_matches
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.id_types import TournamentId
 
@@ -67,22 +66,24 @@ def determine_matches_subsequent_round(
 async def build_single_elimination_stage_item(
     tournament_id: TournamentId, stage_item: StageItemWithRounds
 ) -> None:
-    rounds = await get_rounds_for_stage_item(tournament_id, stage_item.id)
+    """
+    Creates the matches of every round with a single insert per round. The IDs of the matches
+    of a round are used as `winner_from_match_id` for the matches of the next round.
+    """
+    rounds = sorted(stage_item.rounds, key=lambda round_: round_.id)
     tournament = await sql_get_tournament(tournament_id)
 
     assert len(rounds) > 0
     first_round = rounds[0]
 
-    prev_matches = [
-        await sql_create_match(match)
-        for match in determine_matches_first_round(first_round, stage_item, tournament)
-    ]
+    prev_matches = await sql_create_matches(
+        tournament_id, determine_matches_first_round(first_round, stage_item, tournament)
+    )
 
     for round_ in rounds[1:]:
-        prev_matches = [
-            await sql_create_match(match)
-            for match in determine_matches_subsequent_round(prev_matches, round_, tournament)
-        ]
+        prev_matches = await sql_create_matches(
+            tournament_id, determine_matches_subsequent_round(prev_matches, round_, tournament)
+        )
 
 
 def get_number_of_rounds_to_create_single_elimination(team_count: int) -> int:
@@ -1,18 +1,20 @@
-import itertools
 import random
+from bisect import bisect_right
 from collections import defaultdict
+from typing import NamedTuple
 
-from bracket.logic.scheduling.shared import check_input_combination_adheres_to_filter
+from bracket.logic.scheduling.matching import max_weight_matching
+from bracket.logic.scheduling.shared import get_suggested_match
 from bracket.models.db.match import (
     MatchFilter,
     MatchWithDetailsDefinitive,
     SuggestedMatch,
+    SwissPairingMode,
     get_match_hash,
 )
 from bracket.models.db.stage_item_inputs import StageItemInput, StageItemInputFinal
 from bracket.models.db.util import RoundWithMatches
 from bracket.utils.id_types import StageItemInputId
-from bracket.utils.types import assert_some
 
 
 def get_draft_round_input_ids(draft_round: RoundWithMatches) -> frozenset[StageItemInputId]:
@@ -53,15 +55,103 @@ def get_number_of_inputs_played_per_input(
     return result
 
 
+class SwissCandidate(NamedTuple):
+    times_played_sum: int
+    elo_diff: float
+    stage_item_input1: StageItemInput
+    stage_item_input2: StageItemInput
+
+
+def get_candidates_for_swiss(
+    inputs_to_schedule: list[StageItemInput],
+    previous_match_input_hashes: frozenset[str],
+    times_played_per_input: dict[int, int],
+    elo_diff_threshold: int,
+) -> list[SwissCandidate]:
+    """
+    Returns every pair of inputs that haven't played each other yet and of which the ELO differs
+    at most `elo_diff_threshold`.
+
+    Inputs are sorted by ELO, so for every input only the window of inputs with a higher ELO
+    within the threshold is visited, instead of all N * N combinations.
+    """
+    sorted_inputs = sorted(inputs_to_schedule, key=lambda input_: input_.elo)
+    elos = [float(input_.elo) for input_ in sorted_inputs]
+    candidates = []
+
+    for index1, input_low in enumerate(sorted_inputs):
+        window_end = bisect_right(elos, elos[index1] + elo_diff_threshold, lo=index1 + 1)
+        for index2 in range(index1 + 1, window_end):
+            input_high = sorted_inputs[index2]
+            input1, input2 = (
+                (input_low, input_high) if input_low.id < input_high.id else (input_high, input_low)
+            )
+            if get_match_hash(input1.id, input2.id) in previous_match_input_hashes:
+                continue
+
+            candidates.append(
+                SwissCandidate(
+                    times_played_per_input[input1.id] + times_played_per_input[input2.id],
+                    elos[index2] - elos[index1],
+                    input1,
+                    input2,
+                )
+            )
+
+    return candidates
+
+
+def get_max_weight_matching_for_swiss(
+    candidates: list[SwissCandidate], input_count: int
+) -> list[SwissCandidate]:
+    """
+    Pairs all inputs at once by solving a maximum-weight matching, instead of sampling pairs.
+
+    As many inputs as possible are paired, then the total number of times the paired inputs have
+    played is minimized and finally the total ELO difference. The result is deterministic and
+    takes O(N^3) time.
+    """
+    if len(candidates) < 1:
+        return []
+
+    vertices: dict[int, int] = {}
+    for candidate in candidates:
+        vertices.setdefault(candidate.stage_item_input1.id, len(vertices))
+        vertices.setdefault(candidate.stage_item_input2.id, len(vertices))
+
+    # Weights need to be integers, so ELO differences are rounded to hundredths. The costs are
+    # scaled such that a lower number of times played always outweighs the ELO differences of
+    # all pairs in the round.
+    elo_costs = [round(candidate.elo_diff * 100) for candidate in candidates]
+    times_played_scale = max(elo_costs) * (input_count // 2) + 1
+    costs = [
+        candidate.times_played_sum * times_played_scale + elo_cost
+        for candidate, elo_cost in zip(candidates, elo_costs, strict=True)
+    ]
+    max_cost = max(costs) + 1
+    edges = [
+        (
+            vertices[candidate.stage_item_input1.id],
+            vertices[candidate.stage_item_input2.id],
+            max_cost - cost,
+        )
+        for candidate, cost in zip(candidates, costs, strict=True)
+    ]
+
+    mate = max_weight_matching(edges, max_cardinality=True)
+    return [
+        candidate
+        for candidate, (vertex1, vertex2, _) in zip(candidates, edges, strict=True)
+        if mate[vertex1] == vertex2
+    ]
+
+
 def get_possible_upcoming_matches_for_swiss(
     filter_: MatchFilter,
     rounds: list[RoundWithMatches],
     stage_item_inputs: list[StageItemInput],
     draft_round: RoundWithMatches | None = None,
 ) -> list[SuggestedMatch]:
-    # pylint: disable=too-many-branches,unsubscriptable-object
-    suggestions: list[SuggestedMatch] = []
-    scheduled_hashes: list[str] = []
     draft_round_input_ids = get_draft_round_input_ids(draft_round) if draft_round else frozenset()
 
     inputs_to_schedule = [
@@ -83,59 +173,49 @@ def get_possible_upcoming_matches_for_swiss(
         if input_.id not in times_played_per_input:
             times_played_per_input[input_.id] = 0
 
-    # If there are more possible matches to schedule (N * (N - 1)) than iteration count, then
-    # pick random combinations.
-    # Otherwise, when there's not too many inputs, just take all possible combinations.
-    # Note: `itertools.product` creates N * N results, so we look at N * N instead of N * (N - 1).
-    # For example: iteration count: 2_000, number of inputs: 20. Then N * N = 380,
-    # 380 is less than 2_000, so we just loop over all possible combinations.
-    N = len(inputs_to_schedule)
-    Item = tuple[StageItemInput, StageItemInput]
-    inputs_iter: itertools.product[Item] | zip[Item]
-    if N * N <= filter_.iterations:
-        inputs1 = inputs_to_schedule.copy()
-        inputs2 = inputs_to_schedule.copy()
-        random.shuffle(inputs1)
-        random.shuffle(inputs2)
-        inputs_iter = itertools.product(inputs1, inputs2)
-    else:
-        inputs1 = random.choices(inputs_to_schedule, k=filter_.iterations)
-        inputs2 = random.choices(inputs_to_schedule, k=filter_.iterations)
-        inputs_iter = zip(inputs1, inputs2)
-
-    for i1, i2 in inputs_iter:
-        if assert_some(i1.id) > assert_some(i2.id):
-            input2, input1 = i1, i2
-        elif assert_some(i1.id) < assert_some(i2.id):
-            input1, input2 = i1, i2
-        else:
-            continue
-
-        match_hash = get_match_hash(input1.id, input2.id)
-        if get_match_hash(input1.id, input2.id) in previous_match_input_hashes:
-            continue
-
-        suggested_match = check_input_combination_adheres_to_filter(
-            input1,
-            input2,
-            filter_,
-            times_played_per_input[input1.id] + times_played_per_input[input2.id],
-        )
-        if suggested_match and match_hash not in scheduled_hashes:
-            suggestions.append(suggested_match)
-            scheduled_hashes.append(match_hash)
-            scheduled_hashes.append(get_match_hash(input2.id, input1.id))
+    candidates = get_candidates_for_swiss(
+        inputs_to_schedule,
+        previous_match_input_hashes,
+        times_played_per_input,
+        filter_.elo_diff_threshold,
+    )
 
-    if len(suggestions) < 1:
-        return []
+    if filter_.pairing_mode is SwissPairingMode.MAX_WEIGHT_MATCHING:
+        candidates = get_max_weight_matching_for_swiss(candidates, len(inputs_to_schedule))
+    elif len(candidates) > filter_.iterations:
+        # Only look at a random selection of `iterations` candidates when there are too many.
+        candidates = random.sample(candidates, filter_.iterations)
+
+    return get_suggestions_from_candidates(filter_, candidates)
 
-    lowest_times_played_sum = min(sug.times_played_sum for sug in suggestions)
-    for sug in suggestions:
-        sug.is_recommended = sug.times_played_sum == lowest_times_played_sum
 
+def get_suggestions_from_candidates(
+    filter_: MatchFilter, candidates: list[SwissCandidate]
+) -> list[SuggestedMatch]:
+    """
+    Sorts candidates by the number of times played and then by ELO difference, and only builds
+    `SuggestedMatch` models for the first `filter_.limit` candidates.
+    """
+    if len(candidates) < 1:
+        return []
+
+    lowest_times_played_sum = min(candidate.times_played_sum for candidate in candidates)
     if filter_.only_recommended:
-        suggestions = [sug for sug in suggestions if sug.is_recommended]
+        candidates = [
+            candidate
+            for candidate in candidates
+            if candidate.times_played_sum == lowest_times_played_sum
+        ]
+
+    candidates = sorted(
+        candidates, key=lambda candidate: (candidate.times_played_sum, candidate.elo_diff)
+    )
+    suggestions = []
+    for candidate in candidates[: filter_.limit]:
+        suggestion = get_suggested_match(
+            candidate.stage_item_input1, candidate.stage_item_input2, candidate.times_played_sum
+        )
+        suggestion.is_recommended = candidate.times_played_sum == lowest_times_played_sum
+        suggestions.append(suggestion)
 
-    sorted_by_elo = sorted(suggestions, key=lambda x: x.elo_diff)
-    sorted_by_times_played = sorted(sorted_by_elo, key=lambda x: x.times_played_sum)
-    return sorted_by_times_played[: filter_.limit]
+    return suggestions
@@ -0,0 +1,455 @@
+"""
+Maximum-weight matching in general graphs, using Edmonds' blossom algorithm.
+
+This follows the O(n^3) formulation from Zvi Galil, "Efficient algorithms for finding maximum
+matching in graphs" (ACM Computing Surveys, 1986), as implemented by Joris van Rantwijk.
+Only integer weights are supported, so that all computations are exact.
+"""
+
+# pylint: disable=too-many-locals,too-many-statements,too-many-branches,too-many-nested-blocks
+from collections.abc import Iterator
+
+
+def max_weight_matching(
+    edges: list[tuple[int, int, int]], *, max_cardinality: bool = False
+) -> list[int]:
+    """
+    Computes a matching of maximum weight for the undirected graph given by `edges`, which are
+    tuples of (vertex, vertex, weight). Vertices are numbered 0 up to and including the largest
+    vertex in `edges`.
+
+    If `max_cardinality` is True, only maximum-cardinality matchings are considered, so the
+    result has the maximum weight among all matchings with the largest number of edges.
+
+    Returns a list `mate` such that `mate[v] == w` if vertex `v` is matched to vertex `w`, and
+    `mate[v] == -1` if vertex `v` is not matched.
+    """
+    if len(edges) < 1:
+        return []
+
+    edge_count = len(edges)
+    vertex_count = 1 + max(max(v, w) for v, w, _ in edges)
+    assert all(0 <= v != w >= 0 for v, w, _ in edges), "Invalid edge"
+    max_weight = max(0, *(weight for _, _, weight in edges))
+
+    # Edge k has endpoints 2k and 2k + 1, `endpoint[p]` is the vertex of endpoint p.
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * edge_count)]
+    # For every vertex: the remote endpoints of its incident edges.
+    neighbour_endpoints: list[list[int]] = [[] for _ in range(vertex_count)]
+    for k, (v, w, _) in enumerate(edges):
+        neighbour_endpoints[v].append(2 * k + 1)
+        neighbour_endpoints[w].append(2 * k)
+
+    # The remote endpoint of the matched edge of every vertex, or -1 if it's single.
+    mate = [-1] * vertex_count
+
+    # Vertices are numbered 0..n-1, (non-trivial) blossoms n..2n-1. Labels: 0 is unlabeled,
+    # 1 is an S-vertex/blossom, 2 is a T-vertex/blossom.
+    label = [0] * (2 * vertex_count)
+    label_end = [-1] * (2 * vertex_count)
+    in_blossom = list(range(vertex_count))
+    blossom_parent = [-1] * (2 * vertex_count)
+    blossom_children: list[list[int]] = [[] for _ in range(2 * vertex_count)]
+    blossom_base = list(range(vertex_count)) + [-1] * vertex_count
+    blossom_endpoints: list[list[int]] = [[] for _ in range(2 * vertex_count)]
+    best_edge = [-1] * (2 * vertex_count)
+    blossom_best_edges: list[list[int] | None] = [None] * (2 * vertex_count)
+    unused_blossoms = list(range(vertex_count, 2 * vertex_count))
+
+    # Dual variables are stored at twice their value, such that they remain integers.
+    dual_var = [max_weight] * vertex_count + [0] * vertex_count
+    allow_edge = [False] * edge_count
+    queue: list[int] = []
+
+    def slack(k: int) -> int:
+        v, w, weight = edges[k]
+        return dual_var[v] + dual_var[w] - 2 * weight
+
+    def blossom_leaves(b: int) -> Iterator[int]:
+        if b < vertex_count:
+            yield b
+        else:
+            for child in blossom_children[b]:
+                yield from blossom_leaves(child)
+
+    def assign_label(w: int, t: int, p: int) -> None:
+        b = in_blossom[w]
+        assert label[w] == 0 and label[b] == 0
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        else:
+            # The mate of the base of a T-blossom becomes an S-vertex.
+            base = blossom_base[b]
+            assert mate[base] >= 0
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v: int, w: int) -> int:
+        """
+        Traces back from S-vertices v and w to find either a new blossom (returns its base)
+        or an augmenting path (returns -1).
+        """
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+
+            assert label[b] == 1
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                assert label[b] == 2
+                v = endpoint[label_end[b]]
+
+            if w != -1:
+                v, w = w, v
+
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base: int, k: int) -> None:
+        v, w, _ = edges[k]
+        bb = in_blossom[base]
+        bv = in_blossom[v]
+        bw = in_blossom[w]
+
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[bb] = b
+        blossom_children[b] = path = []
+        blossom_endpoints[b] = endpoints = []
+
+        while bv != bb:
+            blossom_parent[bv] = b
+            path.append(bv)
+            endpoints.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+
+        path.append(bb)
+        path.reverse()
+        endpoints.reverse()
+        endpoints.append(2 * k)
+
+        while bw != bb:
+            blossom_parent[bw] = b
+            path.append(bw)
+            endpoints.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+
+        assert label[bb] == 1
+        label[b] = 1
+        label_end[b] = label_end[bb]
+        dual_var[b] = 0
+
+        for leaf in blossom_leaves(b):
+            if label[in_blossom[leaf]] == 2:
+                queue.append(leaf)
+            in_blossom[leaf] = b
+
+        # Compute the least-slack edges to neighbouring S-blossoms.
+        best_edge_to = [-1] * (2 * vertex_count)
+        for child in path:
+            child_best_edges = blossom_best_edges[child]
+            neighbour_lists = (
+                [[p // 2 for p in neighbour_endpoints[leaf]] for leaf in blossom_leaves(child)]
+                if child_best_edges is None
+                else [child_best_edges]
+            )
+            for neighbour_list in neighbour_lists:
+                for edge in neighbour_list:
+                    i, j, _ = edges[edge]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if (
+                        bj != b
+                        and label[bj] == 1
+                        and (best_edge_to[bj] == -1 or slack(edge) < slack(best_edge_to[bj]))
+                    ):
+                        best_edge_to[bj] = edge
+
+            blossom_best_edges[child] = None
+            best_edge[child] = -1
+
+        blossom_best_edges[b] = [edge for edge in best_edge_to if edge != -1]
+        best_edge[b] = -1
+        for edge in blossom_best_edges[b] or []:
+            if best_edge[b] == -1 or slack(edge) < slack(best_edge[b]):
+                best_edge[b] = edge
+
+    def expand_blossom(b: int, end_stage: bool) -> None:
+        for child in blossom_children[b]:
+            blossom_parent[child] = -1
+            if child < vertex_count:
+                in_blossom[child] = child
+            elif end_stage and dual_var[child] == 0:
+                expand_blossom(child, end_stage)
+            else:
+                for leaf in blossom_leaves(child):
+                    in_blossom[leaf] = child
+
+        # If we expand a T-blossom during a stage, its children must be relabeled.
+        if not end_stage and label[b] == 2:
+            entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+            j = blossom_children[b].index(entry_child)
+            if j & 1:
+                j -= len(blossom_children[b])
+                j_step = 1
+                endpoint_trick = 0
+            else:
+                j_step = -1
+                endpoint_trick = 1
+
+            p = label_end[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allow_edge[blossom_endpoints[b][j - endpoint_trick] // 2] = True
+                j += j_step
+                p = blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick
+                allow_edge[p // 2] = True
+                j += j_step
+
+            bv = blossom_children[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            label_end[endpoint[p ^ 1]] = label_end[bv] = p
+            best_edge[bv] = -1
+            j += j_step
+
+            while blossom_children[b][j] != entry_child:
+                bv = blossom_children[b][j]
+                if label[bv] == 1:
+                    j += j_step
+                    continue
+
+                reached_leaf = next((leaf for leaf in blossom_leaves(bv) if label[leaf] != 0), None)
+                if reached_leaf is not None:
+                    assert label[reached_leaf] == 2
+                    assert in_blossom[reached_leaf] == bv
+                    label[reached_leaf] = 0
+                    label[endpoint[mate[blossom_base[bv]]]] = 0
+                    assign_label(reached_leaf, 2, label_end[reached_leaf])
+                j += j_step
+
+        label[b] = label_end[b] = -1
+        blossom_children[b] = []
+        blossom_endpoints[b] = []
+        blossom_base[b] = -1
+        blossom_best_edges[b] = None
+        best_edge[b] = -1
+        unused_blossoms.append(b)
+
+    def augment_blossom(b: int, v: int) -> None:
+        """
+        Swaps matched/unmatched edges over an alternating path through blossom b between
+        vertex v and the base of b.
+        """
+        t = v
+        while blossom_parent[t] != b:
+            t = blossom_parent[t]
+        if t >= vertex_count:
+            augment_blossom(t, v)
+
+        i = j = blossom_children[b].index(t)
+        if i & 1:
+            j -= len(blossom_children[b])
+            j_step = 1
+            endpoint_trick = 0
+        else:
+            j_step = -1
+            endpoint_trick = 1
+
+        while j != 0:
+            j += j_step
+            t = blossom_children[b][j]
+            p = blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick
+            if t >= vertex_count:
+                augment_blossom(t, endpoint[p])
+            j += j_step
+            t = blossom_children[b][j]
+            if t >= vertex_count:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+
+        blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+        blossom_endpoints[b] = blossom_endpoints[b][i:] + blossom_endpoints[b][:i]
+        blossom_base[b] = blossom_base[blossom_children[b][0]]
+        assert blossom_base[b] == v
+
+    def augment_matching(k: int) -> None:
+        v, w, _ = edges[k]
+        for start, start_endpoint in ((v, 2 * k + 1), (w, 2 * k)):
+            s, p = start, start_endpoint
+            while True:
+                bs = in_blossom[s]
+                assert label[bs] == 1
+                if bs >= vertex_count:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break
+
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                assert label[bt] == 2
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                assert blossom_base[bt] == t
+                if bt >= vertex_count:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    # Every stage either augments the matching by one edge or finishes the algorithm.
+    for _ in range(vertex_count):
+        label[:] = [0] * (2 * vertex_count)
+        best_edge[:] = [-1] * (2 * vertex_count)
+        blossom_best_edges[vertex_count:] = [None] * vertex_count
+        allow_edge[:] = [False] * edge_count
+        queue[:] = []
+
+        for v in range(vertex_count):
+            if mate[v] == -1 and label[in_blossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while len(queue) > 0 and not augmented:
+                v = queue.pop()
+                assert label[in_blossom[v]] == 1
+
+                for p in neighbour_endpoints[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if in_blossom[v] == in_blossom[w]:
+                        continue
+
+                    k_slack = 0
+                    if not allow_edge[k]:
+                        k_slack = slack(k)
+                        if k_slack <= 0:
+                            allow_edge[k] = True
+
+                    if allow_edge[k]:
+                        if label[in_blossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[in_blossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            assert label[in_blossom[w]] == 2
+                            label[w] = 2
+                            label_end[w] = p ^ 1
+                    elif label[in_blossom[w]] == 1:
+                        b = in_blossom[v]
+                        if best_edge[b] == -1 or k_slack < slack(best_edge[b]):
+                            best_edge[b] = k
+                    elif label[w] == 0:
+                        if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                            best_edge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path was found, so update the dual variables.
+            delta_type = -1
+            delta = delta_edge = delta_blossom = 0
+
+            if not max_cardinality:
+                delta_type = 1
+                delta = min(dual_var[:vertex_count])
+
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 0 and best_edge[v] != -1:
+                    d = slack(best_edge[v])
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 2
+                        delta_edge = best_edge[v]
+
+            for b in range(2 * vertex_count):
+                if blossom_parent[b] == -1 and label[b] == 1 and best_edge[b] != -1:
+                    k_slack = slack(best_edge[b])
+                    assert k_slack % 2 == 0
+                    d = k_slack // 2
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 3
+                        delta_edge = best_edge[b]
+
+            for b in range(vertex_count, 2 * vertex_count):
+                if (
+                    blossom_base[b] >= 0
+                    and blossom_parent[b] == -1
+                    and label[b] == 2
+                    and (delta_type == -1 or dual_var[b] < delta)
+                ):
+                    delta = dual_var[b]
+                    delta_type = 4
+                    delta_blossom = b
+
+            if delta_type == -1:
+                # No further improvement is possible, the matching has maximum cardinality.
+                assert max_cardinality
+                delta_type = 1
+                delta = max(0, min(dual_var[:vertex_count]))
+
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 1:
+                    dual_var[v] -= delta
+                elif label[in_blossom[v]] == 2:
+                    dual_var[v] += delta
+
+            for b in range(vertex_count, 2 * vertex_count):
+                if blossom_base[b] >= 0 and blossom_parent[b] == -1:
+                    if label[b] == 1:
+                        dual_var[b] += delta
+                    elif label[b] == 2:
+                        dual_var[b] -= delta
+
+            if delta_type == 1:
+                break
+            if delta_type in (2, 3):
+                allow_edge[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                if label[in_blossom[i]] == 0:
+                    i, j = j, i
+                assert label[in_blossom[i]] == 1
+                queue.append(i)
+            else:
+                expand_blossom(delta_blossom, False)
+
+        if not augmented:
+            break
+
+        # Expand S-blossoms with zero dual variable at the end of every stage.
+        for b in range(vertex_count, 2 * vertex_count):
+            if (
+                blossom_parent[b] == -1
+                and blossom_base[b] >= 0
+                and label[b] == 1
+                and dual_var[b] == 0
+            ):
+                expand_blossom(b, True)
+
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
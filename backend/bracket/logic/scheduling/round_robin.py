@@ -2,7 +2,7 @@ from bracket.models.db.match import (
     MatchCreateBody,
 )
 from bracket.models.db.util import StageItemWithRounds
-from bracket.sql.matches import sql_create_match
+from bracket.sql.matches import sql_create_matches
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.id_types import TournamentId
 
@@ -40,6 +40,7 @@ async def build_round_robin_stage_item(
 ) -> None:
     matches = get_round_robin_combinations(stage_item.team_count)
     tournament = await sql_get_tournament(tournament_id)
+    matches_to_create = []
 
     for i, round_ in enumerate(stage_item.rounds):
         for team_1_id, team_2_id in matches[i]:
@@ -49,19 +50,22 @@ async def build_round_robin_stage_item(
                     stage_item.inputs[team_2_id],
                 )
 
-                match = MatchCreateBody(
-                    round_id=round_.id,
-                    stage_item_input1_id=stage_item_1.id,
-                    stage_item_input1_winner_from_match_id=None,
-                    stage_item_input2_id=stage_item_2.id,
-                    stage_item_input2_winner_from_match_id=None,
-                    court_id=None,
-                    duration_minutes=tournament.duration_minutes,
-                    margin_minutes=tournament.margin_minutes,
-                    custom_duration_minutes=None,
-                    custom_margin_minutes=None,
+                matches_to_create.append(
+                    MatchCreateBody(
+                        round_id=round_.id,
+                        stage_item_input1_id=stage_item_1.id,
+                        stage_item_input1_winner_from_match_id=None,
+                        stage_item_input2_id=stage_item_2.id,
+                        stage_item_input2_winner_from_match_id=None,
+                        court_id=None,
+                        duration_minutes=tournament.duration_minutes,
+                        margin_minutes=tournament.margin_minutes,
+                        custom_duration_minutes=None,
+                        custom_margin_minutes=None,
+                    )
                 )
-                await sql_create_match(match)
+
+    await sql_create_matches(tournament_id, matches_to_create)
 
 
 def get_number_of_rounds_to_create_round_robin(team_count: int) -> int:
@@ -4,7 +4,7 @@ from bracket.logic.scheduling.ladder_teams import get_possible_upcoming_matches_
 from bracket.models.db.match import MatchFilter, SuggestedMatch
 from bracket.models.db.stage_item import StageType
 from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.stage_items import get_stage_item
 from bracket.utils.id_types import StageItemId, TournamentId
 
 
@@ -12,17 +12,9 @@ async def get_draft_round_in_stage_item(
     tournament_id: TournamentId,
     stage_item_id: StageItemId,
 ) -> tuple[RoundWithMatches, StageItemWithRounds]:
-    [stage] = await get_full_tournament_details(tournament_id, stage_item_ids={stage_item_id})
-    draft_round, stage_item = next(
-        (
-            (round_, stage_item)
-            for stage_item in stage.stage_items
-            for round_ in stage_item.rounds
-            if round_.is_draft
-        ),
-        (None, None),
-    )
-    if draft_round is None or stage_item is None:
+    stage_item = await get_stage_item(tournament_id, stage_item_id)
+    draft_round = next((round_ for round_ in stage_item.rounds if round_.is_draft), None)
+    if draft_round is None:
         raise HTTPException(400, "There is no draft round, so no matches can be scheduled.")
     return draft_round, stage_item
 
@@ -41,3 +33,38 @@ def get_upcoming_matches_for_swiss(
     return get_possible_upcoming_matches_for_swiss(
         match_filter, stage_item.rounds, stage_item.inputs, draft_round
     )
+
+
+def get_matches_for_swiss_round(
+    match_filter: MatchFilter,
+    stage_item: StageItemWithRounds,
+    match_count: int,
+    draft_round: RoundWithMatches | None = None,
+) -> list[SuggestedMatch]:
+    """
+    Selects up to `match_count` matches for a round from a single computation of suggestions.
+
+    Suggestions are ordered from best to worst, so taking the best suggestion that doesn't
+    involve an input that already has a match is equivalent to recomputing the suggestions
+    after every selected match. This also holds for `only_recommended`, since the recommended
+    suggestions are always the ones that come first.
+    """
+    all_suggestions = get_upcoming_matches_for_swiss(
+        match_filter.model_copy(
+            update={"limit": len(stage_item.inputs) ** 2, "only_recommended": False}
+        ),
+        stage_item,
+        draft_round,
+    )
+
+    matches: list[SuggestedMatch] = []
+    scheduled_input_ids: set[int] = set()
+    for suggestion in all_suggestions:
+        if len(matches) >= match_count:
+            break
+
+        if scheduled_input_ids.isdisjoint(suggestion.stage_item_input_ids):
+            matches.append(suggestion)
+            scheduled_input_ids.update(suggestion.stage_item_input_ids)
+
+    return matches
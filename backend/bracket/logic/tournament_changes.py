@@ -0,0 +1,101 @@
+from collections import defaultdict
+
+from bracket.config import config
+from bracket.models.db.tournament_change import TournamentChanges
+from bracket.sql.stages import filter_tournament_details, sql_get_full_tournament_details
+from bracket.sql.tournament_changes import (
+    sql_get_change_log_bounds,
+    sql_get_courts_by_ids,
+    sql_get_latest_tournament_change_id,
+    sql_get_matches_with_details_by_ids,
+    sql_get_rounds_by_ids,
+    sql_get_stage_item_inputs_by_ids,
+    sql_get_tournament_changes,
+)
+from bracket.utils.id_types import CourtId, MatchId, RoundId, StageItemInputId, TeamId, TournamentId
+
+# Changes to the structure of a tournament are rare, clients fetch the whole tournament again.
+SNAPSHOT_ENTITIES = frozenset({"stages", "stage_items"})
+
+
+async def get_tournament_snapshot(
+    tournament_id: TournamentId, *, no_draft_rounds: bool
+) -> TournamentChanges:
+    # The version is determined first, so that the snapshot is at least as new as the version.
+    # The snapshot is read from the database, since the cache of this worker can be older than
+    # the change log (until the notification of a change by another worker arrives).
+    version = await sql_get_latest_tournament_change_id(tournament_id)
+    stages = filter_tournament_details(
+        await sql_get_full_tournament_details(tournament_id), no_draft_rounds=no_draft_rounds
+    )
+    return TournamentChanges(version=version, stages=stages)
+
+
+async def get_tournament_changes(
+    tournament_id: TournamentId, since: int, *, no_draft_rounds: bool
+) -> TournamentChanges:
+    """
+    Returns the matches, rounds, stage item inputs and courts that changed after version `since`.
+
+    A full snapshot is returned instead if the client doesn't have a version yet, if changes it
+    hasn't seen were already removed from the log, if there are more than
+    `config.max_tournament_changes` changes, or if stages or stage items changed.
+
+    Changes to teams are returned as changes to the stage item inputs of these teams. Changes
+    to players, rankings and the tournament itself are not part of the stages of a tournament
+    and are skipped.
+    """
+    oldest_id, latest_id = await sql_get_change_log_bounds()
+    if since < 1 or since < oldest_id - 1 or since > latest_id:
+        return await get_tournament_snapshot(tournament_id, no_draft_rounds=no_draft_rounds)
+
+    changes = await sql_get_tournament_changes(
+        tournament_id, since, config.max_tournament_changes + 1
+    )
+    if len(changes) > config.max_tournament_changes or any(
+        change.entity in SNAPSHOT_ENTITIES for change in changes
+    ):
+        return await get_tournament_snapshot(tournament_id, no_draft_rounds=no_draft_rounds)
+
+    changed_ids: defaultdict[str, set[int]] = defaultdict(set)
+    for change in changes:
+        changed_ids[change.entity].add(change.entity_id)
+
+    match_ids = {MatchId(id_) for id_ in changed_ids["matches"]}
+    round_ids = {RoundId(id_) for id_ in changed_ids["rounds"]}
+    stage_item_input_ids = {StageItemInputId(id_) for id_ in changed_ids["stage_item_inputs"]}
+    team_ids = {TeamId(id_) for id_ in changed_ids["teams"]}
+    court_ids = {CourtId(id_) for id_ in changed_ids["courts"]}
+
+    matches = (
+        await sql_get_matches_with_details_by_ids(
+            tournament_id, match_ids, round_ids, no_draft_rounds=no_draft_rounds
+        )
+        if match_ids or round_ids
+        else []
+    )
+    rounds = (
+        await sql_get_rounds_by_ids(tournament_id, round_ids, no_draft_rounds=no_draft_rounds)
+        if round_ids
+        else []
+    )
+    stage_item_inputs = (
+        await sql_get_stage_item_inputs_by_ids(tournament_id, stage_item_input_ids, team_ids)
+        if stage_item_input_ids or team_ids
+        else []
+    )
+    courts = await sql_get_courts_by_ids(tournament_id, court_ids) if court_ids else []
+
+    return TournamentChanges(
+        version=changes[-1].id if changes else since,
+        matches=matches,
+        rounds=rounds,
+        stage_item_inputs=stage_item_inputs,
+        courts=courts,
+        deleted_match_ids=sorted(match_ids - {match.id for match in matches}),
+        deleted_round_ids=sorted(round_ids - {round_.id for round_ in rounds}),
+        deleted_stage_item_input_ids=sorted(
+            stage_item_input_ids - {input_.id for input_ in stage_item_inputs}
+        ),
+        deleted_court_ids=sorted(court_ids - {court.id for court in courts}),
+    )
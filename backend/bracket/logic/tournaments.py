@@ -29,15 +29,15 @@ async def sql_delete_tournament_completely(tournament_id: TournamentId) -> None:
 
     for stage in stages:
         for stage_item in stage.stage_items:
-            await sql_delete_stage_item_matches(stage_item.id)
+            await sql_delete_stage_item_matches(tournament_id, stage_item.id)
 
     for stage in stages:
         for stage_item in stage.stage_items:
-            await sql_delete_stage_item_relations(stage_item.id)
+            await sql_delete_stage_item_relations(tournament_id, stage_item.id)
 
     for stage in stages:
         for stage_item in stage.stage_items:
-            await sql_delete_stage_item(stage_item.id)
+            await sql_delete_stage_item(tournament_id, stage_item.id)
 
         await sql_delete_stage(tournament_id, stage.id)
 
@@ -1,13 +1,14 @@
 from decimal import Decimal
+from enum import auto
 
 from heliclockter import datetime_utc, timedelta
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from bracket.models.db.court import Court
 from bracket.models.db.shared import BaseModelORM
 from bracket.models.db.stage_item_inputs import StageItemInput
 from bracket.utils.id_types import CourtId, MatchId, RoundId, StageItemInputId
-from bracket.utils.types import assert_some
+from bracket.utils.types import EnumAutoStr, assert_some
 
 
 class MatchBaseInsertable(BaseModelORM):
@@ -118,11 +119,37 @@ class MatchRescheduleBody(BaseModelORM):
     new_position: int
 
 
+class MatchMoveBody(MatchRescheduleBody):
+    match_id: MatchId
+
+
+class ScheduleSimulationBody(BaseModelORM):
+    start_time: datetime_utc | None = None
+    duration_minutes: int | None = Field(default=None, ge=1)
+    margin_minutes: int | None = Field(default=None, ge=0)
+    move: MatchMoveBody | None = None
+    schedule_unscheduled_matches: bool = False
+    extra_court_count: int = Field(default=0, ge=0)
+    min_rest_minutes: int = Field(default=0, ge=0)
+
+
+class MatchDelayBody(BaseModelORM):
+    court_id: CourtId
+    actual_end_time: datetime_utc
+    shift_dependent_matches: bool = False
+
+
+class SwissPairingMode(EnumAutoStr):
+    RANDOM_SAMPLING = auto()
+    MAX_WEIGHT_MATCHING = auto()
+
+
 class MatchFilter(BaseModel):
     elo_diff_threshold: int
     only_recommended: bool
     limit: int
     iterations: int
+    pairing_mode: SwissPairingMode = SwissPairingMode.RANDOM_SAMPLING
 
 
 class SuggestedMatch(BaseModel):
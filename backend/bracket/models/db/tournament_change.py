@@ -0,0 +1,38 @@
+from heliclockter import datetime_utc
+from pydantic import BaseModel
+
+from bracket.models.db.court import Court
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.round import Round
+from bracket.models.db.shared import BaseModelORM
+from bracket.models.db.stage_item_inputs import StageItemInput
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.id_types import CourtId, MatchId, RoundId, StageItemInputId, TournamentId
+
+
+class TournamentChange(BaseModelORM):
+    id: int
+    created: datetime_utc
+    tournament_id: TournamentId
+    entity: str
+    entity_id: int
+
+
+class TournamentChanges(BaseModel):
+    """
+    The entities that changed since the version the client has, or a full snapshot in `stages`
+    if the client is too far behind.
+
+    Entities that were deleted (or that are no longer visible) are listed in `deleted_*`.
+    """
+
+    version: int
+    stages: list[StageWithStageItems] | None = None
+    matches: list[MatchWithDetailsDefinitive | MatchWithDetails] = []
+    rounds: list[Round] = []
+    stage_item_inputs: list[StageItemInput] = []
+    courts: list[Court] = []
+    deleted_match_ids: list[MatchId] = []
+    deleted_round_ids: list[RoundId] = []
+    deleted_stage_item_input_ids: list[StageItemInputId] = []
+    deleted_court_ids: list[CourtId] = []
@@ -17,10 +17,11 @@ class RoundWithMatches(Round):
 
     @field_validator("matches", mode="before")
     @staticmethod
-    def handle_matches(values: list[Match]) -> list[Match]:
-        if values == [None]:
+    def handle_matches(values: list[Match] | str) -> list[Match]:
+        matches: list[Match] = json.loads(values) if isinstance(values, str) else values
+        if matches == [None]:
             return []
-        return values
+        return matches
 
 
 class StageItemWithRounds(StageItem):
@@ -41,7 +42,10 @@ class StageItemWithRounds(StageItem):
 
     @field_validator("rounds", "inputs", mode="before")
     @staticmethod
-    def handle_empty_list_elements(values: list[Any] | None) -> list[Any]:
+    def handle_empty_list_elements(values: list[Any] | str | None) -> list[Any]:
+        if isinstance(values, str):
+            values = json.loads(values)
+
         if values is None:
             return []
         return [value for value in values if value is not None]
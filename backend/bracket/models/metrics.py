@@ -7,7 +7,11 @@ from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
 
+from bracket.database import pool_metrics
+from bracket.utils.cache import LRUCache
 from bracket.utils.http import HTTPMethod
+from bracket.utils.query_metrics import Histogram, query_metrics
+from bracket.utils.security import password_hashing_pool
 from bracket.utils.starlette import get_route_path
 from bracket.utils.types import EnumAutoStr
 
@@ -62,6 +66,15 @@ class MetricDefinition(BaseModel):
 
         return result
 
+    def format_histograms_for_prometheus(
+        self, histograms: list[tuple[dict[str, str], Histogram]]
+    ) -> str:
+        result = f"# HELP {self.name} {self.description}\n# TYPE {self.name} {self.type_.value}\n"
+        for labels, histogram in histograms:
+            result += histogram.to_prometheus(self.name, labels)
+
+        return result
+
 
 METRIC_DEFINITIONS = [
     MetricDefinition(
@@ -79,6 +92,56 @@ METRIC_DEFINITIONS = [
         description="Requests count per endpoint",
         type_=PrometheusMetricType.counter,
     ),
+    MetricDefinition(
+        name="bracket_cache_hits",
+        description="Cache hits per in-memory cache",
+        type_=PrometheusMetricType.counter,
+    ),
+    MetricDefinition(
+        name="bracket_cache_misses",
+        description="Cache misses per in-memory cache",
+        type_=PrometheusMetricType.counter,
+    ),
+    MetricDefinition(
+        name="bracket_cache_size",
+        description="Number of entries per in-memory cache",
+        type_=PrometheusMetricType.gauge,
+    ),
+    MetricDefinition(
+        name="bracket_password_hashing_queue_depth",
+        description="Number of password hashes waiting for a free thread",
+        type_=PrometheusMetricType.gauge,
+    ),
+    MetricDefinition(
+        name="bracket_db_pool_size",
+        description="Number of open connections in the database pool",
+        type_=PrometheusMetricType.gauge,
+    ),
+    MetricDefinition(
+        name="bracket_db_pool_utilisation",
+        description="Fraction of the maximum number of database connections that is in use",
+        type_=PrometheusMetricType.gauge,
+    ),
+    MetricDefinition(
+        name="bracket_db_pool_acquire_count",
+        description="Number of times a connection was taken from the database pool",
+        type_=PrometheusMetricType.counter,
+    ),
+    MetricDefinition(
+        name="bracket_db_pool_wait_seconds",
+        description="Total time spent waiting for a connection of the database pool",
+        type_=PrometheusMetricType.counter,
+    ),
+    MetricDefinition(
+        name="bracket_query_duration_seconds",
+        description="Duration of database queries per query fingerprint",
+        type_=PrometheusMetricType.histogram,
+    ),
+    MetricDefinition(
+        name="bracket_queries_per_request",
+        description="Number of database queries per request per endpoint",
+        type_=PrometheusMetricType.histogram,
+    ),
 ]
 
 
@@ -95,6 +158,32 @@ class RequestMetrics(BaseModel):
                 [m.to_value_lookup(v) for m, v in self.request_count.items()]
             ),
             METRIC_DEFINITIONS[2].format_for_prometheus(1.0),
+            METRIC_DEFINITIONS[3].format_for_prometheus_per_label(
+                [({"cache": name}, c.hits) for name, c in LRUCache.registry.items()]
+            ),
+            METRIC_DEFINITIONS[4].format_for_prometheus_per_label(
+                [({"cache": name}, c.misses) for name, c in LRUCache.registry.items()]
+            ),
+            METRIC_DEFINITIONS[5].format_for_prometheus_per_label(
+                [({"cache": name}, len(c)) for name, c in LRUCache.registry.items()]
+            ),
+            METRIC_DEFINITIONS[6].format_for_prometheus(password_hashing_pool.queue_depth),
+            METRIC_DEFINITIONS[7].format_for_prometheus(pool_metrics.size),
+            METRIC_DEFINITIONS[8].format_for_prometheus(pool_metrics.utilisation),
+            METRIC_DEFINITIONS[9].format_for_prometheus(pool_metrics.acquire_count),
+            METRIC_DEFINITIONS[10].format_for_prometheus(pool_metrics.acquire_wait_seconds),
+            METRIC_DEFINITIONS[11].format_histograms_for_prometheus(
+                [
+                    ({"fingerprint": fingerprint}, histogram)
+                    for fingerprint, histogram in query_metrics.duration_per_fingerprint.items()
+                ]
+            ),
+            METRIC_DEFINITIONS[12].format_histograms_for_prometheus(
+                [
+                    ({"url": url, "method": method}, histogram)
+                    for (method, url), histogram in query_metrics.queries_per_request.items()
+                ]
+            ),
         ]
         return "\n".join(metrics)
 
@@ -13,11 +13,12 @@ from bracket.database import database
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.user import UserInDB, UserPublic
 from bracket.schema import tournaments
+from bracket.sql.cache import user_by_email_cache
 from bracket.sql.tournaments import sql_get_tournament_by_endpoint_name
 from bracket.sql.users import get_user, get_user_access_to_club, get_user_access_to_tournament
 from bracket.utils.db import fetch_all_parsed
 from bracket.utils.id_types import ClubId, TournamentId, UserId
-from bracket.utils.security import verify_password
+from bracket.utils.security import verify_password_async
 from bracket.utils.types import assert_some
 
 router = APIRouter(prefix=config.api_prefix)
@@ -56,7 +57,7 @@ class TokenData(BaseModel):
 async def authenticate_user(email: str, password: str) -> UserInDB | None:
     user = await get_user(email)
 
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await verify_password_async(password, user.password_hash):
         return None
 
     return user
@@ -79,11 +80,17 @@ async def check_jwt_and_get_user(token: str) -> UserPublic | None:
     except (DecodeError, ExpiredSignatureError):
         return None
 
-    user = await get_user(email=assert_some(token_data.email))
+    email = assert_some(token_data.email)
+    user = user_by_email_cache.get(email)
     if user is None:
-        return None
+        user_in_db = await get_user(email=email)
+        if user_in_db is None:
+            return None
 
-    return UserPublic.model_validate(user.model_dump())
+        user = UserPublic.model_validate(user_in_db.model_dump())
+        user_by_email_cache.set(email, user)
+
+    return user
 
 
 async def user_authenticated(token: str = Depends(oauth2_scheme)) -> UserPublic:
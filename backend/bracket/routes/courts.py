@@ -13,8 +13,9 @@ from bracket.routes.auth import (
     user_authenticated_or_public_dashboard,
 )
 from bracket.routes.models import CourtsResponse, SingleCourtResponse, SuccessResponse
-from bracket.routes.util import disallow_archived_tournament
+from bracket.routes.util import disallow_archived_tournament, tournament_etag_dependency
 from bracket.schema import courts
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.courts import get_all_courts_in_tournament, sql_delete_court, update_court
 from bracket.sql.stages import get_full_tournament_details
 from bracket.utils.db import fetch_one_parsed
@@ -28,6 +29,7 @@ router = APIRouter(prefix=config.api_prefix)
 async def get_courts(
     tournament_id: TournamentId,
     _: UserPublic = Depends(user_authenticated_or_public_dashboard),
+    __: str = Depends(tournament_etag_dependency),
 ) -> CourtsResponse:
     return CourtsResponse(data=await get_all_courts_in_tournament(tournament_id))
 
@@ -102,6 +104,7 @@ async def create_court(
             tournament_id=tournament_id,
         ).model_dump(),
     )
+    bump_tournament_version(tournament_id)
     return SingleCourtResponse(
         data=assert_some(
             await fetch_one_parsed(
@@ -2,15 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException
 from starlette import status
 
 from bracket.config import config
-from bracket.logic.planning.conflicts import handle_conflicts
+from bracket.database import database
+from bracket.logic.events import TournamentEventType, publish_tournament_event
+from bracket.logic.planning.conflicts import get_conflict_index, update_conflicts_for_matches
+from bracket.logic.planning.delays import MatchDelayPropagation
 from bracket.logic.planning.matches import (
+    get_matches_reordered_for_court,
     get_scheduled_matches,
     handle_match_reschedule,
-    reorder_matches_for_court,
-    schedule_all_unscheduled_matches,
+    write_rescheduled_matches,
 )
+from bracket.logic.planning.scheduler import schedule_all_unscheduled_matches
+from bracket.logic.planning.simulation import simulate_schedule
 from bracket.logic.ranking.calculation import (
     recalculate_ranking_for_stage_item,
+    update_ranking_for_match_result,
 )
 from bracket.logic.ranking.elimination import update_inputs_in_subsequent_elimination_rounds
 from bracket.logic.scheduling.upcoming_matches import (
@@ -22,16 +28,28 @@ from bracket.models.db.match import (
     MatchBody,
     MatchCreateBody,
     MatchCreateBodyFrontend,
+    MatchDelayBody,
     MatchFilter,
     MatchRescheduleBody,
+    ScheduleSimulationBody,
+    SwissPairingMode,
 )
 from bracket.models.db.stage_item import StageType
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.user import UserPublic
 from bracket.routes.auth import user_authenticated_for_tournament
-from bracket.routes.models import SingleMatchResponse, SuccessResponse, UpcomingMatchesResponse
+from bracket.routes.models import (
+    ScheduleMatchesResponse,
+    ScheduleSimulationResponse,
+    SingleMatchResponse,
+    SuccessResponse,
+    UpcomingMatchesResponse,
+)
 from bracket.routes.util import disallow_archived_tournament, match_dependency
+from bracket.schema import AdvisoryLockNamespace
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.courts import get_all_courts_in_tournament
+from bracket.sql.locks import lock_until_end_of_transaction
 from bracket.sql.matches import sql_create_match, sql_delete_match, sql_update_match
 from bracket.sql.rounds import get_round_by_id
 from bracket.sql.stage_items import get_stage_item
@@ -54,6 +72,7 @@ async def get_matches_to_schedule(
     elo_diff_threshold: int = 200,
     iterations: int = 2_000,
     only_recommended: bool = False,
+    pairing_mode: SwissPairingMode = SwissPairingMode.RANDOM_SAMPLING,
     limit: int = 50,
     _: UserPublic = Depends(user_authenticated_for_tournament),
 ) -> UpcomingMatchesResponse:
@@ -62,6 +81,7 @@ async def get_matches_to_schedule(
         only_recommended=only_recommended,
         limit=limit,
         iterations=iterations,
+        pairing_mode=pairing_mode,
     )
 
     draft_round, stage_item = await get_draft_round_in_stage_item(tournament_id, stage_item_id)
@@ -90,11 +110,8 @@ async def delete_match(
             detail="Can only delete matches from draft rounds in Swiss stage items",
         )
 
-    await sql_delete_match(match.id)
-
-    stage_item = await get_stage_item(tournament_id, round_.stage_item_id)
-
-    await recalculate_ranking_for_stage_item(tournament_id, stage_item)
+    await sql_delete_match(tournament_id, match.id)
+    await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
     return SuccessResponse()
 
 
@@ -123,18 +140,45 @@ async def create_match(
         margin_minutes=tournament.margin_minutes,
     )
 
-    return SingleMatchResponse(data=await sql_create_match(body_with_durations))
+    return SingleMatchResponse(data=await sql_create_match(tournament_id, body_with_durations))
 
 
-@router.post("/tournaments/{tournament_id}/schedule_matches", response_model=SuccessResponse)
+@router.post(
+    "/tournaments/{tournament_id}/schedule_matches", response_model=ScheduleMatchesResponse
+)
 async def schedule_matches(
     tournament_id: TournamentId,
     _: UserPublic = Depends(user_authenticated_for_tournament),
     __: Tournament = Depends(disallow_archived_tournament),
-) -> SuccessResponse:
+    min_rest_minutes: int = 0,
+) -> ScheduleMatchesResponse:
     stages = await get_full_tournament_details(tournament_id)
-    await schedule_all_unscheduled_matches(tournament_id, stages)
-    return SuccessResponse()
+    schedule_result = await schedule_all_unscheduled_matches(
+        tournament_id, stages, min_rest_minutes
+    )
+    publish_tournament_event(tournament_id, TournamentEventType.MATCHES_RESCHEDULED)
+    return ScheduleMatchesResponse(data=schedule_result)
+
+
+@router.post(
+    "/tournaments/{tournament_id}/simulate_schedule", response_model=ScheduleSimulationResponse
+)
+async def simulate_schedule_of_matches(
+    tournament_id: TournamentId,
+    body: ScheduleSimulationBody,
+    _: UserPublic = Depends(user_authenticated_for_tournament),
+) -> ScheduleSimulationResponse:
+    """
+    Previews the schedule after changing the durations and margins, moving a match or adding
+    courts, without storing anything.
+    """
+    await check_foreign_keys_belong_to_tournament(body, tournament_id)
+    tournament = await sql_get_tournament(tournament_id)
+    courts = await get_all_courts_in_tournament(tournament_id)
+    stages = await get_full_tournament_details(tournament_id)
+    return ScheduleSimulationResponse(
+        data=simulate_schedule(tournament, [court.id for court in courts], stages, body)
+    )
 
 
 @router.post(
@@ -148,8 +192,48 @@ async def reschedule_match(
     _: UserPublic = Depends(user_authenticated_for_tournament),
 ) -> SuccessResponse:
     await check_foreign_keys_belong_to_tournament(body, tournament_id)
-    await handle_match_reschedule(tournament, body, match_id)
-    await handle_conflicts(await get_full_tournament_details(tournament_id))
+    stages = await get_full_tournament_details(tournament_id)
+    conflict_index = get_conflict_index(tournament_id, stages)
+    rescheduled_matches = await handle_match_reschedule(tournament, body, match_id, stages)
+    await update_conflicts_for_matches(tournament_id, conflict_index, rescheduled_matches)
+    publish_tournament_event(
+        tournament_id,
+        TournamentEventType.MATCHES_RESCHEDULED,
+        [match.id for match in rescheduled_matches],
+    )
+    return SuccessResponse()
+
+
+@router.post(
+    "/tournaments/{tournament_id}/matches/{match_id}/delay", response_model=SuccessResponse
+)
+async def delay_match(
+    tournament_id: TournamentId,
+    match_id: MatchId,
+    body: MatchDelayBody,
+    tournament: Tournament = Depends(disallow_archived_tournament),
+    _: UserPublic = Depends(user_authenticated_for_tournament),
+    match: Match = Depends(match_dependency),
+) -> SuccessResponse:
+    await check_foreign_keys_belong_to_tournament(body, tournament_id)
+    if match.court_id != body.court_id or match.start_time is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Match is not scheduled on this court",
+        )
+
+    stages = await get_full_tournament_details(tournament_id)
+    conflict_index = get_conflict_index(tournament_id, stages)
+    shifted_matches = MatchDelayPropagation(stages, tournament).delay_match(
+        match_id, body.actual_end_time, body.shift_dependent_matches
+    )
+    changed_matches = await write_rescheduled_matches(tournament_id, stages, shifted_matches)
+    await update_conflicts_for_matches(tournament_id, conflict_index, changed_matches)
+    publish_tournament_event(
+        tournament_id,
+        TournamentEventType.MATCHES_RESCHEDULED,
+        [match.id for match in changed_matches],
+    )
     return SuccessResponse()
 
 
@@ -165,21 +249,55 @@ async def update_match_by_id(
     await check_foreign_keys_belong_to_tournament(match_body, tournament_id)
     tournament = await sql_get_tournament(tournament_id)
 
-    await sql_update_match(match_id, match_body, tournament)
-
     round_ = await get_round_by_id(tournament_id, match.round_id)
-    stage_item = await get_stage_item(tournament_id, round_.stage_item_id)
-    await recalculate_ranking_for_stage_item(tournament_id, stage_item)
 
+    async with database.transaction():
+        await lock_until_end_of_transaction(
+            AdvisoryLockNamespace.STAGE_ITEM_RANKING, round_.stage_item_id
+        )
+        match_before_update = await sql_update_match(match_id, match_body, tournament)
+        if match_before_update is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Could not find match with id {match_id}",
+            )
+
+        stage_item = await get_stage_item(tournament_id, round_.stage_item_id)
+        await update_ranking_for_match_result(
+            tournament_id, stage_item, match_before_update, match_body
+        )
+
+    # Another request could have cached the tournament before this transaction was committed.
+    bump_tournament_version(tournament_id)
+
+    rescheduled_matches = []
     if (
-        match_body.custom_duration_minutes != match.custom_duration_minutes
-        or match_body.custom_margin_minutes != match.custom_margin_minutes
+        match_body.custom_duration_minutes != match_before_update.custom_duration_minutes
+        or match_body.custom_margin_minutes != match_before_update.custom_margin_minutes
     ):
         tournament = await sql_get_tournament(tournament_id)
-        scheduled_matches = get_scheduled_matches(await get_full_tournament_details(tournament_id))
-        await reorder_matches_for_court(tournament, scheduled_matches, assert_some(match.court_id))
+        stages = await get_full_tournament_details(tournament_id)
+        rescheduled_matches = await write_rescheduled_matches(
+            tournament_id,
+            stages,
+            get_matches_reordered_for_court(
+                tournament, get_scheduled_matches(stages), assert_some(match_before_update.court_id)
+            ),
+        )
 
+    updated_match_ids = {match_id}
     if stage_item.type == StageType.SINGLE_ELIMINATION:
-        await update_inputs_in_subsequent_elimination_rounds(round_.id, stage_item, {match_id})
+        updated_match_ids |= await update_inputs_in_subsequent_elimination_rounds(
+            tournament_id, round_.id, stage_item, {match_id}
+        )
 
+    publish_tournament_event(
+        tournament_id, TournamentEventType.MATCH_UPDATED, sorted(updated_match_ids)
+    )
+    if len(rescheduled_matches) > 0:
+        publish_tournament_event(
+            tournament_id,
+            TournamentEventType.MATCHES_RESCHEDULED,
+            [match.id for match in rescheduled_matches],
+        )
     return SuccessResponse()
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from bracket.logic.planning.scheduler import ScheduleResult
+from bracket.logic.planning.simulation import ScheduleSimulation
 from bracket.logic.scheduling.handle_stage_activation import StageItemInputUpdate
 from bracket.models.db.club import Club
 from bracket.models.db.court import Court
@@ -12,6 +14,7 @@ from bracket.models.db.stage_item_inputs import (
 )
 from bracket.models.db.team import FullTeamWithPlayers, Team
 from bracket.models.db.tournament import Tournament
+from bracket.models.db.tournament_change import TournamentChanges
 from bracket.models.db.user import UserPublic
 from bracket.models.db.util import StageWithStageItems
 from bracket.routes.auth import Token
@@ -59,6 +62,10 @@ class StagesWithStageItemsResponse(DataResponse[list[StageWithStageItems]]):
     pass
 
 
+class TournamentChangesResponse(DataResponse[TournamentChanges]):
+    pass
+
+
 class UpcomingMatchesResponse(DataResponse[list[SuggestedMatch]]):
     pass
 
@@ -67,6 +74,14 @@ class SingleMatchResponse(DataResponse[Match]):
     pass
 
 
+class ScheduleMatchesResponse(DataResponse[ScheduleResult]):
+    pass
+
+
+class ScheduleSimulationResponse(DataResponse[ScheduleSimulation]):
+    pass
+
+
 class PaginatedTeams(BaseModel):
     count: int
     teams: list[FullTeamWithPlayers]
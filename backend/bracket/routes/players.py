@@ -15,6 +15,7 @@ from bracket.routes.models import (
 )
 from bracket.routes.util import disallow_archived_tournament
 from bracket.schema import players
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.players import (
     get_all_players_in_tournament,
     get_player_count,
@@ -60,6 +61,7 @@ async def update_player_by_id(
         ),
         values=player_body.model_dump(),
     )
+    bump_tournament_version(tournament_id)
     return SinglePlayerResponse(
         data=assert_some(
             await fetch_one_parsed(
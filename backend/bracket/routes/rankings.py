@@ -18,7 +18,7 @@ from bracket.routes.models import (
     RankingsResponse,
     SuccessResponse,
 )
-from bracket.routes.util import disallow_archived_tournament
+from bracket.routes.util import disallow_archived_tournament, tournament_etag_dependency
 from bracket.sql.rankings import (
     get_all_rankings_in_tournament,
     sql_create_ranking,
@@ -36,6 +36,7 @@ router = APIRouter(prefix=config.api_prefix)
 async def get_rankings(
     tournament_id: TournamentId,
     _: UserPublic = Depends(user_authenticated_or_public_dashboard),
+    __: str = Depends(tournament_etag_dependency),
 ) -> RankingsResponse:
     return RankingsResponse(data=await get_all_rankings_in_tournament(tournament_id))
 
@@ -56,10 +57,10 @@ async def update_ranking_by_id(
     stage_item_ids = await get_stage_item_input_ids_by_ranking_id(ranking_id)
     for stage_item_id in stage_item_ids:
         stage_item = await get_stage_item(tournament_id, stage_item_id)
-        await recalculate_ranking_for_stage_item(tournament_id, stage_item)
+        await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
 
         if stage_item.type == StageType.SINGLE_ELIMINATION:
-            await update_inputs_in_complete_elimination_stage_item(stage_item)
+            await update_inputs_in_complete_elimination_stage_item(tournament_id, stage_item)
     return SuccessResponse()
 
 
@@ -3,6 +3,7 @@ from starlette import status
 
 from bracket.config import config
 from bracket.database import database
+from bracket.logic.events import TournamentEventType, publish_tournament_event
 from bracket.logic.ranking.calculation import (
     recalculate_ranking_for_stage_item,
 )
@@ -23,6 +24,7 @@ from bracket.routes.util import (
     round_dependency,
     round_with_matches_dependency,
 )
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.matches import sql_delete_match
 from bracket.sql.rounds import (
     get_next_round_name,
@@ -48,12 +50,11 @@ async def delete_round(
     round_with_matches: RoundWithMatches = Depends(round_with_matches_dependency),
 ) -> SuccessResponse:
     for match in round_with_matches.matches:
-        await sql_delete_match(match.id)
+        await sql_delete_match(tournament_id, match.id)
 
-    await sql_delete_round(round_id)
+    await sql_delete_round(tournament_id, round_id)
 
-    stage_item = await get_stage_item(tournament_id, round_with_matches.stage_item_id)
-    await recalculate_ranking_for_stage_item(tournament_id, stage_item)
+    await recalculate_ranking_for_stage_item(tournament_id, round_with_matches.stage_item_id)
     return SuccessResponse()
 
 
@@ -84,6 +85,7 @@ async def create_round(
         )
 
     round_id = await sql_create_round(
+        tournament_id,
         RoundInsertable(
             created=MOCK_NOW,
             is_draft=False,
@@ -126,4 +128,7 @@ async def update_round_by_id(
             "is_draft": round_body.is_draft,
         },
     )
+    bump_tournament_version(tournament_id)
+    if not round_body.is_draft:
+        publish_tournament_event(tournament_id, TournamentEventType.ROUND_ACTIVATED, [round_id])
     return SuccessResponse()
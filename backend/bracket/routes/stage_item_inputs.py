@@ -17,6 +17,7 @@ from bracket.routes.auth import (
 )
 from bracket.routes.models import SuccessResponse
 from bracket.routes.util import disallow_archived_tournament, stage_item_dependency
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.stage_item_inputs import get_stage_item_input_by_id
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.teams import get_team_by_id
@@ -112,4 +113,5 @@ async def update_stage_item_input(
                 else None,
             },
         )
+    bump_tournament_version(tournament_id)
     return SuccessResponse()
@@ -4,8 +4,13 @@ from starlette import status
 
 from bracket.config import config
 from bracket.database import database
-from bracket.logic.planning.conflicts import handle_conflicts
-from bracket.logic.planning.matches import update_start_times_of_matches
+from bracket.logic.events import TournamentEventType, publish_tournament_event
+from bracket.logic.planning.conflicts import get_conflict_index, update_conflicts_for_matches
+from bracket.logic.planning.matches import (
+    get_rescheduled_match,
+    update_start_times_of_matches,
+    write_rescheduled_matches,
+)
 from bracket.logic.planning.rounds import (
     MatchTimingAdjustmentInfeasible,
     get_all_scheduling_operations_for_swiss_round,
@@ -18,9 +23,13 @@ from bracket.logic.ranking.elimination import (
 from bracket.logic.scheduling.builder import (
     build_matches_for_stage_item,
 )
-from bracket.logic.scheduling.upcoming_matches import get_upcoming_matches_for_swiss
+from bracket.logic.scheduling.upcoming_matches import get_matches_for_swiss_round
 from bracket.logic.subscriptions import check_requirement
-from bracket.models.db.match import MatchCreateBody, MatchFilter, SuggestedMatch
+from bracket.models.db.match import (
+    MatchCreateBody,
+    MatchFilter,
+    SwissPairingMode,
+)
 from bracket.models.db.round import RoundInsertable
 from bracket.models.db.stage_item import (
     StageItemActivateNextBody,
@@ -36,20 +45,18 @@ from bracket.routes.auth import (
 )
 from bracket.routes.models import SuccessResponse
 from bracket.routes.util import disallow_archived_tournament, stage_item_dependency
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.courts import get_all_courts_in_tournament
 from bracket.sql.matches import (
-    sql_create_match,
-    sql_reschedule_match_and_determine_duration_and_margin,
+    sql_create_matches,
 )
 from bracket.sql.rounds import (
     get_next_round_name,
-    get_round_by_id,
     set_round_active_or_draft,
     sql_create_round,
 )
 from bracket.sql.shared import sql_delete_stage_item_with_foreign_keys
 from bracket.sql.stage_items import (
-    get_stage_item,
     sql_create_stage_item_with_empty_inputs,
 )
 from bracket.sql.stages import get_full_tournament_details
@@ -76,7 +83,7 @@ async def delete_stage_item(
     with check_foreign_key_violation(
         {ForeignKey.matches_stage_item_input1_id_fkey, ForeignKey.matches_stage_item_input2_id_fkey}
     ):
-        await sql_delete_stage_item_with_foreign_keys(stage_item_id)
+        await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_id)
     await update_start_times_of_matches(tournament_id)
     return SuccessResponse()
 
@@ -124,9 +131,10 @@ async def update_stage_item(
         query=query,
         values={"stage_item_id": stage_item_id, "name": stage_item_body.name},
     )
-    await recalculate_ranking_for_stage_item(tournament_id, stage_item)
+    bump_tournament_version(tournament_id)
+    await recalculate_ranking_for_stage_item(tournament_id, stage_item.id)
     if stage_item.type == StageType.SINGLE_ELIMINATION:
-        await update_inputs_in_complete_elimination_stage_item(stage_item)
+        await update_inputs_in_complete_elimination_stage_item(tournament_id, stage_item)
     return SuccessResponse()
 
 
@@ -143,6 +151,7 @@ async def start_next_round(
     elo_diff_threshold: int = 200,
     iterations: int = 2_000,
     only_recommended: bool = False,
+    pairing_mode: SwissPairingMode = SwissPairingMode.RANDOM_SAMPLING,
     _: Tournament = Depends(disallow_archived_tournament),
 ) -> SuccessResponse:
     draft_round = get_draft_round(stage_item)
@@ -157,9 +166,11 @@ async def start_next_round(
         only_recommended=only_recommended,
         limit=1,
         iterations=iterations,
+        pairing_mode=pairing_mode,
     )
-    all_matches_to_schedule = get_upcoming_matches_for_swiss(match_filter, stage_item)
-    if len(all_matches_to_schedule) < 1:
+    courts = await get_all_courts_in_tournament(tournament_id)
+    matches_to_schedule = get_matches_for_swiss_round(match_filter, stage_item, max(len(courts), 1))
+    if len(matches_to_schedule) < 1:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No more matches to schedule, all combinations of teams have been added already",
@@ -173,8 +184,10 @@ async def start_next_round(
         for round_ in stage_item.rounds
     ]
     check_requirement(existing_rounds, user, "max_rounds")
+    conflict_index = get_conflict_index(tournament_id, stages)
 
     round_id = await sql_create_round(
+        tournament_id,
         RoundInsertable(
             created=datetime_utc.now(),
             is_draft=True,
@@ -182,27 +195,12 @@ async def start_next_round(
             name=await get_next_round_name(tournament_id, stage_item_id),
         ),
     )
-    draft_round = await get_round_by_id(tournament_id, round_id)
     tournament = await sql_get_tournament(tournament_id)
-    courts = await get_all_courts_in_tournament(tournament_id)
-
-    limit = len(courts) - len(draft_round.matches)
-    for ___ in range(limit):
-        stage_item = await get_stage_item(tournament_id, stage_item_id)
-        draft_round = next(round_ for round_ in stage_item.rounds if round_.is_draft)
-        all_matches_to_schedule = get_upcoming_matches_for_swiss(
-            match_filter, stage_item, draft_round
-        )
-        if len(all_matches_to_schedule) < 1:
-            break
-
-        match = all_matches_to_schedule[0]
-        assert isinstance(match, SuggestedMatch)
-
-        assert draft_round.id and match.stage_item_input1.id and match.stage_item_input2.id
-        await sql_create_match(
+    await sql_create_matches(
+        tournament_id,
+        [
             MatchCreateBody(
-                round_id=draft_round.id,
+                round_id=round_id,
                 stage_item_input1_id=match.stage_item_input1.id,
                 stage_item_input2_id=match.stage_item_input2.id,
                 court_id=None,
@@ -212,21 +210,29 @@ async def start_next_round(
                 margin_minutes=tournament.margin_minutes,
                 custom_duration_minutes=None,
                 custom_margin_minutes=None,
-            ),
-        )
+            )
+            for match in matches_to_schedule[: len(courts)]
+        ],
+    )
 
-    draft_round = await get_round_by_id(tournament_id, round_id)
+    stages = await get_full_tournament_details(tournament_id)
+    draft_round = next(
+        round_
+        for stage in stages
+        for stage_item in stage.stage_items
+        for round_ in stage_item.rounds
+        if round_.id == round_id
+    )
     try:
-        stages = await get_full_tournament_details(tournament_id)
         court_ids = [court.id for court in courts]
 
         rescheduling_operations = get_all_scheduling_operations_for_swiss_round(
             court_ids, stages, tournament, draft_round.matches, active_next_body.adjust_to_time
         )
 
-        # TODO: if safe: await asyncio.gather(*rescheduling_operations)
-        for op in rescheduling_operations:
-            await sql_reschedule_match_and_determine_duration_and_margin(*op)
+        rescheduled_matches = await write_rescheduled_matches(
+            tournament_id, stages, [get_rescheduled_match(*op) for op in rescheduling_operations]
+        )
     except MatchTimingAdjustmentInfeasible as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -234,5 +240,8 @@ async def start_next_round(
         ) from exc
 
     await set_round_active_or_draft(draft_round.id, tournament_id, is_draft=False)
-    await handle_conflicts(await get_full_tournament_details(tournament_id))
+    await update_conflicts_for_matches(
+        tournament_id, conflict_index, [*draft_round.matches, *rescheduled_matches]
+    )
+    publish_tournament_event(tournament_id, TournamentEventType.ROUND_ACTIVATED, [round_id])
     return SuccessResponse()
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from starlette import status
+from starlette.responses import Response
 
 from bracket.config import config
 from bracket.database import database
+from bracket.logic.events import TournamentEventType, publish_tournament_event
 from bracket.logic.scheduling.builder import determine_available_inputs
 from bracket.logic.scheduling.handle_stage_activation import (
     get_updates_to_inputs_in_activated_stage,
@@ -10,6 +12,7 @@ from bracket.logic.scheduling.handle_stage_activation import (
     update_matches_in_deactivated_stage,
 )
 from bracket.logic.subscriptions import check_requirement
+from bracket.logic.tournament_changes import get_tournament_changes
 from bracket.models.db.stage import Stage, StageActivateBody, StageUpdateBody
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.user import UserPublic
@@ -23,8 +26,19 @@ from bracket.routes.models import (
     StageRankingResponse,
     StagesWithStageItemsResponse,
     SuccessResponse,
+    TournamentChangesResponse,
+)
+from bracket.routes.util import (
+    disallow_archived_tournament,
+    stage_dependency,
+    tournament_etag_dependency,
+)
+from bracket.sql.cache import (
+    bump_tournament_version,
+    get_cached_stages_response,
+    get_tournament_version,
+    set_cached_stages_response,
 )
-from bracket.routes.util import disallow_archived_tournament, stage_dependency
 from bracket.sql.stages import (
     get_full_tournament_details,
     get_next_stage_in_tournament,
@@ -34,6 +48,7 @@ from bracket.sql.stages import (
 )
 from bracket.sql.teams import get_teams_with_members
 from bracket.utils.id_types import StageId, TournamentId
+from bracket.utils.starlette import JSONBytesResponse
 
 router = APIRouter(prefix=config.api_prefix)
 
@@ -43,15 +58,45 @@ async def get_stages(
     tournament_id: TournamentId,
     user: UserPublic = Depends(user_authenticated_or_public_dashboard),
     no_draft_rounds: bool = False,
-) -> StagesWithStageItemsResponse:
+    etag: str = Depends(tournament_etag_dependency),
+) -> Response:
     if no_draft_rounds is False and user is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Can't view draft rounds when not authorized",
         )
 
-    stages_ = await get_full_tournament_details(tournament_id, no_draft_rounds=no_draft_rounds)
-    return StagesWithStageItemsResponse(data=stages_)
+    # The response is serialized once per version of the tournament, since it's polled often.
+    content = get_cached_stages_response(tournament_id, no_draft_rounds)
+    if content is None:
+        version = get_tournament_version(tournament_id)
+        stages_ = await get_full_tournament_details(tournament_id, no_draft_rounds=no_draft_rounds)
+        content = StagesWithStageItemsResponse(data=stages_).model_dump_json().encode()
+        set_cached_stages_response(tournament_id, no_draft_rounds, version, content)
+
+    return JSONBytesResponse(content, headers={"ETag": etag})
+
+
+@router.get("/tournaments/{tournament_id}/changes", response_model=TournamentChangesResponse)
+async def get_changes(
+    tournament_id: TournamentId,
+    user: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+    since: int = 0,
+    no_draft_rounds: bool = False,
+) -> TournamentChangesResponse:
+    """
+    Returns the matches, rounds, stage item inputs and courts that changed since the version
+    returned by the previous call, or all stages if `since` is too old.
+    """
+    if no_draft_rounds is False and user is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Can't view draft rounds when not authorized",
+        )
+
+    return TournamentChangesResponse(
+        data=await get_tournament_changes(tournament_id, since, no_draft_rounds=no_draft_rounds)
+    )
 
 
 @router.delete("/tournaments/{tournament_id}/stages/{stage_id}", response_model=SuccessResponse)
@@ -112,6 +157,7 @@ async def update_stage(
         query=query,
         values={**values, "name": stage_body.name},
     )
+    bump_tournament_version(tournament_id)
     return SuccessResponse()
 
 
@@ -139,6 +185,9 @@ async def activate_next_stage(
             await update_matches_in_deactivated_stage(tournament_id, deactivated_stage)
 
     await sql_activate_next_stage(new_active_stage_id, tournament_id)
+    publish_tournament_event(
+        tournament_id, TournamentEventType.STAGE_ACTIVATED, [new_active_stage_id]
+    )
     return SuccessResponse()
 
 
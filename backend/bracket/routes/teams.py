@@ -35,8 +35,10 @@ from bracket.routes.util import (
     disallow_archived_tournament,
     team_dependency,
     team_with_players_dependency,
+    tournament_etag_dependency,
 )
 from bracket.schema import players_x_teams, teams
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.players import get_all_players_in_tournament, insert_player
 from bracket.sql.teams import (
     get_team_by_id,
@@ -75,6 +77,7 @@ async def update_team_members(
             & (players_x_teams.c.team_id == team_id)
         ),
     )
+    bump_tournament_version(tournament_id)
 
 
 @router.get("/tournaments/{tournament_id}/teams", response_model=TeamsWithPlayersResponse)
@@ -82,6 +85,7 @@ async def get_teams(
     tournament_id: TournamentId,
     pagination: PaginationTeams = Depends(),
     _: UserPublic = Depends(user_authenticated_or_public_dashboard),
+    __: str = Depends(tournament_etag_dependency),
 ) -> TeamsWithPlayersResponse:
     return TeamsWithPlayersResponse(
         data=PaginatedTeams(
@@ -157,6 +161,7 @@ async def update_team_logo(
         teams.update().where(teams.c.id == team.id),
         values={"logo_path": filename},
     )
+    bump_tournament_version(tournament_id)
     return SingleTeamResponse(data=assert_some(await get_team_by_id(team.id, tournament_id)))
 
 
@@ -242,4 +247,5 @@ async def create_multiple_teams(
                 player_body = PlayerBody(name=player, active=team_body.active)
                 await insert_player(player_body, tournament_id)
 
+    bump_tournament_version(tournament_id)
     return SuccessResponse()
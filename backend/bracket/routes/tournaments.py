@@ -5,9 +5,11 @@ from uuid import uuid4
 import aiofiles.os
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
 from starlette import status
+from starlette.responses import StreamingResponse
 
 from bracket.config import config
 from bracket.database import database
+from bracket.logic.events import stream_tournament_events
 from bracket.logic.planning.matches import update_start_times_of_matches
 from bracket.logic.subscriptions import check_requirement
 from bracket.logic.tournaments import get_tournament_logo_path
@@ -26,8 +28,9 @@ from bracket.routes.auth import (
     user_authenticated_or_public_dashboard_by_endpoint_name,
 )
 from bracket.routes.models import SuccessResponse, TournamentResponse, TournamentsResponse
-from bracket.routes.util import disallow_archived_tournament
+from bracket.routes.util import disallow_archived_tournament, tournament_etag_dependency
 from bracket.schema import tournaments
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.rankings import (
     get_all_rankings_in_tournament,
     sql_create_ranking,
@@ -65,11 +68,28 @@ unauthorized_exception = HTTPException(
 async def get_tournament(
     tournament_id: TournamentId,
     user: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+    _: str = Depends(tournament_etag_dependency),
 ) -> TournamentResponse:
     tournament = await sql_get_tournament(tournament_id)
     return TournamentResponse(data=tournament)
 
 
+@router.get("/tournaments/{tournament_id}/events", response_class=StreamingResponse)
+async def get_tournament_events(
+    tournament_id: TournamentId,
+    _: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> StreamingResponse:
+    """
+    Streams changes to matches, rounds and stages of the tournament as server-sent events, so
+    that dashboards don't have to poll.
+    """
+    return StreamingResponse(
+        stream_tournament_events(tournament_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/tournaments", response_model=TournamentsResponse)
 async def get_tournaments(
     user: UserPublic | None = Depends(user_authenticated_or_public_dashboard_by_endpoint_name),
@@ -214,4 +234,5 @@ async def upload_logo(
         tournaments.update().where(tournaments.c.id == tournament_id),
         values={"logo_path": filename},
     )
+    bump_tournament_version(tournament_id)
     return TournamentResponse(data=await sql_get_tournament(tournament_id))
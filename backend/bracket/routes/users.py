@@ -30,7 +30,7 @@ from bracket.sql.users import (
     update_user_password,
 )
 from bracket.utils.id_types import UserId
-from bracket.utils.security import hash_password, verify_captcha_token
+from bracket.utils.security import hash_password_async, verify_captcha_token
 from bracket.utils.types import assert_some
 
 router = APIRouter(prefix=config.api_prefix)
@@ -73,7 +73,7 @@ async def put_user_password(
 ) -> SuccessResponse:
     if user_public.id != user_id:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Can't change details of this user")
-    await update_user_password(user_public.id, hash_password(user_to_update.password))
+    await update_user_password(user_public.id, await hash_password_async(user_to_update.password))
     return SuccessResponse()
 
 
@@ -87,7 +87,7 @@ async def register_user(user_to_register: UserToRegister) -> TokenResponse:
 
     user = UserInsertable(
         email=user_to_register.email,
-        password_hash=hash_password(user_to_register.password),
+        password_hash=await hash_password_async(user_to_register.password),
         name=user_to_register.name,
         created=datetime_utc.now(),
         account_type=UserAccountType.REGULAR,
@@ -118,7 +118,7 @@ async def register_demo_user(user_to_register: DemoUserToRegister) -> TokenRespo
     username = f"demo-{uuid4()}"
     user = UserInsertable(
         email=f"{username}@example.org",
-        password_hash=hash_password(str(uuid4())),
+        password_hash=await hash_password_async(str(uuid4())),
         name=username,
         created=datetime_utc.now(),
         account_type=UserAccountType.DEMO,
@@ -1,4 +1,4 @@
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
 from starlette import status
 
 from bracket.database import database
@@ -8,9 +8,10 @@ from bracket.models.db.team import FullTeamWithPlayers, Team
 from bracket.models.db.tournament import Tournament, TournamentStatus
 from bracket.models.db.util import RoundWithMatches, StageItemWithRounds, StageWithStageItems
 from bracket.schema import matches, rounds, teams
+from bracket.sql.cache import get_tournament_etag
 from bracket.sql.rounds import get_round_by_id
 from bracket.sql.stage_items import get_stage_item
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.stages import get_stage_with_stage_items
 from bracket.sql.teams import get_teams_with_members
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.db import fetch_one_parsed
@@ -40,17 +41,15 @@ async def round_with_matches_dependency(
 
 
 async def stage_dependency(tournament_id: TournamentId, stage_id: StageId) -> StageWithStageItems:
-    stages_result = await get_full_tournament_details(
-        tournament_id, no_draft_rounds=False, stage_id=stage_id
-    )
+    stage = await get_stage_with_stage_items(tournament_id, stage_id)
 
-    if len(stages_result) < 1:
+    if stage is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Could not find stage with id {stage_id}",
         )
 
-    return stages_result[0]
+    return stage
 
 
 async def stage_item_dependency(
@@ -117,3 +116,21 @@ async def disallow_archived_tournament(tournament_id: TournamentId) -> Tournamen
         )
 
     return tournament
+
+
+async def tournament_etag_dependency(
+    request: Request, response: Response, tournament_id: TournamentId
+) -> str:
+    """
+    Sets the ETag of a read endpoint to the version of the tournament, and responds with
+    304 Not Modified if the client already has this version, without querying anything.
+
+    Should come after the authentication dependency, so unauthorized clients don't get a 304.
+    """
+    etag = get_tournament_etag(tournament_id)
+    if_none_match = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag in if_none_match or "*" in if_none_match:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return etag
@@ -1,4 +1,17 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table, UniqueConstraint, func
+from enum import IntEnum
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    UniqueConstraint,
+    event,
+    func,
+)
 from sqlalchemy.orm import declarative_base  # type: ignore[attr-defined]
 from sqlalchemy.sql.sqltypes import BigInteger, Boolean, DateTime, Enum, Float, Text
 
@@ -104,7 +117,7 @@ rounds = Table(
     Column("name", Text, nullable=False),
     Column("created", DateTimeTZ, nullable=False, server_default=func.now()),
     Column("is_draft", Boolean, nullable=False),
-    Column("stage_item_id", BigInteger, ForeignKey("stage_items.id"), nullable=False),
+    Column("stage_item_id", BigInteger, ForeignKey("stage_items.id"), index=True, nullable=False),
 )
 
 
@@ -118,7 +131,7 @@ matches = Table(
     Column("margin_minutes", Integer, nullable=True),
     Column("custom_duration_minutes", Integer, nullable=True),
     Column("custom_margin_minutes", Integer, nullable=True),
-    Column("round_id", BigInteger, ForeignKey("rounds.id"), nullable=False),
+    Column("round_id", BigInteger, ForeignKey("rounds.id"), index=True, nullable=False),
     Column("stage_item_input1_id", BigInteger, ForeignKey("stage_item_inputs.id"), nullable=True),
     Column("stage_item_input2_id", BigInteger, ForeignKey("stage_item_inputs.id"), nullable=True),
     Column("stage_item_input1_conflict", Boolean, nullable=False),
@@ -238,3 +251,125 @@ rankings = Table(
     Column("loss_points", Float, nullable=False),
     Column("add_score_points", Boolean, nullable=False),
 )
+
+# Append-only log of changes to tournaments, written by the trigger below. The id of the last
+# change is the version of a tournament that is used by `GET /tournaments/{tournament_id}/changes`.
+tournament_changes = Table(
+    "tournament_changes",
+    metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("created", DateTimeTZ, nullable=False, server_default=func.now(), index=True),
+    Column("tournament_id", BigInteger, nullable=False),
+    Column("entity", String, nullable=False),
+    Column("entity_id", BigInteger, nullable=False),
+    Index("ix_tournament_changes_tournament_id_id", "tournament_id", "id"),
+)
+
+
+class AdvisoryLockNamespace(IntEnum):
+    """
+    First key of the two-key advisory locks, so that locks of different kinds never collide.
+
+    The values are also used in the triggers and the migrations, so they should never be changed.
+    """
+
+    TOURNAMENT_CHANGES = 1
+    STAGE_ITEM_RANKING = 2
+
+
+TOURNAMENT_CHANGES_CHANNEL = "tournament_changes"
+TOURNAMENT_CHANGE_TABLES = (
+    "tournaments",
+    "stages",
+    "stage_items",
+    "stage_item_inputs",
+    "rounds",
+    "matches",
+    "teams",
+    "players",
+    "courts",
+    "rankings",
+)
+
+# Logs every change to a tournament and notifies all workers of it, in the same transaction as
+# the change itself. See `bracket/utils/notifications.py`.
+#
+# Changes get their id when they are logged, not when their transaction commits. A lock per
+# tournament is held until the end of the transaction, so that the ids of the changes to a
+# tournament are committed in order and clients never skip a change that commits later.
+# A single statement locks its tournaments in order of their id. A transaction that changes
+# several tournaments in separate statements can deadlock with one that changes them in the
+# opposite order, Postgres then aborts one of them. Requests only change a single tournament.
+#
+# The triggers run once per statement, so the tournaments of all rows changed by a bulk insert or
+# update are looked up in a single query. Notifications don't contain fields of individual rows,
+# so Postgres sends a single notification per tournament and table per transaction.
+notify_tournament_change = DDL(
+    f"""
+    CREATE OR REPLACE FUNCTION notify_tournament_change() RETURNS trigger AS $$
+    DECLARE
+        changed_rows_query text;
+        changed record;
+    BEGIN
+        IF TG_TABLE_NAME = 'tournaments' THEN
+            changed_rows_query := 'SELECT id AS tournament_id, id FROM changed_rows';
+        ELSIF TG_TABLE_NAME = 'stage_items' THEN
+            changed_rows_query := '
+                SELECT stages.tournament_id, changed_rows.id
+                FROM changed_rows
+                JOIN stages ON stages.id = changed_rows.stage_id';
+        ELSIF TG_TABLE_NAME = 'rounds' THEN
+            changed_rows_query := '
+                SELECT stages.tournament_id, changed_rows.id
+                FROM changed_rows
+                JOIN stage_items ON stage_items.id = changed_rows.stage_item_id
+                JOIN stages ON stages.id = stage_items.stage_id';
+        ELSIF TG_TABLE_NAME = 'matches' THEN
+            changed_rows_query := '
+                SELECT stages.tournament_id, changed_rows.id
+                FROM changed_rows
+                JOIN rounds ON rounds.id = changed_rows.round_id
+                JOIN stage_items ON stage_items.id = rounds.stage_item_id
+                JOIN stages ON stages.id = stage_items.stage_id';
+        ELSE
+            changed_rows_query := 'SELECT tournament_id, id FROM changed_rows';
+        END IF;
+
+        FOR changed IN EXECUTE
+            'SELECT tournament_id, array_agg(id ORDER BY id) AS ids
+            FROM (' || changed_rows_query || ') changed_rows_with_tournament
+            WHERE tournament_id IS NOT NULL
+            GROUP BY tournament_id
+            ORDER BY tournament_id'
+        LOOP
+            PERFORM pg_advisory_xact_lock(
+                {AdvisoryLockNamespace.TOURNAMENT_CHANGES.value}, changed.tournament_id::int
+            );
+            INSERT INTO tournament_changes (tournament_id, entity, entity_id)
+            SELECT changed.tournament_id, TG_TABLE_NAME, unnest(changed.ids);
+
+            PERFORM pg_notify(
+                '{TOURNAMENT_CHANGES_CHANNEL}',
+                json_build_object(
+                    'tournament_id', changed.tournament_id,
+                    'entity', TG_TABLE_NAME,
+                    'origin', current_setting('application_name')
+                )::text
+            );
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+    + "".join(
+        f"""
+        CREATE TRIGGER {table}_notify_tournament_change_{operation.lower()}
+        AFTER {operation} ON {table}
+        REFERENCING {"OLD" if operation == "DELETE" else "NEW"} TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_tournament_change();
+        """
+        for table in TOURNAMENT_CHANGE_TABLES
+        for operation in ("INSERT", "UPDATE", "DELETE")
+    )
+)
+event.listen(metadata, "after_create", notify_tournament_change)
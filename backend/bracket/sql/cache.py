@@ -0,0 +1,171 @@
+import secrets
+from collections import defaultdict
+from contextvars import ContextVar
+from itertools import count
+
+from bracket.config import config
+from bracket.models.db.user import UserPublic
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.cache import LRUCache
+from bracket.utils.id_types import TournamentId, UserId
+from bracket.utils.types import JsonDict
+
+
+class TournamentVersions:
+    def __init__(self) -> None:
+        self.counter = count(1)
+        self.per_tournament: dict[TournamentId, int] = {}
+        self.minimum = 0
+        self.bump_count_per_tournament: defaultdict[TournamentId, int] = defaultdict(int)
+        self.invalidation_count = 0
+
+
+_versions = TournamentVersions()
+
+# The number of times the current task bumped the version of each tournament, if it's tracked.
+_own_bump_counts: ContextVar[defaultdict[TournamentId, int] | None] = ContextVar(
+    "own_bump_counts", default=None
+)
+
+# Versions are counted per process, so ETags of different workers should never be equal.
+_etag_prefix = secrets.token_hex(4)
+
+tournament_details_cache = LRUCache[TournamentId, tuple[int, list[StageWithStageItems]]](
+    "tournament_details", config.tournament_cache_size
+)
+
+# Serialized responses of `GET /tournaments/{tournament_id}/stages`, per value of `no_draft_rounds`.
+stages_response_cache = LRUCache[tuple[TournamentId, bool], tuple[int, bytes]](
+    "stages_response", config.tournament_cache_size
+)
+
+# Other workers can't invalidate these caches, so entries expire after a short TTL.
+user_by_email_cache = LRUCache[str, UserPublic](
+    "user_by_email", config.auth_cache_size, config.auth_cache_ttl_seconds
+)
+tournament_access_cache = LRUCache[tuple[UserId, TournamentId], bool](
+    "tournament_access", config.auth_cache_size, config.auth_cache_ttl_seconds
+)
+
+
+def get_tournament_version(tournament_id: TournamentId) -> int:
+    """
+    Returns the version of a tournament, which increases every time the tournament is modified.
+    """
+    return max(_versions.per_tournament.get(tournament_id, 0), _versions.minimum)
+
+
+def track_own_bumps() -> None:
+    """
+    Starts counting the bumps made by the current task (request), see `get_foreign_bump_count`.
+    """
+    _own_bump_counts.set(defaultdict(int))
+
+
+def get_foreign_bump_count(tournament_id: TournamentId) -> int:
+    """
+    Returns how often a tournament was modified, excluding the modifications made by the current
+    task since `track_own_bumps` was called.
+
+    If this number didn't change while handling a request, no other request or worker modified
+    the tournament in the meantime.
+    """
+    own_bump_counts = _own_bump_counts.get()
+    own_bump_count = own_bump_counts[tournament_id] if own_bump_counts is not None else 0
+    return (
+        _versions.bump_count_per_tournament[tournament_id]
+        - own_bump_count
+        + _versions.invalidation_count
+    )
+
+
+def get_tournament_etag(tournament_id: TournamentId) -> str:
+    return f'W/"{_etag_prefix}-{tournament_id}-{get_tournament_version(tournament_id)}"'
+
+
+def bump_tournament_version(tournament_id: TournamentId) -> None:
+    """
+    Marks all cached data of a tournament as stale, should be called after every write.
+    """
+    _versions.per_tournament[tournament_id] = next(_versions.counter)
+    _versions.bump_count_per_tournament[tournament_id] += 1
+    own_bump_counts = _own_bump_counts.get()
+    if own_bump_counts is not None:
+        own_bump_counts[tournament_id] += 1
+
+    tournament_details_cache.pop(tournament_id)
+    for no_draft_rounds in (False, True):
+        stages_response_cache.pop((tournament_id, no_draft_rounds))
+
+
+def handle_tournament_change(notification: JsonDict) -> None:
+    """
+    Handles a change made by another worker, which Postgres notifies us of with the
+    tournament id and the changed table (`entity`).
+    """
+    bump_tournament_version(TournamentId(notification["tournament_id"]))
+    if notification["entity"] == "tournaments":
+        invalidate_auth_caches()
+
+
+def invalidate_all_tournaments() -> None:
+    """
+    Marks all cached data as stale, for writes that can't be attributed to a single tournament.
+    """
+    _versions.minimum = next(_versions.counter)
+    _versions.invalidation_count += 1
+    tournament_details_cache.clear()
+    stages_response_cache.clear()
+
+
+def get_cached_tournament_details(
+    tournament_id: TournamentId,
+) -> list[StageWithStageItems] | None:
+    cached = tournament_details_cache.get(tournament_id)
+    if cached is None:
+        return None
+
+    version, stages = cached
+    return stages if version == get_tournament_version(tournament_id) else None
+
+
+def set_cached_tournament_details(
+    tournament_id: TournamentId, version: int, stages: list[StageWithStageItems]
+) -> None:
+    """
+    Stores a snapshot that was fetched when the tournament had the given version.
+
+    If the tournament was modified while fetching, the snapshot is not stored since it may
+    already be outdated.
+    """
+    if version == get_tournament_version(tournament_id):
+        tournament_details_cache.set(tournament_id, (version, stages))
+
+
+def get_cached_stages_response(tournament_id: TournamentId, no_draft_rounds: bool) -> bytes | None:
+    cached = stages_response_cache.get((tournament_id, no_draft_rounds))
+    if cached is None:
+        return None
+
+    version, content = cached
+    return content if version == get_tournament_version(tournament_id) else None
+
+
+def set_cached_stages_response(
+    tournament_id: TournamentId, no_draft_rounds: bool, version: int, content: bytes
+) -> None:
+    if version == get_tournament_version(tournament_id):
+        stages_response_cache.set((tournament_id, no_draft_rounds), (version, content))
+
+
+def invalidate_auth_caches() -> None:
+    """
+    Should be called after users, clubs, club memberships or tournaments are changed or removed.
+    """
+    user_by_email_cache.clear()
+    tournament_access_cache.clear()
+
+
+def invalidate_all_caches() -> None:
+    invalidate_all_tournaments()
+    invalidate_auth_caches()
@@ -1,5 +1,6 @@
 from bracket.database import database
 from bracket.models.db.club import Club, ClubCreateBody, ClubUpdateBody
+from bracket.sql.cache import invalidate_auth_caches
 from bracket.utils.id_types import ClubId, UserId
 from bracket.utils.types import assert_some
 
@@ -13,6 +14,7 @@ async def sql_give_user_access_to_club(user_id: UserId, club_id: ClubId) -> None
         query=query_many_to_many,
         values={"club_id": assert_some(club_id), "user_id": user_id},
     )
+    invalidate_auth_caches()
 
 
 async def create_club(club: ClubCreateBody, user_id: UserId) -> Club:
@@ -50,6 +52,7 @@ async def sql_delete_club(club_id: ClubId) -> None:
         WHERE id = :club_id
         """
     await database.execute(query=query, values={"club_id": club_id})
+    invalidate_auth_caches()
 
 
 async def get_clubs_for_user_id(user_id: UserId) -> list[Club]:
@@ -1,5 +1,6 @@
 from bracket.database import database
 from bracket.models.db.court import Court, CourtBody
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.id_types import CourtId, TournamentId
 
 
@@ -27,6 +28,7 @@ async def update_court(
         query=query,
         values={"tournament_id": tournament_id, "court_id": court_id, "name": court_body.name},
     )
+    bump_tournament_version(tournament_id)
     return [Court.model_validate(dict(x._mapping)) for x in result]
 
 
@@ -35,8 +37,10 @@ async def sql_delete_court(tournament_id: TournamentId, court_id: CourtId) -> No
     await database.fetch_one(
         query=query, values={"court_id": court_id, "tournament_id": tournament_id}
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_delete_courts_of_tournament(tournament_id: TournamentId) -> None:
     query = "DELETE FROM courts WHERE tournament_id = :tournament_id"
     await database.fetch_one(query=query, values={"tournament_id": tournament_id})
+    bump_tournament_version(tournament_id)
@@ -0,0 +1,16 @@
+from bracket.database import database
+from bracket.schema import AdvisoryLockNamespace
+
+
+async def lock_until_end_of_transaction(namespace: AdvisoryLockNamespace, key: int) -> None:
+    """
+    Acquires an advisory lock that is released when the current transaction ends.
+
+    Waits until other transactions that hold the same lock have ended. Transactions that take
+    both a ranking lock and the tournament changes lock (by writing to a tournament) should take
+    the ranking lock first, to avoid deadlocks.
+    """
+    await database.execute(
+        query="SELECT pg_advisory_xact_lock(CAST(:namespace AS integer), CAST(:key AS integer))",
+        values={"namespace": namespace.value, "key": key},
+    )
@@ -1,29 +1,30 @@
+from collections.abc import Sequence
 from datetime import datetime
 
-from heliclockter import datetime_utc
-
 from bracket.database import database
 from bracket.models.db.match import Match, MatchBody, MatchCreateBody
 from bracket.models.db.tournament import Tournament
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.id_types import (
-    CourtId,
     MatchId,
-    RoundId,
     StageItemId,
     StageItemInputId,
     TournamentId,
 )
 
 
-async def sql_delete_match(match_id: MatchId) -> None:
+async def sql_delete_match(tournament_id: TournamentId, match_id: MatchId) -> None:
     query = """
         DELETE FROM matches
         WHERE matches.id = :match_id
         """
     await database.execute(query=query, values={"match_id": match_id})
+    bump_tournament_version(tournament_id)
 
 
-async def sql_delete_matches_for_stage_item_id(stage_item_id: StageItemId) -> None:
+async def sql_delete_matches_for_stage_item_id(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     query = """
         DELETE FROM matches
         WHERE matches.id IN (
@@ -34,55 +35,128 @@ async def sql_delete_matches_for_stage_item_id(stage_item_id: StageItemId) -> No
         )
         """
     await database.execute(query=query, values={"stage_item_id": stage_item_id})
+    bump_tournament_version(tournament_id)
 
 
-async def sql_create_match(match: MatchCreateBody) -> Match:
+async def sql_create_matches(
+    tournament_id: TournamentId, matches: list[MatchCreateBody]
+) -> list[Match]:
+    """
+    Inserts all matches using a single statement, returns the matches in the same order.
+
+    The values are passed as arrays, so the query text is the same for any number of matches.
+    Postgres doesn't guarantee the order of the returned rows, but IDs are assigned in the order
+    of the selected rows, so the returned matches are sorted by ID.
+    """
+    if len(matches) < 1:
+        return []
+
     query = """
-        INSERT INTO matches (
-            round_id,
-            court_id,
-            stage_item_input1_id,
-            stage_item_input2_id,
-            stage_item_input1_winner_from_match_id,
-            stage_item_input2_winner_from_match_id,
-            duration_minutes,
-            custom_duration_minutes,
-            margin_minutes,
-            custom_margin_minutes,
-            stage_item_input1_score,
-            stage_item_input2_score,
-            stage_item_input1_conflict,
-            stage_item_input2_conflict,
-            created
+        WITH inserted_matches AS (
+            INSERT INTO matches (
+                round_id,
+                court_id,
+                stage_item_input1_id,
+                stage_item_input2_id,
+                stage_item_input1_winner_from_match_id,
+                stage_item_input2_winner_from_match_id,
+                duration_minutes,
+                custom_duration_minutes,
+                margin_minutes,
+                custom_margin_minutes,
+                stage_item_input1_score,
+                stage_item_input2_score,
+                stage_item_input1_conflict,
+                stage_item_input2_conflict,
+                created
+            )
+            SELECT
+                round_id,
+                court_id,
+                stage_item_input1_id,
+                stage_item_input2_id,
+                stage_item_input1_winner_from_match_id,
+                stage_item_input2_winner_from_match_id,
+                duration_minutes,
+                custom_duration_minutes,
+                margin_minutes,
+                custom_margin_minutes,
+                0,
+                0,
+                false,
+                false,
+                NOW()
+            FROM unnest(
+                CAST(:round_ids AS bigint[]),
+                CAST(:court_ids AS bigint[]),
+                CAST(:stage_item_input1_ids AS bigint[]),
+                CAST(:stage_item_input2_ids AS bigint[]),
+                CAST(:stage_item_input1_winner_from_match_ids AS bigint[]),
+                CAST(:stage_item_input2_winner_from_match_ids AS bigint[]),
+                CAST(:durations_minutes AS integer[]),
+                CAST(:custom_durations_minutes AS integer[]),
+                CAST(:margins_minutes AS integer[]),
+                CAST(:custom_margins_minutes AS integer[])
+            ) WITH ORDINALITY AS new_matches(
+                round_id,
+                court_id,
+                stage_item_input1_id,
+                stage_item_input2_id,
+                stage_item_input1_winner_from_match_id,
+                stage_item_input2_winner_from_match_id,
+                duration_minutes,
+                custom_duration_minutes,
+                margin_minutes,
+                custom_margin_minutes,
+                ordinality
+            )
+            ORDER BY new_matches.ordinality
+            RETURNING *
         )
-        VALUES (
-            :round_id,
-            :court_id,
-            :stage_item_input1_id,
-            :stage_item_input2_id,
-            :stage_item_input1_winner_from_match_id,
-            :stage_item_input2_winner_from_match_id,
-            :duration_minutes,
-            :custom_duration_minutes,
-            :margin_minutes,
-            :custom_margin_minutes,
-            0,
-            0,
-            false,
-            false,
-            NOW()
-        )
-        RETURNING *
+        SELECT * FROM inserted_matches
+        ORDER BY inserted_matches.id
     """
-    result = await database.fetch_one(query=query, values=match.model_dump())
+    result = await database.fetch_all(
+        query=query,
+        values={
+            "round_ids": [match.round_id for match in matches],
+            "court_ids": [match.court_id for match in matches],
+            "stage_item_input1_ids": [match.stage_item_input1_id for match in matches],
+            "stage_item_input2_ids": [match.stage_item_input2_id for match in matches],
+            "stage_item_input1_winner_from_match_ids": [
+                match.stage_item_input1_winner_from_match_id for match in matches
+            ],
+            "stage_item_input2_winner_from_match_ids": [
+                match.stage_item_input2_winner_from_match_id for match in matches
+            ],
+            "durations_minutes": [match.duration_minutes for match in matches],
+            "custom_durations_minutes": [match.custom_duration_minutes for match in matches],
+            "margins_minutes": [match.margin_minutes for match in matches],
+            "custom_margins_minutes": [match.custom_margin_minutes for match in matches],
+        },
+    )
+    bump_tournament_version(tournament_id)
 
-    if result is None:
-        raise ValueError("Could not create stage")
+    if len(result) != len(matches):
+        raise ValueError("Could not create matches")
 
-    return Match.model_validate(dict(result._mapping))
+    return [Match.model_validate(dict(row._mapping)) for row in result]
+
+
+async def sql_create_match(tournament_id: TournamentId, match: MatchCreateBody) -> Match:
+    [result] = await sql_create_matches(tournament_id, [match])
+    return result
 
 
-async def sql_update_match(match_id: MatchId, match: MatchBody, tournament: Tournament) -> None:
+async def sql_update_match(
+    match_id: MatchId, match: MatchBody, tournament: Tournament
+) -> Match | None:
+    """
+    Updates a match and returns it as it was right before the update.
+
+    The match is locked while it's read, so concurrent updates of the same match each return the
+    result that they replaced.
+    """
     query = """
         UPDATE matches
         SET round_id = :round_id,
@@ -93,8 +167,9 @@ async def sql_update_match(match_id: MatchId, match: MatchBody, tournament: Tour
             custom_margin_minutes = :custom_margin_minutes,
             duration_minutes = :duration_minutes,
             margin_minutes = :margin_minutes
-        WHERE matches.id = :match_id
-        RETURNING *
+        FROM (SELECT * FROM matches WHERE id = :match_id FOR UPDATE) AS previous_matches
+        WHERE matches.id = previous_matches.id
+        RETURNING previous_matches.*
         """
 
     duration_minutes = (
@@ -107,7 +182,7 @@ async def sql_update_match(match_id: MatchId, match: MatchBody, tournament: Tour
         if match.custom_margin_minutes is not None
         else tournament.margin_minutes
     )
-    await database.execute(
+    result = await database.fetch_one(
         query=query,
         values={
             "match_id": match_id,
@@ -116,100 +191,149 @@ async def sql_update_match(match_id: MatchId, match: MatchBody, tournament: Tour
             "margin_minutes": margin_minutes,
         },
     )
+    bump_tournament_version(tournament.id)
+    return Match.model_validate(dict(result._mapping)) if result is not None else None
 
 
-async def sql_set_input_ids_for_match(
-    round_id: RoundId, match_id: MatchId, input_ids: list[StageItemInputId | None]
+async def sql_set_input_ids_for_matches(
+    tournament_id: TournamentId,
+    input_ids_per_match: dict[MatchId, tuple[StageItemInputId | None, StageItemInputId | None]],
 ) -> None:
+    """
+    Sets the stage item inputs of all given matches using a single statement.
+    """
+    if len(input_ids_per_match) < 1:
+        return
+
     query = """
         UPDATE matches
-        SET stage_item_input1_id = :input1_id,
-            stage_item_input2_id = :input2_id
-        WHERE round_id = :round_id
-        AND matches.id = :match_id
+        SET stage_item_input1_id = updates.input1_id,
+            stage_item_input2_id = updates.input2_id
+        FROM unnest(
+            CAST(:match_ids AS bigint[]),
+            CAST(:input1_ids AS bigint[]),
+            CAST(:input2_ids AS bigint[])
+        ) AS updates(match_id, input1_id, input2_id),
+        rounds
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        WHERE matches.id = updates.match_id
+        AND rounds.id = matches.round_id
+        AND stages.tournament_id = :tournament_id
         """
     await database.execute(
         query=query,
         values={
-            "round_id": round_id,
-            "match_id": match_id,
-            "input1_id": input_ids[0],
-            "input2_id": input_ids[1],
+            "tournament_id": tournament_id,
+            "match_ids": list(input_ids_per_match.keys()),
+            "input1_ids": [input_ids[0] for input_ids in input_ids_per_match.values()],
+            "input2_ids": [input_ids[1] for input_ids in input_ids_per_match.values()],
         },
     )
+    bump_tournament_version(tournament_id)
 
 
-async def sql_reschedule_match(
-    match_id: MatchId,
-    court_id: CourtId | None,
-    start_time: datetime_utc,
-    position_in_schedule: int | None,
-    duration_minutes: int,
-    margin_minutes: int,
-    custom_duration_minutes: int | None,
-    custom_margin_minutes: int | None,
-    stage_item_input1_conflict: bool,
-    stage_item_input2_conflict: bool,
+async def sql_set_conflicts_for_matches(
+    tournament_id: TournamentId,
+    conflicts_per_match: dict[MatchId, tuple[bool, bool]],
 ) -> None:
+    """
+    Sets the conflict flags of all given matches using a single statement.
+    """
+    if len(conflicts_per_match) < 1:
+        return
+
     query = """
         UPDATE matches
-        SET court_id = :court_id,
-            start_time = :start_time,
-            position_in_schedule = :position_in_schedule,
-            duration_minutes = :duration_minutes,
-            margin_minutes = :margin_minutes,
-            custom_duration_minutes = :custom_duration_minutes,
-            custom_margin_minutes = :custom_margin_minutes,
-            stage_item_input1_conflict = :stage_item_input1_conflict,
-            stage_item_input2_conflict = :stage_item_input2_conflict
-        WHERE matches.id = :match_id
+        SET stage_item_input1_conflict = updates.conflict1,
+            stage_item_input2_conflict = updates.conflict2
+        FROM unnest(
+            CAST(:match_ids AS bigint[]),
+            CAST(:conflicts1 AS boolean[]),
+            CAST(:conflicts2 AS boolean[])
+        ) AS updates(match_id, conflict1, conflict2),
+        rounds
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        WHERE matches.id = updates.match_id
+        AND rounds.id = matches.round_id
+        AND stages.tournament_id = :tournament_id
         """
     await database.execute(
         query=query,
         values={
-            "court_id": court_id,
-            "match_id": match_id,
-            "position_in_schedule": position_in_schedule,
-            "start_time": datetime.fromisoformat(start_time.isoformat()),
-            "duration_minutes": duration_minutes,
-            "margin_minutes": margin_minutes,
-            "custom_duration_minutes": custom_duration_minutes,
-            "custom_margin_minutes": custom_margin_minutes,
-            "stage_item_input1_conflict": stage_item_input1_conflict,
-            "stage_item_input2_conflict": stage_item_input2_conflict,
+            "tournament_id": tournament_id,
+            "match_ids": list(conflicts_per_match.keys()),
+            "conflicts1": [conflict[0] for conflict in conflicts_per_match.values()],
+            "conflicts2": [conflict[1] for conflict in conflicts_per_match.values()],
         },
     )
+    bump_tournament_version(tournament_id)
 
 
-async def sql_reschedule_match_and_determine_duration_and_margin(
-    court_id: CourtId | None,
-    start_time: datetime_utc,
-    position_in_schedule: int | None,
-    match: Match,
-    tournament: Tournament,
-) -> None:
-    duration_minutes = (
-        tournament.duration_minutes
-        if match.custom_duration_minutes is None
-        else match.custom_duration_minutes
-    )
-    margin_minutes = (
-        tournament.margin_minutes
-        if match.custom_margin_minutes is None
-        else match.custom_margin_minutes
-    )
-    await sql_reschedule_match(
-        match.id,
-        court_id,
-        start_time,
-        position_in_schedule,
-        duration_minutes,
-        margin_minutes,
-        match.custom_duration_minutes,
-        match.custom_margin_minutes,
-        match.stage_item_input1_conflict,
-        match.stage_item_input2_conflict,
+async def sql_reschedule_matches(tournament_id: TournamentId, matches: Sequence[Match]) -> None:
+    """
+    Stores the court, start time, position, duration and margin of all given matches using a
+    single statement.
+    """
+    if len(matches) < 1:
+        return
+
+    query = """
+        UPDATE matches
+        SET court_id = updates.court_id,
+            start_time = updates.start_time,
+            position_in_schedule = updates.position_in_schedule,
+            duration_minutes = updates.duration_minutes,
+            margin_minutes = updates.margin_minutes,
+            custom_duration_minutes = updates.custom_duration_minutes,
+            custom_margin_minutes = updates.custom_margin_minutes
+        FROM unnest(
+            CAST(:match_ids AS bigint[]),
+            CAST(:court_ids AS bigint[]),
+            CAST(:start_times AS timestamptz[]),
+            CAST(:positions_in_schedule AS integer[]),
+            CAST(:durations_minutes AS integer[]),
+            CAST(:margins_minutes AS integer[]),
+            CAST(:custom_durations_minutes AS integer[]),
+            CAST(:custom_margins_minutes AS integer[])
+        ) AS updates(
+            match_id,
+            court_id,
+            start_time,
+            position_in_schedule,
+            duration_minutes,
+            margin_minutes,
+            custom_duration_minutes,
+            custom_margin_minutes
+        ),
+        rounds
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        WHERE matches.id = updates.match_id
+        AND rounds.id = matches.round_id
+        AND stages.tournament_id = :tournament_id
+        """
+    await database.execute(
+        query=query,
+        values={
+            "tournament_id": tournament_id,
+            "match_ids": [match.id for match in matches],
+            "court_ids": [match.court_id for match in matches],
+            "start_times": [
+                datetime.fromisoformat(match.start_time.isoformat())
+                if match.start_time is not None
+                else None
+                for match in matches
+            ],
+            "positions_in_schedule": [match.position_in_schedule for match in matches],
+            "durations_minutes": [match.duration_minutes for match in matches],
+            "margins_minutes": [match.margin_minutes for match in matches],
+            "custom_durations_minutes": [match.custom_duration_minutes for match in matches],
+            "custom_margins_minutes": [match.custom_margin_minutes for match in matches],
+        },
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_get_match(match_id: MatchId) -> Match:
@@ -247,3 +371,4 @@ async def clear_scores_for_matches_in_stage_item(
             "tournament_id": tournament_id,
         },
     )
+    bump_tournament_version(tournament_id)
@@ -6,6 +6,7 @@ from bracket.database import database
 from bracket.logic.ranking.statistics import START_ELO
 from bracket.models.db.player import Player, PlayerBody, PlayerToInsert
 from bracket.schema import players
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.id_types import PlayerId, TournamentId
 from bracket.utils.pagination import PaginationPlayers
 from bracket.utils.types import dict_without_none
@@ -48,19 +49,6 @@ async def get_all_players_in_tournament(
     return [Player.model_validate(x) for x in result]
 
 
-async def get_player_by_id(player_id: PlayerId, tournament_id: TournamentId) -> Player | None:
-    query = """
-        SELECT *
-        FROM players
-        WHERE id = :player_id
-        AND tournament_id = :tournament_id
-    """
-    result = await database.fetch_one(
-        query=query, values={"player_id": player_id, "tournament_id": tournament_id}
-    )
-    return Player.model_validate(result) if result is not None else None
-
-
 async def get_player_count(
     tournament_id: TournamentId,
     *,
@@ -81,11 +69,13 @@ async def sql_delete_player(tournament_id: TournamentId, player_id: PlayerId) ->
     await database.fetch_one(
         query=query, values={"player_id": player_id, "tournament_id": tournament_id}
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_delete_players_of_tournament(tournament_id: TournamentId) -> None:
     query = "DELETE FROM players WHERE tournament_id = :tournament_id"
     await database.fetch_one(query=query, values={"tournament_id": tournament_id})
+    bump_tournament_version(tournament_id)
 
 
 async def insert_player(player_body: PlayerBody, tournament_id: TournamentId) -> None:
@@ -99,3 +89,4 @@ async def insert_player(player_body: PlayerBody, tournament_id: TournamentId) ->
             swiss_score=Decimal("0.0"),
         ).model_dump(),
     )
+    bump_tournament_version(tournament_id)
@@ -1,5 +1,6 @@
 from bracket.database import database
 from bracket.models.db.ranking import Ranking, RankingBody, RankingCreateBody
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.id_types import RankingId, StageItemId, TournamentId
 
 
@@ -68,6 +69,7 @@ async def sql_update_ranking(
             "position": ranking_body.position,
         },
     )
+    bump_tournament_version(tournament_id)
     return [Ranking.model_validate(dict(x._mapping)) for x in result]
 
 
@@ -76,6 +78,7 @@ async def sql_delete_ranking(tournament_id: TournamentId, ranking_id: RankingId)
     await database.fetch_one(
         query=query, values={"ranking_id": ranking_id, "tournament_id": tournament_id}
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_create_ranking(
@@ -105,3 +108,4 @@ async def sql_create_ranking(
             "position": position,
         },
     )
+    bump_tournament_version(tournament_id)
@@ -1,50 +1,102 @@
 from bracket.database import database
 from bracket.models.db.round import RoundInsertable
 from bracket.models.db.util import RoundWithMatches
-from bracket.sql.stage_items import get_stage_item
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.cache import bump_tournament_version, get_cached_tournament_details
+from bracket.sql.stages import filter_tournament_details, get_stage_item_details_ctes
 from bracket.utils.id_types import RoundId, StageItemId, TournamentId
+from bracket.utils.types import dict_without_none
 
 
-async def sql_create_round(round_: RoundInsertable) -> RoundId:
+async def sql_create_rounds(
+    tournament_id: TournamentId, rounds: list[RoundInsertable]
+) -> list[RoundId]:
+    """
+    Inserts all rounds using a single statement, returns the IDs in the same order.
+
+    The values are passed as arrays, so the query text is the same for any number of rounds.
+    Postgres doesn't guarantee the order of the returned rows, but IDs are assigned in the order
+    of the selected rows, so the returned IDs are sorted.
+    """
+    if len(rounds) < 1:
+        return []
+
     query = """
-        INSERT INTO rounds (created, is_draft, name, stage_item_id)
-        VALUES (NOW(), :is_draft, :name, :stage_item_id)
-        RETURNING id
+        WITH inserted_rounds AS (
+            INSERT INTO rounds (created, is_draft, name, stage_item_id)
+            SELECT NOW(), is_draft, name, stage_item_id
+            FROM unnest(
+                CAST(:is_drafts AS boolean[]),
+                CAST(:names AS text[]),
+                CAST(:stage_item_ids AS bigint[])
+            ) WITH ORDINALITY AS new_rounds(is_draft, name, stage_item_id, ordinality)
+            ORDER BY new_rounds.ordinality
+            RETURNING id
+        )
+        SELECT id FROM inserted_rounds
+        ORDER BY inserted_rounds.id
         """
-    result: RoundId = await database.fetch_val(
+    result = await database.fetch_all(
         query=query,
         values={
-            "name": round_.name,
-            "is_draft": round_.is_draft,
-            "stage_item_id": round_.stage_item_id,
+            "is_drafts": [round_.is_draft for round_ in rounds],
+            "names": [round_.name for round_ in rounds],
+            "stage_item_ids": [round_.stage_item_id for round_ in rounds],
         },
     )
+    bump_tournament_version(tournament_id)
+    return [RoundId(record["id"]) for record in result]
+
+
+async def sql_create_round(tournament_id: TournamentId, round_: RoundInsertable) -> RoundId:
+    [result] = await sql_create_rounds(tournament_id, [round_])
     return result
 
 
-async def get_rounds_for_stage_item(
-    tournament_id: TournamentId, stage_item_id: StageItemId
+async def sql_get_rounds_with_matches(
+    tournament_id: TournamentId,
+    stage_item_id: StageItemId | None = None,
+    round_id: RoundId | None = None,
 ) -> list[RoundWithMatches]:
-    stage_item = await get_stage_item(tournament_id, stage_item_id)
-    return stage_item.rounds
+    stage_item_filter = (
+        "AND stage_items.id = :stage_item_id"
+        if stage_item_id is not None
+        else "AND stage_items.id = (SELECT stage_item_id FROM rounds WHERE rounds.id = :round_id)"
+    )
+    round_filter = "AND rounds.id = :round_id" if round_id is not None else ""
+    query = f"""
+        {get_stage_item_details_ctes(stage_item_filter, round_filter)}
+        SELECT * FROM rounds_with_matches
+        ORDER BY rounds_with_matches.id
+    """
+    values = dict_without_none(
+        {"tournament_id": tournament_id, "stage_item_id": stage_item_id, "round_id": round_id}
+    )
+    result = await database.fetch_all(query=query, values=values)
+    return [RoundWithMatches.model_validate(dict(x._mapping)) for x in result]
 
 
 async def get_round_by_id(tournament_id: TournamentId, round_id: RoundId) -> RoundWithMatches:
-    stages = await get_full_tournament_details(
-        tournament_id, no_draft_rounds=False, round_id=round_id
+    cached = get_cached_tournament_details(tournament_id)
+    rounds = (
+        [
+            round_
+            for stage in filter_tournament_details(cached, round_id=round_id)
+            for stage_item in stage.stage_items
+            for round_ in stage_item.rounds
+        ]
+        if cached is not None
+        else await sql_get_rounds_with_matches(tournament_id, round_id=round_id)
     )
 
-    for stage in stages:
-        for stage_item in stage.stage_items:
-            for round_ in stage_item.rounds:
-                if round_ is not None:
-                    return round_
+    if len(rounds) < 1:
+        raise ValueError(f"Could not find round with id {round_id} for tournament {tournament_id}")
 
-    raise ValueError(f"Could not find round with id {round_id} for tournament {tournament_id}")
+    return rounds[0]
 
 
-async def get_next_round_name(tournament_id: TournamentId, stage_item_id: StageItemId) -> str:
+async def get_next_round_names(
+    tournament_id: TournamentId, stage_item_id: StageItemId, count: int
+) -> list[str]:
     query = """
         SELECT count(*) FROM rounds
         JOIN stage_items on stage_items.id = rounds.stage_item_id
@@ -57,23 +109,32 @@ async def get_next_round_name(tournament_id: TournamentId, stage_item_id: StageI
             query=query, values={"tournament_id": tournament_id, "stage_item_id": stage_item_id}
         )
     )
-    return f"Round {round_count + 1:02d}"
+    return [f"Round {round_count + i:02d}" for i in range(1, count + 1)]
+
+
+async def get_next_round_name(tournament_id: TournamentId, stage_item_id: StageItemId) -> str:
+    [name] = await get_next_round_names(tournament_id, stage_item_id, 1)
+    return name
 
 
-async def sql_delete_rounds_for_stage_item_id(stage_item_id: StageItemId) -> None:
+async def sql_delete_rounds_for_stage_item_id(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     query = """
         DELETE FROM rounds
         WHERE rounds.stage_item_id = :stage_item_id
         """
     await database.execute(query=query, values={"stage_item_id": stage_item_id})
+    bump_tournament_version(tournament_id)
 
 
-async def sql_delete_round(round_id: RoundId) -> None:
+async def sql_delete_round(tournament_id: TournamentId, round_id: RoundId) -> None:
     query = """
         DELETE FROM rounds
         WHERE rounds.id = :round_id
     """
     await database.execute(query=query, values={"round_id": round_id})
+    bump_tournament_version(tournament_id)
 
 
 async def set_round_active_or_draft(
@@ -102,3 +163,4 @@ async def set_round_active_or_draft(
             "is_draft": is_draft,
         },
     )
+    bump_tournament_version(tournament_id)
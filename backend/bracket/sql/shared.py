@@ -1,31 +1,44 @@
 from bracket.database import database
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.stage_items import sql_delete_stage_item
-from bracket.utils.id_types import StageItemId
+from bracket.utils.id_types import StageItemId, TournamentId
 
 
-async def sql_delete_stage_item_matches(stage_item_id: StageItemId) -> None:
+async def sql_delete_stage_item_matches(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     from bracket.sql.matches import sql_delete_matches_for_stage_item_id
 
     async with database.transaction():
-        await sql_delete_matches_for_stage_item_id(stage_item_id)
+        await sql_delete_matches_for_stage_item_id(tournament_id, stage_item_id)
 
+    bump_tournament_version(tournament_id)
 
-async def sql_delete_stage_item_relations(stage_item_id: StageItemId) -> None:
+
+async def sql_delete_stage_item_relations(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     from bracket.sql.rounds import sql_delete_rounds_for_stage_item_id
     from bracket.sql.stage_item_inputs import sql_delete_stage_item_inputs
 
     async with database.transaction():
-        await sql_delete_rounds_for_stage_item_id(stage_item_id)
-        await sql_delete_stage_item_inputs(stage_item_id)
+        await sql_delete_rounds_for_stage_item_id(tournament_id, stage_item_id)
+        await sql_delete_stage_item_inputs(tournament_id, stage_item_id)
+
+    bump_tournament_version(tournament_id)
 
 
-async def sql_delete_stage_item_with_foreign_keys(stage_item_id: StageItemId) -> None:
+async def sql_delete_stage_item_with_foreign_keys(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     from bracket.sql.matches import sql_delete_matches_for_stage_item_id
     from bracket.sql.rounds import sql_delete_rounds_for_stage_item_id
     from bracket.sql.stage_item_inputs import sql_delete_stage_item_inputs
 
     async with database.transaction():
-        await sql_delete_matches_for_stage_item_id(stage_item_id)
-        await sql_delete_stage_item_inputs(stage_item_id)
-        await sql_delete_rounds_for_stage_item_id(stage_item_id)
-        await sql_delete_stage_item(stage_item_id)
+        await sql_delete_matches_for_stage_item_id(tournament_id, stage_item_id)
+        await sql_delete_stage_item_inputs(tournament_id, stage_item_id)
+        await sql_delete_rounds_for_stage_item_id(tournament_id, stage_item_id)
+        await sql_delete_stage_item(tournament_id, stage_item_id)
+
+    bump_tournament_version(tournament_id)
@@ -9,6 +9,7 @@ from bracket.models.db.stage_item_inputs import (
     StageItemInputCreateBodyTentative,
     StageItemInputFinal,
 )
+from bracket.sql.cache import bump_tournament_version
 from bracket.sql.teams import get_team_by_id
 from bracket.utils.id_types import RankingId, StageItemId, StageItemInputId, TeamId, TournamentId
 
@@ -68,14 +69,18 @@ async def sql_set_team_id_for_stage_item_input(
             "tournament_id": tournament_id,
         },
     )
+    bump_tournament_version(tournament_id)
 
 
-async def sql_delete_stage_item_inputs(stage_item_id: StageItemId) -> None:
+async def sql_delete_stage_item_inputs(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> None:
     query = """
         DELETE FROM stage_item_inputs
         WHERE stage_item_id = :stage_item_id OR winner_from_stage_item_id = :stage_item_id
         """
     await database.execute(query=query, values={"stage_item_id": stage_item_id})
+    bump_tournament_version(tournament_id)
 
 
 async def sql_create_stage_item_input(
@@ -127,6 +132,7 @@ async def sql_create_stage_item_input(
             ),
         },
     )
+    bump_tournament_version(tournament_id)
 
     if result is None:
         raise ValueError("Could not create stage")
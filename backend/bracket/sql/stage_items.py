@@ -5,9 +5,10 @@ from bracket.database import database
 from bracket.models.db.stage_item import StageItem, StageItemCreateBody, StageItemWithInputsCreate
 from bracket.models.db.stage_item_inputs import StageItemInputCreateBodyEmpty
 from bracket.models.db.util import StageItemWithRounds
+from bracket.sql.cache import bump_tournament_version, get_cached_tournament_details
 from bracket.sql.rankings import get_default_rankings_in_tournament
 from bracket.sql.stage_item_inputs import sql_create_stage_item_input
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.stages import filter_tournament_details, get_stage_item_details_ctes
 from bracket.utils.id_types import StageItemId, TournamentId
 
 
@@ -31,6 +32,7 @@ async def sql_create_stage_item(
             else (await get_default_rankings_in_tournament(tournament_id)).id,
         },
     )
+    bump_tournament_version(tournament_id)
     if result is None:
         raise ValueError("Could not create stage")
 
@@ -48,6 +50,7 @@ async def sql_create_stage_item_with_inputs(
         for input_ in stage_item.inputs:
             await sql_create_stage_item_input(tournament_id, stage_item_result.id, input_)
 
+    bump_tournament_version(tournament_id)
     return stage_item_result
 
 
@@ -63,22 +66,42 @@ async def sql_create_stage_item_with_empty_inputs(
     return result
 
 
-async def sql_delete_stage_item(stage_item_id: StageItemId) -> None:
+async def sql_delete_stage_item(tournament_id: TournamentId, stage_item_id: StageItemId) -> None:
     query = """
         DELETE FROM stage_items
         WHERE stage_items.id = :stage_item_id
         """
     await database.execute(query=query, values={"stage_item_id": stage_item_id})
+    bump_tournament_version(tournament_id)
+
+
+async def sql_get_stage_item_with_rounds(
+    tournament_id: TournamentId, stage_item_id: StageItemId
+) -> StageItemWithRounds | None:
+    query = f"""
+        {get_stage_item_details_ctes(stage_item_filter="AND stage_items.id = :stage_item_id")}
+        SELECT * FROM stage_items_with_rounds_and_inputs
+    """
+    result = await database.fetch_one(
+        query=query, values={"tournament_id": tournament_id, "stage_item_id": stage_item_id}
+    )
+    return StageItemWithRounds.model_validate(dict(result._mapping)) if result is not None else None
 
 
 async def get_stage_item(
     tournament_id: TournamentId, stage_item_id: StageItemId
 ) -> StageItemWithRounds:
-    stages = await get_full_tournament_details(tournament_id, stage_item_ids={stage_item_id})
-    if len(stages) < 1 or len(stages[0].stage_items) < 1:
+    cached = get_cached_tournament_details(tournament_id)
+    if cached is not None:
+        stages = filter_tournament_details(cached, stage_item_ids={stage_item_id})
+        stage_item = stages[0].stage_items[0] if len(stages) > 0 else None
+    else:
+        stage_item = await sql_get_stage_item_with_rounds(tournament_id, stage_item_id)
+
+    if stage_item is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Stage item doesn't exist",
         )
 
-    return stages[0].stage_items[0]
+    return stage_item
@@ -3,117 +3,187 @@ from typing import Literal, cast
 from bracket.database import database
 from bracket.models.db.stage import Stage
 from bracket.models.db.util import StageWithStageItems
+from bracket.sql.cache import (
+    bump_tournament_version,
+    get_cached_tournament_details,
+    get_tournament_version,
+    set_cached_tournament_details,
+)
 from bracket.utils.id_types import RoundId, StageId, StageItemId, TournamentId
 from bracket.utils.types import dict_without_none
 
 
-async def get_full_tournament_details(
-    tournament_id: TournamentId,
+def filter_tournament_details(
+    stages: list[StageWithStageItems],
     round_id: RoundId | None = None,
     stage_id: StageId | None = None,
     stage_item_ids: set[StageItemId] | None = None,
     *,
     no_draft_rounds: bool = False,
 ) -> list[StageWithStageItems]:
-    draft_filter = "AND rounds.is_draft IS FALSE" if no_draft_rounds else ""
-    round_filter = "AND rounds.id = :round_id" if round_id is not None else ""
-    stage_filter = "AND stages.id = :stage_id" if stage_id is not None else ""
-    stage_item_filter = (
-        "AND stage_items.id = any(:stage_item_ids)" if stage_item_ids is not None else ""
-    )
-    stage_item_filter_join = (
-        "LEFT JOIN stage_items on stages.id = stage_items.stage_id"
-        if stage_item_ids is not None
-        else ""
-    )
+    """
+    Selects part of a (cached) tournament snapshot without modifying the snapshot itself.
+    """
+    if round_id is None and stage_id is None and stage_item_ids is None and not no_draft_rounds:
+        return list(stages)
 
-    query = f"""
-        WITH inputs_with_teams AS (
-            SELECT DISTINCT ON (stage_item_inputs.id)
+    result = []
+    for stage in stages:
+        if stage_id is not None and stage.id != stage_id:
+            continue
+
+        stage_items = [
+            stage_item
+            for stage_item in stage.stage_items
+            if stage_item_ids is None or stage_item.id in stage_item_ids
+        ]
+        if stage_item_ids is not None and len(stage_items) < 1:
+            continue
+
+        if no_draft_rounds or round_id is not None:
+            stage_items = [
+                stage_item.model_copy(
+                    update={
+                        "rounds": [
+                            round_
+                            for round_ in stage_item.rounds
+                            if not (no_draft_rounds and round_.is_draft)
+                            and (round_id is None or round_.id == round_id)
+                        ]
+                    }
+                )
+                for stage_item in stage_items
+            ]
+
+        result.append(stage.model_copy(update={"stage_items": stage_items}))
+
+    return result
+
+
+def get_stage_item_details_ctes(stage_item_filter: str = "", round_filter: str = "") -> str:
+    """
+    Common table expressions that select stage items with their inputs, rounds and matches.
+
+    Only the stage items matching `stage_item_filter` (and the rounds matching `round_filter`)
+    are selected, so the cost of a query depends on the size of that slice and not on the size
+    of the tournament. Results are available in `stage_items_with_rounds_and_inputs` and
+    `rounds_with_matches`.
+    """
+    return f"""
+        WITH selected_stage_items AS (
+            SELECT stage_items.*
+            FROM stage_items
+            JOIN stages ON stages.id = stage_items.stage_id
+            WHERE stages.tournament_id = :tournament_id
+            {stage_item_filter}
+        ), inputs_with_teams AS (
+            SELECT
                 stage_item_inputs.*,
                 to_json(t.*) AS team
             FROM stage_item_inputs
-            JOIN stage_items on stage_item_inputs.stage_item_id = stage_items.id
-            LEFT JOIN stages s2 on s2.id = stage_items.stage_id
             LEFT JOIN teams t on t.id = stage_item_inputs.team_id
-            WHERE s2.tournament_id = :tournament_id
-            {stage_item_filter}
-            GROUP BY stage_item_inputs.id, t.id
+            WHERE stage_item_inputs.stage_item_id IN (SELECT id FROM selected_stage_items)
         ), matches_with_inputs AS (
-            SELECT DISTINCT ON (matches.id)
+            SELECT
                 matches.*,
                 to_json(sii1) as stage_item_input1,
                 to_json(sii2) as stage_item_input2,
                 to_json(c) as court
             FROM matches
+            JOIN rounds ON rounds.id = matches.round_id
             LEFT JOIN inputs_with_teams sii1 on sii1.id = matches.stage_item_input1_id
             LEFT JOIN inputs_with_teams sii2 on sii2.id = matches.stage_item_input2_id
-            LEFT JOIN rounds r on matches.round_id = r.id
-            LEFT JOIN stage_items si on r.stage_item_id = si.id
-            LEFT JOIN stages s2 on s2.id = si.stage_id
             LEFT JOIN courts c on matches.court_id = c.id
-            WHERE s2.tournament_id = :tournament_id
+            WHERE rounds.stage_item_id IN (SELECT id FROM selected_stage_items)
+            {round_filter}
         ), rounds_with_matches AS (
-            SELECT DISTINCT ON (rounds.id)
+            SELECT
                 rounds.*,
-                to_json(array_agg(m.*)) AS matches
+                to_json(array_agg(m.* ORDER BY m.id)) AS matches
             FROM rounds
             LEFT JOIN matches_with_inputs m on m.round_id = rounds.id
-            LEFT JOIN stage_items si on rounds.stage_item_id = si.id
-            LEFT JOIN stages s2 on s2.id = si.stage_id
-            WHERE s2.tournament_id = :tournament_id
-            {draft_filter}
+            WHERE rounds.stage_item_id IN (SELECT id FROM selected_stage_items)
             {round_filter}
             GROUP BY rounds.id
-        ), stage_items_with_rounds AS (
-            SELECT DISTINCT ON (stage_items.id)
-                stage_items.*,
-                to_json(array_agg(r.*)) AS rounds
-            FROM stage_items
-            JOIN stages st on stage_items.stage_id = st.id
-            LEFT JOIN rounds_with_matches r on r.stage_item_id = stage_items.id
-            WHERE st.tournament_id = :tournament_id
-            {stage_item_filter}
-            GROUP BY stage_items.id
-        ), stage_items_with_inputs AS (
-            SELECT DISTINCT ON (stage_items.id)
-                stage_items.id,
-                to_json(array_agg(sii)) AS inputs
-            FROM stage_items
-            LEFT JOIN inputs_with_teams sii ON stage_items.id = sii.stage_item_id
-            WHERE sii.tournament_id = :tournament_id
-            {stage_item_filter}
-            GROUP BY stage_items.id
-            ORDER BY stage_items.id
         ), stage_items_with_rounds_and_inputs AS (
-            SELECT stage_items.*, stage_items_with_inputs.inputs, stage_items_with_rounds.rounds
-            FROM stage_items
-            JOIN stage_items_with_rounds ON stage_items_with_rounds.id = stage_items.id
-            LEFT JOIN stage_items_with_inputs ON stage_items_with_inputs.id = stage_items.id
-            ORDER BY stage_items.name
+            SELECT
+                stage_items.*,
+                (
+                    SELECT to_json(array_agg(sii.* ORDER BY sii.id))
+                    FROM inputs_with_teams sii
+                    WHERE sii.stage_item_id = stage_items.id
+                ) AS inputs,
+                (
+                    SELECT to_json(array_agg(r.* ORDER BY r.id))
+                    FROM rounds_with_matches r
+                    WHERE r.stage_item_id = stage_items.id
+                ) AS rounds
+            FROM selected_stage_items stage_items
         )
-        SELECT stages.*, to_json(array_agg(r.*)) AS stage_items
+    """
+
+
+async def sql_get_full_tournament_details(
+    tournament_id: TournamentId, stage_id: StageId | None = None
+) -> list[StageWithStageItems]:
+    stage_filter = "AND stages.id = :stage_id" if stage_id is not None else ""
+    query = f"""
+        {get_stage_item_details_ctes(stage_item_filter=stage_filter)}
+        SELECT stages.*, to_json(array_agg(r.* ORDER BY r.name, r.id)) AS stage_items
         FROM stages
         LEFT JOIN stage_items_with_rounds_and_inputs r on stages.id = r.stage_id
-        {stage_item_filter_join}
         WHERE stages.tournament_id = :tournament_id
         {stage_filter}
-        {stage_item_filter}
         GROUP BY stages.id
         ORDER BY stages.id
     """
-    values = dict_without_none(
-        {
-            "tournament_id": tournament_id,
-            "round_id": round_id,
-            "stage_id": stage_id,
-            "stage_item_ids": stage_item_ids,
-        }
-    )
+    values = dict_without_none({"tournament_id": tournament_id, "stage_id": stage_id})
     result = await database.fetch_all(query=query, values=values)
     return [StageWithStageItems.model_validate(dict(x._mapping)) for x in result]
 
 
+async def get_full_tournament_details(
+    tournament_id: TournamentId,
+    round_id: RoundId | None = None,
+    stage_id: StageId | None = None,
+    stage_item_ids: set[StageItemId] | None = None,
+    *,
+    no_draft_rounds: bool = False,
+) -> list[StageWithStageItems]:
+    """
+    Returns the stages, stage items, rounds and matches of a tournament.
+
+    The full tournament is cached in memory until the next write to this tournament, filters
+    are applied to the cached snapshot. The returned models are shared between requests, so
+    they should not be modified in place (use `model_copy` instead).
+    """
+    stages = get_cached_tournament_details(tournament_id)
+    if stages is None:
+        version = get_tournament_version(tournament_id)
+        stages = await sql_get_full_tournament_details(tournament_id)
+        set_cached_tournament_details(tournament_id, version, stages)
+
+    return filter_tournament_details(
+        stages, round_id, stage_id, stage_item_ids, no_draft_rounds=no_draft_rounds
+    )
+
+
+async def get_stage_with_stage_items(
+    tournament_id: TournamentId, stage_id: StageId
+) -> StageWithStageItems | None:
+    """
+    Returns a single stage, using the cached tournament if available and otherwise only
+    querying this stage.
+    """
+    cached = get_cached_tournament_details(tournament_id)
+    stages = (
+        filter_tournament_details(cached, stage_id=stage_id)
+        if cached is not None
+        else await sql_get_full_tournament_details(tournament_id, stage_id=stage_id)
+    )
+    return stages[0] if len(stages) > 0 else None
+
+
 async def sql_delete_stage(tournament_id: TournamentId, stage_id: StageId) -> None:
     async with database.transaction():
         query = """
@@ -131,6 +201,8 @@ async def sql_delete_stage(tournament_id: TournamentId, stage_id: StageId) -> No
             query=query, values={"stage_id": stage_id, "tournament_id": tournament_id}
         )
 
+    bump_tournament_version(tournament_id)
+
 
 async def sql_create_stage(tournament_id: TournamentId) -> Stage:
     query = """
@@ -143,6 +215,7 @@ async def sql_create_stage(tournament_id: TournamentId) -> Stage:
         values={"tournament_id": tournament_id, "name": "Stage"},
     )
 
+    bump_tournament_version(tournament_id)
     if result is None:
         raise ValueError("Could not create stage")
 
@@ -210,3 +283,4 @@ async def sql_activate_next_stage(
         query=update_query,
         values={"tournament_id": tournament_id, "new_active_stage_id": new_active_stage_id},
     )
+    bump_tournament_version(tournament_id)
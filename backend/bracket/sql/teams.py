@@ -3,6 +3,7 @@ from typing import cast
 from bracket.database import database
 from bracket.logic.ranking.statistics import TeamStatistics
 from bracket.models.db.team import FullTeamWithPlayers, Team
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.id_types import StageItemInputId, TeamId, TournamentId
 from bracket.utils.pagination import PaginationTeams
 from bracket.utils.types import dict_without_none
@@ -92,30 +93,70 @@ async def get_team_count(
 
 async def update_team_stats(
     tournament_id: TournamentId,
-    stage_item_input_id: StageItemInputId,
-    team_statistics: TeamStatistics,
-) -> None:
-    query = """
+    statistics_per_input: dict[StageItemInputId, TeamStatistics],
+    *,
+    add_to_existing: bool = False,
+) -> dict[StageItemInputId, TeamStatistics]:
+    """
+    Updates the statistics of all given stage item inputs using a single statement, and returns
+    the statistics that are stored afterwards.
+
+    If `add_to_existing` is set, the given statistics are added to the stored statistics
+    instead of replacing them, so concurrent updates of the same inputs don't overwrite each other.
+    """
+    if len(statistics_per_input) < 1:
+        return {}
+
+    set_clause = (
+        """
+            wins = stage_item_inputs.wins + stats.wins,
+            draws = stage_item_inputs.draws + stats.draws,
+            losses = stage_item_inputs.losses + stats.losses,
+            points = stage_item_inputs.points + stats.points
+        """
+        if add_to_existing
+        else """
+            wins = stats.wins,
+            draws = stats.draws,
+            losses = stats.losses,
+            points = stats.points
+        """
+    )
+    query = f"""
         UPDATE stage_item_inputs
-        SET
-            wins = :wins,
-            draws = :draws,
-            losses = :losses,
-            points = :points
+        SET {set_clause}
+        FROM unnest(
+            CAST(:stage_item_input_ids AS bigint[]),
+            CAST(:wins AS integer[]),
+            CAST(:draws AS integer[]),
+            CAST(:losses AS integer[]),
+            CAST(:points AS double precision[])
+        ) AS stats(stage_item_input_id, wins, draws, losses, points)
         WHERE stage_item_inputs.tournament_id = :tournament_id
-        AND stage_item_inputs.id = :stage_item_input_id
+        AND stage_item_inputs.id = stats.stage_item_input_id
+        RETURNING
+            stage_item_inputs.id,
+            stage_item_inputs.wins,
+            stage_item_inputs.draws,
+            stage_item_inputs.losses,
+            stage_item_inputs.points
         """
-    await database.execute(
+    result = await database.fetch_all(
         query=query,
         values={
             "tournament_id": tournament_id,
-            "stage_item_input_id": stage_item_input_id,
-            "wins": team_statistics.wins,
-            "draws": team_statistics.draws,
-            "losses": team_statistics.losses,
-            "points": float(team_statistics.points),
+            "stage_item_input_ids": list(statistics_per_input.keys()),
+            "wins": [stats.wins for stats in statistics_per_input.values()],
+            "draws": [stats.draws for stats in statistics_per_input.values()],
+            "losses": [stats.losses for stats in statistics_per_input.values()],
+            "points": [float(stats.points) for stats in statistics_per_input.values()],
         },
     )
+    bump_tournament_version(tournament_id)
+    return {
+        StageItemInputId(row["id"]): TeamStatistics.model_validate(dict(row._mapping))
+        for row in result
+    }
 
 
 async def sql_delete_team(tournament_id: TournamentId, team_id: TeamId) -> None:
@@ -123,8 +164,10 @@ async def sql_delete_team(tournament_id: TournamentId, team_id: TeamId) -> None:
     await database.fetch_one(
         query=query, values={"team_id": team_id, "tournament_id": tournament_id}
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_delete_teams_of_tournament(tournament_id: TournamentId) -> None:
     query = "DELETE FROM teams WHERE tournament_id = :tournament_id"
     await database.fetch_one(query=query, values={"tournament_id": tournament_id})
+    bump_tournament_version(tournament_id)
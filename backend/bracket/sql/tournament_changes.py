@@ -0,0 +1,176 @@
+from heliclockter import datetime_utc
+from pydantic import TypeAdapter
+
+from bracket.database import database
+from bracket.models.db.court import Court
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.round import Round
+from bracket.models.db.stage_item_inputs import StageItemInput
+from bracket.models.db.tournament_change import TournamentChange
+from bracket.utils.id_types import CourtId, MatchId, RoundId, StageItemInputId, TeamId, TournamentId
+
+
+async def sql_get_tournament_changes(
+    tournament_id: TournamentId, since: int, limit: int
+) -> list[TournamentChange]:
+    query = """
+        SELECT *
+        FROM tournament_changes
+        WHERE tournament_id = :tournament_id
+        AND id > :since
+        ORDER BY id
+        LIMIT :limit
+        """
+    result = await database.fetch_all(
+        query=query, values={"tournament_id": tournament_id, "since": since, "limit": limit}
+    )
+    return [TournamentChange.model_validate(dict(x._mapping)) for x in result]
+
+
+async def sql_get_change_log_bounds() -> tuple[int, int]:
+    """
+    Returns the ids of the oldest and the latest change in the log (of all tournaments).
+    """
+    query = """
+        SELECT COALESCE(MIN(id), 0) AS oldest_id, COALESCE(MAX(id), 0) AS latest_id
+        FROM tournament_changes
+        """
+    result = await database.fetch_one(query=query)
+    assert result is not None
+    return int(result["oldest_id"]), int(result["latest_id"])
+
+
+async def sql_get_latest_tournament_change_id(tournament_id: TournamentId) -> int:
+    query = """
+        SELECT COALESCE(MAX(id), 0)
+        FROM tournament_changes
+        WHERE tournament_id = :tournament_id
+        """
+    return int(await database.execute(query=query, values={"tournament_id": tournament_id}))
+
+
+async def sql_delete_tournament_changes_before(created: datetime_utc) -> None:
+    query = """
+        DELETE FROM tournament_changes
+        WHERE created < :created
+        """
+    await database.execute(query=query, values={"created": created})
+
+
+def get_input_with_team_json(alias: str) -> str:
+    return f"to_jsonb({alias}.*) || jsonb_build_object('team', to_jsonb({alias}_team.*))"
+
+
+async def sql_get_matches_with_details_by_ids(
+    tournament_id: TournamentId,
+    match_ids: set[MatchId],
+    round_ids: set[RoundId],
+    *,
+    no_draft_rounds: bool,
+) -> list[MatchWithDetailsDefinitive | MatchWithDetails]:
+    """
+    Returns the given matches and all matches of the given rounds, in the same format as in
+    `sql_get_full_tournament_details`.
+    """
+    draft_filter = "AND rounds.is_draft IS FALSE" if no_draft_rounds else ""
+    query = f"""
+        SELECT to_json(array_agg(m.* ORDER BY m.id)) AS matches
+        FROM (
+            SELECT
+                matches.*,
+                {get_input_with_team_json("sii1")} AS stage_item_input1,
+                {get_input_with_team_json("sii2")} AS stage_item_input2,
+                to_json(c) AS court
+            FROM matches
+            JOIN rounds ON rounds.id = matches.round_id
+            JOIN stage_items ON stage_items.id = rounds.stage_item_id
+            JOIN stages ON stages.id = stage_items.stage_id
+            LEFT JOIN stage_item_inputs sii1 ON sii1.id = matches.stage_item_input1_id
+            LEFT JOIN teams sii1_team ON sii1_team.id = sii1.team_id
+            LEFT JOIN stage_item_inputs sii2 ON sii2.id = matches.stage_item_input2_id
+            LEFT JOIN teams sii2_team ON sii2_team.id = sii2.team_id
+            LEFT JOIN courts c ON c.id = matches.court_id
+            WHERE stages.tournament_id = :tournament_id
+            AND (
+                matches.id = ANY(CAST(:match_ids AS bigint[]))
+                OR matches.round_id = ANY(CAST(:round_ids AS bigint[]))
+            )
+            {draft_filter}
+        ) m
+        """
+    result = await database.fetch_one(
+        query=query,
+        values={
+            "tournament_id": tournament_id,
+            "match_ids": list(match_ids),
+            "round_ids": list(round_ids),
+        },
+    )
+    assert result is not None
+    return TypeAdapter(list[MatchWithDetailsDefinitive | MatchWithDetails]).validate_json(
+        result["matches"] or "[]"
+    )
+
+
+async def sql_get_rounds_by_ids(
+    tournament_id: TournamentId, round_ids: set[RoundId], *, no_draft_rounds: bool
+) -> list[Round]:
+    draft_filter = "AND rounds.is_draft IS FALSE" if no_draft_rounds else ""
+    query = f"""
+        SELECT rounds.*
+        FROM rounds
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        WHERE stages.tournament_id = :tournament_id
+        AND rounds.id = ANY(CAST(:round_ids AS bigint[]))
+        {draft_filter}
+        ORDER BY rounds.id
+        """
+    result = await database.fetch_all(
+        query=query, values={"tournament_id": tournament_id, "round_ids": list(round_ids)}
+    )
+    return [Round.model_validate(dict(x._mapping)) for x in result]
+
+
+async def sql_get_stage_item_inputs_by_ids(
+    tournament_id: TournamentId, stage_item_input_ids: set[StageItemInputId], team_ids: set[TeamId]
+) -> list[StageItemInput]:
+    """
+    Returns the given stage item inputs and all inputs of the given teams, with their team.
+    """
+    query = f"""
+        SELECT to_json(array_agg({get_input_with_team_json("sii")} ORDER BY sii.id)) AS inputs
+        FROM stage_item_inputs sii
+        LEFT JOIN teams sii_team ON sii_team.id = sii.team_id
+        WHERE sii.tournament_id = :tournament_id
+        AND (
+            sii.id = ANY(CAST(:stage_item_input_ids AS bigint[]))
+            OR sii.team_id = ANY(CAST(:team_ids AS bigint[]))
+        )
+        """
+    result = await database.fetch_one(
+        query=query,
+        values={
+            "tournament_id": tournament_id,
+            "stage_item_input_ids": list(stage_item_input_ids),
+            "team_ids": list(team_ids),
+        },
+    )
+    assert result is not None
+    return TypeAdapter(list[StageItemInput]).validate_json(result["inputs"] or "[]")
+
+
+async def sql_get_courts_by_ids(
+    tournament_id: TournamentId, court_ids: set[CourtId]
+) -> list[Court]:
+    query = """
+        SELECT *
+        FROM courts
+        WHERE courts.tournament_id = :tournament_id
+        AND courts.id = ANY(CAST(:court_ids AS bigint[]))
+        ORDER BY courts.id
+        """
+    result = await database.fetch_all(
+        query=query, values={"tournament_id": tournament_id, "court_ids": list(court_ids)}
+    )
+    return [Court.model_validate(dict(x._mapping)) for x in result]
@@ -7,6 +7,7 @@ from bracket.models.db.tournament import (
     TournamentChangeStatusBody,
     TournamentUpdateBody,
 )
+from bracket.sql.cache import bump_tournament_version, invalidate_auth_caches
 from bracket.utils.id_types import TournamentId
 
 
@@ -64,6 +65,8 @@ async def sql_delete_tournament(tournament_id: TournamentId) -> None:
         WHERE id = :tournament_id
         """
     await database.fetch_one(query=query, values={"tournament_id": tournament_id})
+    bump_tournament_version(tournament_id)
+    invalidate_auth_caches()
 
 
 async def sql_update_tournament(
@@ -86,6 +89,7 @@ async def sql_update_tournament(
         query=query,
         values={"tournament_id": tournament_id, **tournament.model_dump()},
     )
+    bump_tournament_version(tournament_id)
 
 
 async def sql_update_tournament_status(
@@ -103,6 +107,7 @@ async def sql_update_tournament_status(
     # When tournament is archived, setting dashboard_public to False shouldn't have an effect.
     params = {"tournament_id": tournament_id, "state": body.status.value, "dashboard_public": False}
     await database.execute(query=query, values=params)
+    bump_tournament_version(tournament_id)
 
 
 async def sql_create_tournament(tournament: TournamentBody) -> TournamentId:
@@ -3,6 +3,7 @@ from bracket.logic.tournaments import sql_delete_tournament_completely
 from bracket.models.db.account import UserAccountType
 from bracket.models.db.user import User, UserInDB, UserInsertable, UserPublic, UserToUpdate
 from bracket.schema import users
+from bracket.sql.cache import invalidate_auth_caches, tournament_access_cache
 from bracket.sql.clubs import get_clubs_for_user_id, sql_delete_club
 from bracket.sql.tournaments import sql_get_tournaments
 from bracket.utils.db import fetch_one_parsed
@@ -11,14 +12,31 @@ from bracket.utils.types import assert_some
 
 
 async def get_user_access_to_tournament(tournament_id: TournamentId, user_id: UserId) -> bool:
+    """
+    Only positive results are cached, so newly created tournaments and clubs don't require
+    invalidating the cache.
+    """
+    if tournament_access_cache.get((user_id, tournament_id)):
+        return True
+
     query = """
-        SELECT DISTINCT t.id
-        FROM users_x_clubs
-        JOIN tournaments t ON t.club_id = users_x_clubs.club_id
-        WHERE user_id = :user_id
+        SELECT EXISTS (
+            SELECT 1
+            FROM users_x_clubs
+            JOIN tournaments t ON t.club_id = users_x_clubs.club_id
+            WHERE users_x_clubs.user_id = :user_id
+            AND t.id = :tournament_id
+        )
         """
-    result = await database.fetch_all(query=query, values={"user_id": user_id})
-    return tournament_id in {tournament["id"] for tournament in result}
+    has_access = bool(
+        await database.fetch_val(
+            query=query, values={"user_id": user_id, "tournament_id": tournament_id}
+        )
+    )
+    if has_access:
+        tournament_access_cache.set((user_id, tournament_id), True)
+
+    return has_access
 
 
 async def get_which_clubs_has_user_access_to(user_id: UserId) -> set[ClubId]:
@@ -44,6 +62,7 @@ async def update_user(user_id: UserId, user: UserToUpdate) -> None:
     await database.execute(
         query=query, values={"user_id": user_id, "name": user.name, "email": user.email}
     )
+    invalidate_auth_caches()
 
 
 async def update_user_account_type(user_id: UserId, account_type: UserAccountType) -> None:
@@ -55,6 +74,7 @@ async def update_user_account_type(user_id: UserId, account_type: UserAccountTyp
     await database.execute(
         query=query, values={"user_id": user_id, "account_type": account_type.value}
     )
+    invalidate_auth_caches()
 
 
 async def update_user_password(user_id: UserId, password_hash: str) -> None:
@@ -64,6 +84,7 @@ async def update_user_password(user_id: UserId, password_hash: str) -> None:
         WHERE id = :user_id
         """
     await database.execute(query=query, values={"user_id": user_id, "password_hash": password_hash})
+    invalidate_auth_caches()
 
 
 async def get_user_by_id(user_id: UserId) -> UserPublic | None:
@@ -112,6 +133,7 @@ async def delete_user(user_id: UserId) -> None:
         WHERE id = :user_id
         """
     await database.fetch_one(query=query, values={"user_id": user_id})
+    invalidate_auth_caches()
 
 
 async def check_whether_email_is_in_use(email: str) -> bool:
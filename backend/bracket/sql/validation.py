@@ -1,15 +1,11 @@
-from collections.abc import Awaitable, Callable
+from collections import defaultdict
 from typing import Any, NoReturn, get_args
 
 from fastapi import HTTPException
 from pydantic import BaseModel
 from starlette import status
 
-from bracket.models.db.util import StageWithStageItems
-from bracket.sql.courts import get_all_courts_in_tournament
-from bracket.sql.players import get_all_players_in_tournament, get_player_by_id
-from bracket.sql.stages import get_full_tournament_details
-from bracket.sql.teams import get_team_by_id
+from bracket.database import database
 from bracket.utils.id_types import (
     CourtId,
     MatchId,
@@ -22,87 +18,102 @@ from bracket.utils.id_types import (
     TournamentId,
 )
 
-CheckCallableT = Callable[[Any, list[StageWithStageItems], TournamentId], Awaitable[bool]]
+# For every type of ID: the table it refers to and the joins needed to get to the tournament of a
+# row. Tables without joins have a `tournament_id` column themselves.
+OWNERSHIP_LOOKUP: dict[Any, tuple[str, str]] = {
+    StageId: ("stages", ""),
+    TeamId: ("teams", ""),
+    StageItemId: ("stage_items", "JOIN stages ON stages.id = stage_items.stage_id"),
+    StageItemInputId: ("stage_item_inputs", ""),
+    RoundId: (
+        "rounds",
+        """
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        """,
+    ),
+    PlayerId: ("players", ""),
+    MatchId: (
+        "matches",
+        """
+        JOIN rounds ON rounds.id = matches.round_id
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        """,
+    ),
+    CourtId: ("courts", ""),
+}
 
 
-async def check_stage_belongs_to_tournament(
-    stage_id: StageId, stages: list[StageWithStageItems], _: TournamentId
-) -> bool:
-    return any(stage.id == stage_id for stage in stages)
-
-
-async def check_team_belongs_to_tournament(
-    team_id: TeamId, _: list[StageWithStageItems], tournament_id: TournamentId
-) -> bool:
-    return await get_team_by_id(team_id, tournament_id) is not None
-
-
-async def check_stage_item_belongs_to_tournament(
-    stage_item_id: StageItemId, stages: list[StageWithStageItems], _: TournamentId
-) -> bool:
-    return any(
-        stage_item.id == stage_item_id for stage in stages for stage_item in stage.stage_items
-    )
-
+def raise_exception(field_type: Any, field_value: Any) -> NoReturn:
+    field_name = field_type.__name__ if field_type is not None else "Unknown type"
+    msg = f"Could not find {field_name.replace('Id', '')}(s) with ID {field_value}"
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=msg)
 
-async def check_stage_item_input_belongs_to_tournament(
-    stage_item_input_id: StageItemInputId, stages: list[StageWithStageItems], _: TournamentId
-) -> bool:
-    return any(
-        stage_item_input.id == stage_item_input_id
-        for stage in stages
-        for stage_item in stage.stage_items
-        for stage_item_input in stage_item.inputs
-    )
 
+def collect_foreign_keys(some_body: BaseModel) -> list[tuple[Any, Any, set[int]]]:
+    """
+    Inspects the types of BaseModel attributes (recursively) and returns a tuple of
+    (id type, field value, ids) for every attribute that refers to a row of a tournament.
+    """
+    result: list[tuple[Any, Any, set[int]]] = []
 
-async def check_round_belongs_to_tournament(
-    round_id: RoundId, stages: list[StageWithStageItems], _: TournamentId
-) -> bool:
-    return any(
-        round_.id == round_id
-        for stage in stages
-        for stage_item in stage.stage_items
-        for round_ in stage_item.rounds
-    )
+    for field_key, field_info in type(some_body).model_fields.items():
+        field_value = getattr(some_body, field_key)
+        if field_value is None:
+            continue
 
+        if isinstance(field_value, BaseModel):
+            result.extend(collect_foreign_keys(field_value))
+        elif isinstance(field_value, set):
+            if field_info.annotation == set[PlayerId]:
+                result.append((PlayerId, field_value, field_value))
+            else:
+                raise Exception(f"Unknown set type: {field_info.annotation}")
+        else:
+            possible_types = [field_info.annotation, *get_args(field_info.annotation)]
+            for possible_type in possible_types:
+                if possible_type is not None and possible_type in OWNERSHIP_LOOKUP:
+                    result.append((possible_type, field_value, {field_value}))
 
-async def check_match_belongs_to_tournament(
-    match_id: MatchId, stages: list[StageWithStageItems], _: TournamentId
-) -> bool:
-    return any(
-        match.id == match_id
-        for stage in stages
-        for stage_item in stage.stage_items
-        for round_ in stage_item.rounds
-        for match in round_.matches
-    )
+    return result
 
 
-async def check_player_belongs_to_tournament(
-    player_id: PlayerId, _: list[StageWithStageItems], tournament_id: TournamentId
-) -> bool:
-    return await get_player_by_id(player_id, tournament_id) is not None
+def get_ownership_probe(id_type: Any, table: str, joins: str) -> str:
+    tournament_column = "stages.tournament_id" if joins else f"{table}.tournament_id"
+    return f"""
+        SELECT '{id_type.__name__}' AS id_type, {table}.id
+        FROM {table}
+        {joins}
+        WHERE {tournament_column} = :tournament_id
+        AND {table}.id = ANY(CAST(:{table}_ids AS bigint[]))
+        """
 
 
-async def check_players_belong_to_tournament(
-    player_ids: set[PlayerId], tournament_id: TournamentId
-) -> bool:
-    return player_ids.issubset(
-        player.id for player in await get_all_players_in_tournament(tournament_id)
-    )
+# Probes all types of IDs, also the ones that aren't checked (with an empty array), so that the
+# query text is the same for every request and its prepared statement can be reused.
+OWNERSHIP_QUERY = " UNION ALL ".join(
+    get_ownership_probe(id_type, table, joins)
+    for id_type, (table, joins) in OWNERSHIP_LOOKUP.items()
+)
 
 
-async def check_court_belongs_to_tournament(
-    court_id: CourtId, _: list[StageWithStageItems], tournament_id: TournamentId
-) -> bool:
-    return any(court_id == court.id for court in await get_all_courts_in_tournament(tournament_id))
+async def get_ids_belonging_to_tournament(
+    ids_per_type: dict[Any, set[int]], tournament_id: TournamentId
+) -> dict[str, set[int]]:
+    """
+    Returns which of the given IDs belong to the tournament, using a single query.
+    """
+    values: dict[str, Any] = {"tournament_id": tournament_id} | {
+        f"{table}_ids": list(ids_per_type.get(id_type, set()))
+        for id_type, (table, _) in OWNERSHIP_LOOKUP.items()
+    }
 
+    found: dict[str, set[int]] = defaultdict(set)
+    for record in await database.fetch_all(query=OWNERSHIP_QUERY, values=values):
+        found[record["id_type"]].add(record["id"])
 
-def raise_exception(field_type: Any, field_value: Any) -> NoReturn:
-    field_name = field_type.__name__ if field_type is not None else "Unknown type"
-    msg = f"Could not find {field_name.replace('Id', '')}(s) with ID {field_value}"
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=msg)
+    return found
 
 
 async def check_foreign_keys_belong_to_tournament(
@@ -113,38 +124,15 @@ async def check_foreign_keys_belong_to_tournament(
     is indeed part of the tournament. This prohibits e.g. adding players from another tournament to
     a certain team.
     """
-    stages = await get_full_tournament_details(tournament_id)
-
-    check_lookup: dict[type[Any], CheckCallableT] = {  # pyrefly: ignore [bad-assignment]
-        StageId: check_stage_belongs_to_tournament,
-        TeamId: check_team_belongs_to_tournament,
-        StageItemId: check_stage_item_belongs_to_tournament,
-        StageItemInputId: check_stage_item_input_belongs_to_tournament,
-        RoundId: check_round_belongs_to_tournament,
-        PlayerId: check_player_belongs_to_tournament,
-        MatchId: check_match_belongs_to_tournament,
-        CourtId: check_court_belongs_to_tournament,
-    }
-
-    for field_key, field_info in type(some_body).model_fields.items():
-        field_value = getattr(some_body, field_key)
-        if field_value is None:
-            continue
-
-        if isinstance(field_value, BaseModel):
-            await check_foreign_keys_belong_to_tournament(field_value, tournament_id)
-        elif isinstance(field_value, set):
-            if field_info.annotation == set[PlayerId]:
-                if not await check_players_belong_to_tournament(field_value, tournament_id):
-                    raise_exception(PlayerId, field_value)
-            else:
-                raise Exception(f"Unknown set type: {field_info.annotation}")
-        else:
-            possible_types = [field_info.annotation, *get_args(field_info.annotation)]
-            for possible_type in possible_types:
-                if possible_type is not None:
-                    check_callable = check_lookup.get(possible_type)
-                    if check_callable is not None and not await check_callable(
-                        field_value, stages, tournament_id
-                    ):
-                        raise_exception(possible_type, field_value)
+    foreign_keys = collect_foreign_keys(some_body)
+    if len(foreign_keys) < 1:
+        return
+
+    ids_per_type: dict[Any, set[int]] = defaultdict(set)
+    for id_type, _, ids in foreign_keys:
+        ids_per_type[id_type].update(ids)
+
+    found = await get_ids_belonging_to_tournament(ids_per_type, tournament_id)
+    for id_type, field_value, ids in foreign_keys:
+        if not ids.issubset(found[id_type.__name__]):
+            raise_exception(id_type, field_value)
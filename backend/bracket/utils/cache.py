@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, ClassVar
+
+
+class LRUCache[KeyT, ValueT]:
+    """
+    In-process mapping with a maximum size that evicts the least recently used entry.
+
+    Entries optionally expire `ttl_seconds` after they were set. Every cache registers itself by
+    name, so hit/miss counters can be exported in `/metrics`.
+    """
+
+    registry: ClassVar[dict[str, LRUCache[Any, Any]]] = {}
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float | None = None) -> None:
+        assert max_size > 0, "Cache needs to be able to hold at least one entry"
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[KeyT, tuple[float, ValueT]] = OrderedDict()
+        LRUCache.registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: KeyT) -> ValueT | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: KeyT, value: ValueT) -> None:
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else math.inf
+        )
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: KeyT) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
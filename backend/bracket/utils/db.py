@@ -4,6 +4,7 @@ from sqlalchemy import Table
 from sqlalchemy.sql import Select
 
 from bracket.config import Environment, environment
+from bracket.sql.cache import invalidate_all_caches
 from bracket.utils.conversion import to_string_mapping
 from bracket.utils.logging import logger
 from bracket.utils.types import assert_some
@@ -40,6 +41,7 @@ async def insert_generic[BaseModelT: BaseModel](
             f"INSERT INTO {table.name} ({', '.join(mapping.keys())}) VALUES ({values}) RETURNING *"
         )
         last_record_id: int = await database.execute(query)
+        invalidate_all_caches()
         row_inserted = await fetch_one_parsed(
             database, return_type, table.select().where(table.c.id == last_record_id)
         )
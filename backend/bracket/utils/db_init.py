@@ -48,7 +48,7 @@ from bracket.schema import (
     users_x_clubs,
 )
 from bracket.sql.matches import sql_update_match
-from bracket.sql.stage_items import get_stage_item, sql_create_stage_item_with_inputs
+from bracket.sql.stage_items import sql_create_stage_item_with_inputs
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.sql.users import create_user, get_user
@@ -89,7 +89,7 @@ from bracket.utils.id_types import (
     UserId,
 )
 from bracket.utils.logging import logger
-from bracket.utils.security import hash_password
+from bracket.utils.security import hash_password_async
 from bracket.utils.types import assert_some
 
 if TYPE_CHECKING:
@@ -104,7 +104,7 @@ async def create_admin_user() -> UserId:
         UserInsertable(
             name="Admin",
             email=config.admin_email,
-            password_hash=hash_password(config.admin_password),
+            password_hash=await hash_password_async(config.admin_password),
             created=datetime_utc.now(),
             account_type=UserAccountType.REGULAR,
         )
@@ -369,7 +369,6 @@ async def sql_create_dev_db() -> UserId:
                     )
 
     for _stage_item in (stage_item_1, stage_item_2, stage_item_3):
-        stage_item_with_rounds = await get_stage_item(tournament_id_1, _stage_item.id)
-        await recalculate_ranking_for_stage_item(tournament_id_1, stage_item_with_rounds)
+        await recalculate_ranking_for_stage_item(tournament_id_1, _stage_item.id)
 
     return user_id_1
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from collections.abc import Callable
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+from bracket.config import config
+from bracket.database import worker_application_name
+from bracket.utils.asyncio import AsyncioTasksManager
+from bracket.utils.logging import logger
+from bracket.utils.types import JsonDict
+
+type NotificationCallback = Callable[[JsonDict], None]
+
+RECONNECT_INTERVAL_SECONDS = 1.0
+
+
+class NotificationBus:
+    """
+    Sends and receives notifications between workers over Postgres `LISTEN`/`NOTIFY`, so that
+    every worker can invalidate its caches and forward events after a change by another worker.
+
+    Notifications include the `application_name` of the connection that sent them, which is
+    unique per worker. Notifications of this worker itself are ignored, since its local state
+    has already been updated when making the change.
+    """
+
+    def __init__(self, application_name: str) -> None:
+        self.application_name = application_name
+        self.connection: Any = None
+        self.callbacks: dict[str, NotificationCallback] = {}
+        self.on_reconnect: Callable[[], None] | None = None
+        self.send_lock = asyncio.Lock()
+
+    async def connect(
+        self, callbacks: dict[str, NotificationCallback], on_reconnect: Callable[[], None]
+    ) -> None:
+        """
+        Starts listening on the channels in `callbacks`.
+
+        Notifications sent while the connection is lost can't be received, so `on_reconnect` is
+        called after reconnecting to invalidate all local state.
+        """
+        self.callbacks = callbacks
+        self.on_reconnect = on_reconnect
+        await self._listen()
+
+    async def disconnect(self) -> None:
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            await connection.close()
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(
+            str(config.pg_dsn), server_settings={"application_name": self.application_name}
+        )
+        for channel in self.callbacks:
+            await connection.add_listener(channel, self._handle_notification)
+
+        connection.add_termination_listener(self._handle_termination)
+        self.connection = connection
+
+    async def _reconnect(self) -> None:
+        while self.connection is None:
+            try:
+                await self._listen()
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning(f"Could not reconnect to listen for notifications: {exc}")
+                await asyncio.sleep(RECONNECT_INTERVAL_SECONDS)
+
+        if self.on_reconnect is not None:
+            self.on_reconnect()
+
+    def _handle_termination(self, connection: Any) -> None:
+        if connection is not self.connection:
+            return
+
+        logger.warning("Lost the connection for notifications, reconnecting")
+        self.connection = None
+        AsyncioTasksManager.add_coroutine(self._reconnect())
+
+    def _handle_notification(self, _: Any, __: int, channel: str, payload: str) -> None:
+        notification: JsonDict = json.loads(payload)
+        if notification.get("origin") != self.application_name:
+            self.callbacks[channel](notification)
+
+    def notify(self, channel: str, notification: JsonDict) -> None:
+        """
+        Sends a notification to all other workers, if the bus is connected.
+        """
+        if self.connection is None:
+            return
+
+        payload = json.dumps({**notification, "origin": self.application_name})
+        AsyncioTasksManager.add_coroutine(self._send(channel, payload))
+
+    async def _send(self, channel: str, payload: str) -> None:
+        # A connection can only execute one query at a time.
+        async with self.send_lock:
+            if self.connection is None:
+                return
+
+            try:
+                await self.connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning(f"Could not send notification on channel {channel}: {exc}")
+
+
+notification_bus = NotificationBus(worker_application_name)
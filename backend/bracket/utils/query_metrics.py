@@ -0,0 +1,126 @@
+import hashlib
+import re
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from bracket.config import config
+from bracket.utils.logging import logger
+
+QUERY_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERIES_PER_REQUEST_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """
+    Counts observations per bucket, like a Prometheus histogram.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[i] += 1
+
+    def to_prometheus(self, name: str, labels: dict[str, str]) -> str:
+        def format_labels(extra_labels: dict[str, str]) -> str:
+            return ",".join(
+                f'{label}="{label_value}"'
+                for label, label_value in {**labels, **extra_labels}.items()
+            )
+
+        lines = [
+            f"{name}_bucket{{{format_labels({'le': str(upper_bound)})}}} {bucket_count}"
+            for upper_bound, bucket_count in zip(self.buckets, self.bucket_counts, strict=True)
+        ]
+        lines.append(f"{name}_bucket{{{format_labels({'le': '+Inf'})}}} {self.count}")
+        lines.append(f"{name}_sum{{{format_labels({})}}} {self.sum}")
+        lines.append(f"{name}_count{{{format_labels({})}}} {self.count}")
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=4096)
+def get_query_fingerprint(query: str) -> tuple[str, str]:
+    """
+    Returns a short hash of the query with its whitespace and literal numbers normalized, and the
+    normalized query itself.
+    """
+    normalized = re.sub(r"\b\d+\b", "?", " ".join(query.split()))
+    return hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()[:12], normalized
+
+
+@dataclass
+class RequestQueries:
+    """
+    The queries issued while handling a single request.
+    """
+
+    count_per_fingerprint: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def count(self) -> int:
+        return self.count_per_fingerprint.total()
+
+
+current_request_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "current_request_queries", default=None
+)
+
+
+class QueryMetrics:
+    """
+    Keeps track of the number and duration of queries per query fingerprint, logs slow queries
+    and warns about requests that execute the same query many times (N+1 queries).
+    """
+
+    def __init__(self) -> None:
+        self.query_count = 0
+        self.duration_per_fingerprint: defaultdict[str, Histogram] = defaultdict(
+            lambda: Histogram(QUERY_DURATION_BUCKETS)
+        )
+        self.query_per_fingerprint: dict[str, str] = {}
+        self.queries_per_request: defaultdict[tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(QUERIES_PER_REQUEST_BUCKETS)
+        )
+
+    def record_query(self, query: str, duration_seconds: float) -> None:
+        fingerprint, normalized_query = get_query_fingerprint(query)
+        self.query_count += 1
+        self.duration_per_fingerprint[fingerprint].observe(duration_seconds)
+        self.query_per_fingerprint[fingerprint] = normalized_query
+
+        request_queries = current_request_queries.get()
+        if request_queries is not None:
+            request_queries.count_per_fingerprint[fingerprint] += 1
+
+        if duration_seconds * 1000 >= config.slow_query_threshold_ms:
+            logger.warning(
+                "Slow query (%.0f ms, %s): %s",
+                duration_seconds * 1000,
+                fingerprint,
+                normalized_query,
+            )
+
+    def record_request(self, method: str, url: str, request_queries: RequestQueries) -> None:
+        self.queries_per_request[(method, url)].observe(request_queries.count)
+        for fingerprint, count in request_queries.count_per_fingerprint.items():
+            if count >= config.n_plus_one_query_threshold:
+                logger.warning(
+                    "Possible N+1 query, executed %d times for %s %s (%s): %s",
+                    count,
+                    method,
+                    url,
+                    fingerprint,
+                    self.query_per_fingerprint[fingerprint],
+                )
+
+
+query_metrics = QueryMetrics()
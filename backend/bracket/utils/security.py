@@ -1,9 +1,41 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
 import aiohttp
 import bcrypt
 
 from bracket.config import config
 
 
+class PasswordHashingPool:
+    """
+    Runs bcrypt on a bounded pool of threads, so hashing passwords doesn't block the event loop.
+
+    bcrypt releases the GIL while hashing, so other requests are served in the meantime. Calls
+    that arrive while all threads are busy wait in the queue of the executor.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="password-hashing")
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run[T](self, func: Callable[[], T]) -> T:
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func)
+        finally:
+            self.in_flight -= 1
+
+
+password_hashing_pool = PasswordHashingPool(config.password_hashing_threads)
+
+
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
@@ -12,6 +44,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+async def hash_password_async(password: str) -> str:
+    return await password_hashing_pool.run(lambda: hash_password(password))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(lambda: verify_password(plain_password, hashed_password))
+
+
 async def verify_captcha_token(captcha_token: str) -> bool:
     if config.captcha_secret is None:
         return True
@@ -1,7 +1,19 @@
 from starlette.requests import Request
+from starlette.responses import Response
 from starlette.routing import Match, Route
 
 
+class JSONBytesResponse(Response):
+    """
+    Response of which the content is already serialized to JSON.
+
+    FastAPI returns `Response` objects as-is, so models that are built from trusted data (like
+    the rows of our own database) aren't validated against the `response_model` again.
+    """
+
+    media_type = "application/json"
+
+
 def _get_route_for_request(request: Request) -> Route | None:
     """
     Determine FastAPI route for a starlette Request
@@ -111,7 +111,7 @@ async def test_activate_next_stage(
 
         # Set match score to get a winner (team 2) that goes to the next round
         [prev_stage, _] = await get_full_tournament_details(auth_context.tournament.id)
-        match1 = prev_stage.stage_items[0].rounds[0].matches[0]
+        match1 = prev_stage.stage_items[0].rounds[1].matches[1]
         assert isinstance(match1, MatchWithDetailsDefinitive)
         assert match1.stage_item_input2.team_id == team_inserted_2.id
         await sql_update_match(
@@ -125,8 +125,8 @@ async def test_activate_next_stage(
         )
         [_, next_stage] = await get_full_tournament_details(auth_context.tournament.id)
 
-        await sql_delete_stage_item_with_foreign_keys(stage_item_2.id)
-        await sql_delete_stage_item_with_foreign_keys(stage_item_1.id)
+        await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_2.id)
+        await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_1.id)
 
     assert response == SUCCESS_RESPONSE
 
@@ -18,6 +18,7 @@ from bracket.utils.dummy_records import (
 from bracket.utils.http import HTTPMethod
 from tests.integration_tests.api.shared import (
     SUCCESS_RESPONSE,
+    assert_max_query_count,
     send_tournament_request,
 )
 from tests.integration_tests.mocks import MOCK_NOW
@@ -68,6 +69,7 @@ async def test_start_next_round(
             ),
         )
         await sql_create_round(
+            tournament_id,
             RoundInsertable(
                 stage_item_id=stage_item_1.id,
                 name="",
@@ -77,12 +79,13 @@ async def test_start_next_round(
         )
 
         try:
-            response = await send_tournament_request(
-                HTTPMethod.POST,
-                f"stage_items/{stage_item_1.id}/start_next_round",
-                auth_context,
-                json={},
-            )
+            with assert_max_query_count(15):
+                response = await send_tournament_request(
+                    HTTPMethod.POST,
+                    f"stage_items/{stage_item_1.id}/start_next_round",
+                    auth_context,
+                    json={},
+                )
 
             assert response == SUCCESS_RESPONSE
 
@@ -95,4 +98,4 @@ async def test_start_next_round(
             msg = "No more matches to schedule, all combinations of teams have been added already"
             assert response == {"detail": msg}
         finally:
-            await sql_delete_stage_item_with_foreign_keys(stage_item_1.id)
+            await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_1.id)
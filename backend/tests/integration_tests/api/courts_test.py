@@ -1,3 +1,4 @@
+import aiohttp
 import pytest
 
 from bracket.database import database
@@ -6,7 +7,11 @@ from bracket.schema import courts
 from bracket.utils.db import fetch_one_parsed_certain
 from bracket.utils.dummy_records import DUMMY_COURT1, DUMMY_MOCK_TIME, DUMMY_TEAM1
 from bracket.utils.http import HTTPMethod
-from tests.integration_tests.api.shared import SUCCESS_RESPONSE, send_tournament_request
+from tests.integration_tests.api.shared import (
+    SUCCESS_RESPONSE,
+    get_root_uvicorn_url,
+    send_tournament_request,
+)
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import assert_row_count_and_clear, inserted_court, inserted_team
 
@@ -33,6 +38,34 @@ async def test_courts_endpoint(
             }
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_courts_endpoint_not_modified(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    url = f"{get_root_uvicorn_url()}tournaments/{auth_context.tournament.id}/courts"
+    async with (
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court_inserted,
+        aiohttp.ClientSession(headers=auth_context.headers) as session,
+    ):
+        async with session.get(url) as response:
+            assert response.status == 200
+            etag = response.headers["ETag"]
+
+        async with session.get(url, headers={"If-None-Match": etag}) as response:
+            assert response.status == 304
+            assert response.headers["ETag"] == etag
+
+        await send_tournament_request(
+            HTTPMethod.PUT, f"courts/{court_inserted.id}", auth_context, json={"name": "Other"}
+        )
+        async with session.get(url, headers={"If-None-Match": etag}) as response:
+            assert response.status == 200
+            assert response.headers["ETag"] != etag
+            assert (await response.json())["data"][0]["name"] == "Other"
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_create_court(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
@@ -1,14 +1,29 @@
+import asyncio
+import json
 from decimal import Decimal
 
+import aiohttp
 import pytest
 
 from bracket.database import database
-from bracket.models.db.match import Match
+from bracket.logic.ranking.calculation import (
+    recalculate_ranking_for_stage_item,
+    update_ranking_for_match_result,
+)
+from bracket.models.db.match import Match, MatchBody
 from bracket.models.db.stage_item import StageType
 from bracket.models.db.stage_item_inputs import (
     StageItemInputInsertable,
 )
 from bracket.schema import matches
+from bracket.sql.matches import (
+    sql_reschedule_matches,
+    sql_set_conflicts_for_matches,
+    sql_set_input_ids_for_matches,
+    sql_update_match,
+)
+from bracket.sql.stage_items import get_stage_item
+from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.db import fetch_one_parsed_certain
 from bracket.utils.dummy_records import (
     DUMMY_COURT1,
@@ -24,7 +39,14 @@ from bracket.utils.dummy_records import (
     DUMMY_TEAM2,
 )
 from bracket.utils.http import HTTPMethod
-from tests.integration_tests.api.shared import SUCCESS_RESPONSE, send_tournament_request
+from bracket.utils.id_types import TournamentId
+from bracket.utils.types import assert_some
+from tests.integration_tests.api.shared import (
+    SUCCESS_RESPONSE,
+    assert_max_query_count,
+    get_root_uvicorn_url,
+    send_tournament_request,
+)
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import (
     assert_row_count_and_clear,
@@ -204,22 +226,34 @@ async def test_update_match(
             )
         ) as match_inserted,
     ):
+        await recalculate_ranking_for_stage_item(auth_context.tournament.id, stage_item_inserted.id)
         body = {
             "stage_item_input1_score": 42,
             "stage_item_input2_score": 24,
             "round_id": round_inserted.id,
             "court_id": None,
         }
-        assert (
-            await send_tournament_request(
-                HTTPMethod.PUT,
-                f"matches/{match_inserted.id}",
-                auth_context,
-                None,
-                body,
-            )
-            == SUCCESS_RESPONSE
-        )
+        events_url = f"{get_root_uvicorn_url()}tournaments/{auth_context.tournament.id}/events"
+        async with (
+            aiohttp.ClientSession(headers=auth_context.headers) as session,
+            session.get(events_url) as events_response,
+        ):
+            assert await events_response.content.readline() == b": connected\n"
+            with assert_max_query_count(12):
+                response = await send_tournament_request(
+                    HTTPMethod.PUT,
+                    f"matches/{match_inserted.id}",
+                    auth_context,
+                    None,
+                    body,
+                )
+            assert response == SUCCESS_RESPONSE
+
+            await events_response.content.readline()
+            assert await events_response.content.readline() == b"event: MATCH_UPDATED\n"
+            data = await events_response.content.readline()
+            assert json.loads(data.removeprefix(b"data: "))["ids"] == [match_inserted.id]
+
         updated_match = await fetch_one_parsed_certain(
             database,
             Match,
@@ -232,6 +266,233 @@ async def test_update_match(
         await assert_row_count_and_clear(matches, 1)
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_update_ranking_for_match_result_repairs_inconsistent_statistics(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as stage_inserted,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.model_copy(
+                update={"stage_id": stage_inserted.id, "ranking_id": auth_context.ranking.id}
+            )
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.model_copy(update={"stage_item_id": stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_team(
+            DUMMY_TEAM1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team1_inserted,
+        inserted_team(
+            DUMMY_TEAM2.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team2_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=0,
+                team_id=team1_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input1_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=1,
+                team_id=team2_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input2_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court1_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": stage_item_input1_inserted.id,
+                    "stage_item_input2_id": stage_item_input2_inserted.id,
+                    "court_id": court1_inserted.id,
+                }
+            )
+        ) as match_inserted,
+    ):
+        tournament_id = auth_context.tournament.id
+        await recalculate_ranking_for_stage_item(tournament_id, stage_item_inserted.id)
+
+        # The stored statistics no longer add up to the matches of the inputs.
+        await database.execute(
+            query="UPDATE stage_item_inputs SET wins = wins + 5 WHERE id = :id",
+            values={"id": stage_item_input1_inserted.id},
+        )
+        match_body = MatchBody(
+            round_id=round_inserted.id, stage_item_input1_score=42, stage_item_input2_score=24
+        )
+        async with database.transaction():
+            match_before_update = await sql_update_match(
+                match_inserted.id, match_body, await sql_get_tournament(tournament_id)
+            )
+            stage_item = await get_stage_item(tournament_id, stage_item_inserted.id)
+            await update_ranking_for_match_result(
+                tournament_id, stage_item, assert_some(match_before_update), match_body
+            )
+
+        stats = await database.fetch_all(
+            query="SELECT wins, losses FROM stage_item_inputs WHERE id = ANY(:ids) ORDER BY id",
+            values={"ids": [stage_item_input1_inserted.id, stage_item_input2_inserted.id]},
+        )
+        assert [(row["wins"], row["losses"]) for row in stats] == [(1, 0), (0, 1)]
+
+        await assert_row_count_and_clear(matches, 1)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_updates_of_same_match(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as stage_inserted,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.model_copy(
+                update={"stage_id": stage_inserted.id, "ranking_id": auth_context.ranking.id}
+            )
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.model_copy(update={"stage_item_id": stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_team(
+            DUMMY_TEAM1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team1_inserted,
+        inserted_team(
+            DUMMY_TEAM2.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team2_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=0,
+                team_id=team1_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input1_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=1,
+                team_id=team2_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input2_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court1_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": stage_item_input1_inserted.id,
+                    "stage_item_input2_id": stage_item_input2_inserted.id,
+                    "court_id": court1_inserted.id,
+                }
+            )
+        ) as match_inserted,
+    ):
+        tournament_id = auth_context.tournament.id
+        await recalculate_ranking_for_stage_item(tournament_id, stage_item_inserted.id)
+
+        scores = [(3, 1), (1, 3), (2, 2), (4, 0), (0, 4), (1, 1)]
+        responses = await asyncio.gather(
+            *(
+                send_tournament_request(
+                    HTTPMethod.PUT,
+                    f"matches/{match_inserted.id}",
+                    auth_context,
+                    json={
+                        "stage_item_input1_score": score1,
+                        "stage_item_input2_score": score2,
+                        "round_id": round_inserted.id,
+                        "court_id": court1_inserted.id,
+                    },
+                )
+                for score1, score2 in scores
+            )
+        )
+        assert responses == [SUCCESS_RESPONSE] * len(scores)
+
+        # The statistics should only include the result that was stored last.
+        updated_match = await fetch_one_parsed_certain(
+            database,
+            Match,
+            query=matches.select().where(matches.c.id == match_inserted.id),
+        )
+        stats = await database.fetch_all(
+            query="""
+                SELECT wins, draws, losses FROM stage_item_inputs
+                WHERE id = ANY(:ids) ORDER BY id
+            """,
+            values={"ids": [stage_item_input1_inserted.id, stage_item_input2_inserted.id]},
+        )
+        score1, score2 = (
+            updated_match.stage_item_input1_score,
+            updated_match.stage_item_input2_score,
+        )
+        expected = [
+            (int(score1 > score2), int(score1 == score2), int(score1 < score2)),
+            (int(score2 > score1), int(score1 == score2), int(score2 < score1)),
+        ]
+        assert [(row["wins"], row["draws"], row["losses"]) for row in stats] == expected
+
+        await assert_row_count_and_clear(matches, 1)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_match_updates_only_change_matches_of_tournament(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as stage_inserted,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.model_copy(
+                update={"stage_id": stage_inserted.id, "ranking_id": auth_context.ranking.id}
+            )
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.model_copy(update={"stage_item_id": stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court1_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": None,
+                    "stage_item_input2_id": None,
+                    "court_id": court1_inserted.id,
+                }
+            )
+        ) as match_inserted,
+    ):
+        other_tournament_id = TournamentId(auth_context.tournament.id + 1)
+        await sql_set_input_ids_for_matches(other_tournament_id, {match_inserted.id: (None, None)})
+        await sql_set_conflicts_for_matches(other_tournament_id, {match_inserted.id: (True, True)})
+        await sql_reschedule_matches(
+            other_tournament_id,
+            [match_inserted.model_copy(update={"court_id": None, "position_in_schedule": 5})],
+        )
+
+        match = await fetch_one_parsed_certain(
+            database, Match, query=matches.select().where(matches.c.id == match_inserted.id)
+        )
+        assert match == match_inserted
+
+        await assert_row_count_and_clear(matches, 1)
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_update_endpoint_custom_duration_margin(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
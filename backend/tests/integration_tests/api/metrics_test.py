@@ -8,3 +8,7 @@ from tests.integration_tests.api.shared import send_request_raw
 async def test_metrics_endpoint(startup_and_shutdown_uvicorn_server: None) -> None:
     text_response = await send_request_raw(HTTPMethod.GET, "metrics")
     assert "HELP bracket_response_time" in text_response
+    assert 'bracket_cache_hits{cache="tournament_details"}' in text_response
+    assert "bracket_db_pool_size" in text_response
+    assert "bracket_db_pool_wait_seconds" in text_response
+    assert "bracket_query_duration_seconds_bucket{" in text_response
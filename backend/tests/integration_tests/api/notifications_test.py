@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from bracket.database import database, worker_application_name
+from bracket.schema import TOURNAMENT_CHANGES_CHANNEL
+from bracket.sql.cache import get_tournament_version
+from bracket.utils.dummy_records import DUMMY_COURT1
+from bracket.utils.notifications import NotificationBus
+from bracket.utils.types import JsonDict
+from tests.integration_tests.models import AuthContext
+from tests.integration_tests.sql import inserted_court
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_workers_are_notified_of_changes(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    notifications: list[JsonDict] = []
+    other_worker_bus = NotificationBus("bracket-other-worker")
+    await other_worker_bus.connect(
+        {TOURNAMENT_CHANGES_CHANNEL: notifications.append},
+        on_reconnect=lambda: None,
+    )
+    try:
+        async with inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court_inserted:
+            # A change by another worker invalidates the caches of this worker.
+            version = get_tournament_version(auth_context.tournament.id)
+            await other_worker_bus.connection.execute(
+                "UPDATE courts SET name = 'Other' WHERE id = $1", court_inserted.id
+            )
+            for _ in range(50):
+                if get_tournament_version(auth_context.tournament.id) > version:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert get_tournament_version(auth_context.tournament.id) > version
+
+            # Notifications of the same table in a transaction are sent only once.
+            async with database.transaction():
+                for name in ("Court A", "Court B"):
+                    await database.execute(
+                        query="UPDATE courts SET name = :name WHERE id = :court_id",
+                        values={"name": name, "court_id": court_inserted.id},
+                    )
+
+        # The court is inserted, updated and deleted again, the update of the other worker is
+        # ignored since it was done by the bus itself.
+        for _ in range(50):
+            if len(notifications) >= 3:
+                break
+            await asyncio.sleep(0.01)
+
+        assert (
+            notifications
+            == [
+                {
+                    "tournament_id": auth_context.tournament.id,
+                    "entity": "courts",
+                    "origin": worker_application_name,
+                }
+            ]
+            * 3
+        )
+    finally:
+        await other_worker_bus.disconnect()
@@ -1,6 +1,8 @@
+from datetime import timedelta
+
 import pytest
 
-from bracket.models.db.match import MatchRescheduleBody
+from bracket.models.db.match import MatchDelayBody, MatchRescheduleBody
 from bracket.models.db.stage_item_inputs import StageItemInputInsertable
 from bracket.schema import matches
 from bracket.sql.matches import sql_get_match
@@ -8,6 +10,7 @@ from bracket.utils.dummy_records import (
     DUMMY_COURT1,
     DUMMY_COURT2,
     DUMMY_MATCH1,
+    DUMMY_MOCK_TIME,
     DUMMY_ROUND1,
     DUMMY_STAGE1,
     DUMMY_STAGE_ITEM1,
@@ -104,3 +107,89 @@ async def test_reschedule_match(
 
     assert match.court_id == body.new_court_id
     assert match.position_in_schedule == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_delay_match(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as stage_inserted,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.model_copy(
+                update={"stage_id": stage_inserted.id, "ranking_id": auth_context.ranking.id}
+            )
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.model_copy(update={"stage_item_id": stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_team(
+            DUMMY_TEAM1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team1_inserted,
+        inserted_team(
+            DUMMY_TEAM2.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team2_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=0,
+                team_id=team1_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input1_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=0,
+                team_id=team2_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input2_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court1_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": stage_item_input1_inserted.id,
+                    "stage_item_input2_id": stage_item_input2_inserted.id,
+                    "court_id": court1_inserted.id,
+                }
+            )
+        ) as match1_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": stage_item_input1_inserted.id,
+                    "stage_item_input2_id": stage_item_input2_inserted.id,
+                    "court_id": court1_inserted.id,
+                    "start_time": DUMMY_MOCK_TIME + timedelta(minutes=15),
+                    "position_in_schedule": 2,
+                }
+            )
+        ) as match2_inserted,
+    ):
+        body = MatchDelayBody(
+            court_id=court1_inserted.id,
+            actual_end_time=DUMMY_MOCK_TIME + timedelta(minutes=25),
+        )
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST,
+                f"matches/{match1_inserted.id}/delay",
+                auth_context,
+                json=body.model_dump(mode="json"),
+            )
+            == SUCCESS_RESPONSE
+        )
+        match1 = await sql_get_match(match1_inserted.id)
+        match2 = await sql_get_match(match2_inserted.id)
+        await assert_row_count_and_clear(matches, 0)
+
+    assert match1.duration_minutes == 25
+    assert match1.custom_duration_minutes == 25
+    assert match2.start_time == DUMMY_MOCK_TIME + timedelta(minutes=30)
@@ -6,9 +6,13 @@ from bracket.models.db.stage_item_inputs import (
     StageItemInputCreateBodyFinal,
     StageItemInputCreateBodyTentative,
 )
+from bracket.sql.rounds import sql_get_rounds_with_matches
 from bracket.sql.shared import sql_delete_stage_item_with_foreign_keys
-from bracket.sql.stage_items import sql_create_stage_item_with_inputs
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.stage_items import (
+    sql_create_stage_item_with_inputs,
+    sql_get_stage_item_with_rounds,
+)
+from bracket.sql.stages import get_full_tournament_details, sql_get_full_tournament_details
 from bracket.utils.dummy_records import (
     DUMMY_COURT1,
     DUMMY_STAGE2,
@@ -18,7 +22,6 @@ from bracket.utils.dummy_records import (
 )
 from bracket.utils.http import HTTPMethod
 from tests.integration_tests.api.shared import (
-    SUCCESS_RESPONSE,
     send_tournament_request,
 )
 from tests.integration_tests.models import AuthContext
@@ -105,6 +108,16 @@ async def test_schedule_all_matches(
         await build_matches_for_stage_item(stage_item_1, tournament_id)
         await build_matches_for_stage_item(stage_item_2, tournament_id)
 
+        # Simulating with an extra court shouldn't store anything.
+        simulation = await send_tournament_request(
+            HTTPMethod.POST,
+            "simulate_schedule",
+            auth_context,
+            json={"schedule_unscheduled_matches": True, "extra_court_count": 1},
+        )
+        assert simulation["data"]["scheduled_match_count"] == 7
+        assert len(simulation["data"]["matches"]) == 7
+
         response = await send_tournament_request(
             HTTPMethod.POST,
             "schedule_matches",
@@ -112,12 +125,43 @@ async def test_schedule_all_matches(
         )
         stages = await get_full_tournament_details(tournament_id)
 
-        await sql_delete_stage_item_with_foreign_keys(stage_item_2.id)
-        await sql_delete_stage_item_with_foreign_keys(stage_item_1.id)
+        # Queries for a single stage, stage item or round should match the full tournament.
+        # Timestamps of the top-level rows are decoded without microseconds, so skip those.
+        [stage] = stages
+        [stage_result] = await sql_get_full_tournament_details(tournament_id, stage.id)
+        assert stage_result.model_dump(exclude={"created"}) == stage.model_dump(exclude={"created"})
+        for stage_item in stage.stage_items:
+            stage_item_result = await sql_get_stage_item_with_rounds(tournament_id, stage_item.id)
+            assert stage_item_result is not None
+            assert stage_item_result.model_dump(exclude={"created"}) == stage_item.model_dump(
+                exclude={"created"}
+            )
+
+            rounds_result = await sql_get_rounds_with_matches(
+                tournament_id, stage_item_id=stage_item.id
+            )
+            assert [round_.model_dump(exclude={"created"}) for round_ in rounds_result] == [
+                round_.model_dump(exclude={"created"}) for round_ in stage_item.rounds
+            ]
+            for round_ in stage_item.rounds:
+                [round_result] = await sql_get_rounds_with_matches(
+                    tournament_id, round_id=round_.id
+                )
+                assert round_result.id == round_.id
+                assert round_result.matches == round_.matches
+
+        await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_2.id)
+        await sql_delete_stage_item_with_foreign_keys(tournament_id, stage_item_1.id)
 
-    assert response == SUCCESS_RESPONSE
+    # All 7 matches are scheduled on the only court, one after another. In the simulation, the
+    # extra court allows the schedule to finish earlier.
+    assert simulation["data"]["makespan_minutes"] < response["data"]["makespan_minutes"]
+    assert response["data"]["scheduled_match_count"] == 7
+    assert response["data"]["makespan_minutes"] == 7 * (10 + 5)
 
-    stage_item = stages[0].stage_items[0]
+    # Stage items are ordered by name, so the round robin group comes after the bracket.
+    assert [item.name for item in stages[0].stage_items] == ["Bracket A", "Group A"]
+    stage_item = stages[0].stage_items[1]
     assert len(stage_item.rounds) == 3
     for round_ in stage_item.rounds:
         assert len(round_.matches) == 2
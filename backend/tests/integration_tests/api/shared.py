@@ -1,7 +1,7 @@
 import asyncio
 import socket
-from collections.abc import AsyncIterator, Sequence
-from contextlib import closing
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import closing, contextmanager
 from typing import Final
 
 import aiohttp
@@ -11,6 +11,7 @@ from fastapi import FastAPI
 from bracket.app import app
 from bracket.routes.models import SuccessResponse
 from bracket.utils.http import HTTPMethod
+from bracket.utils.query_metrics import query_metrics
 from bracket.utils.types import JsonDict
 from tests.integration_tests.models import AuthContext
 
@@ -38,6 +39,20 @@ def get_root_uvicorn_url() -> str:
     return f"http://{TEST_HOST}:{TEST_PORT}/"
 
 
+@contextmanager
+def assert_max_query_count(max_query_count: int) -> Iterator[None]:
+    """
+    Asserts that at most `max_query_count` database queries are executed in the block, to catch
+    endpoints that execute a query per row (N+1 queries).
+    """
+    query_count_before = query_metrics.query_count
+    yield
+    query_count = query_metrics.query_count - query_count_before
+    assert query_count <= max_query_count, (
+        f"Executed {query_count} queries, expected at most {max_query_count}"
+    )
+
+
 class UvicornTestServer(uvicorn.Server):
     """
     Uvicorn test server. Used as a test fixture to do
@@ -1,14 +1,22 @@
+import asyncio
+
+import asyncpg  # type: ignore[import-untyped]
 import pytest
 
+from bracket.config import config
+from bracket.models.db.stage_item_inputs import StageItemInputInsertable
 from bracket.schema import rounds, stage_items, stages
 from bracket.sql.stages import get_full_tournament_details
 from bracket.utils.dummy_records import (
+    DUMMY_COURT1,
+    DUMMY_MATCH1,
     DUMMY_MOCK_TIME,
     DUMMY_ROUND1,
     DUMMY_STAGE1,
     DUMMY_STAGE2,
     DUMMY_STAGE_ITEM1,
     DUMMY_TEAM1,
+    DUMMY_TEAM2,
 )
 from bracket.utils.http import HTTPMethod
 from tests.integration_tests.api.shared import (
@@ -19,9 +27,12 @@ from tests.integration_tests.api.shared import (
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import (
     assert_row_count_and_clear,
+    inserted_court,
+    inserted_match,
     inserted_round,
     inserted_stage,
     inserted_stage_item,
+    inserted_stage_item_input,
     inserted_team,
 )
 
@@ -88,6 +99,147 @@ async def test_stages_endpoint(
         }
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_changes_endpoint(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as stage_inserted,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.model_copy(
+                update={"stage_id": stage_inserted.id, "ranking_id": auth_context.ranking.id}
+            )
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.model_copy(update={"stage_item_id": stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_team(
+            DUMMY_TEAM1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team1_inserted,
+        inserted_team(
+            DUMMY_TEAM2.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team2_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=0,
+                team_id=team1_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input1_inserted,
+        inserted_stage_item_input(
+            StageItemInputInsertable(
+                slot=1,
+                team_id=team2_inserted.id,
+                tournament_id=auth_context.tournament.id,
+                stage_item_id=stage_item_inserted.id,
+            )
+        ) as stage_item_input2_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court_inserted,
+        inserted_match(
+            DUMMY_MATCH1.model_copy(
+                update={
+                    "round_id": round_inserted.id,
+                    "stage_item_input1_id": stage_item_input1_inserted.id,
+                    "stage_item_input2_id": stage_item_input2_inserted.id,
+                    "court_id": court_inserted.id,
+                }
+            )
+        ) as match_inserted,
+    ):
+        snapshot = (await send_tournament_request(HTTPMethod.GET, "changes", auth_context))["data"]
+        assert snapshot["stages"][0]["id"] == stage_inserted.id
+        assert snapshot["version"] > 0
+
+        body = {
+            "stage_item_input1_score": 42,
+            "stage_item_input2_score": 24,
+            "round_id": round_inserted.id,
+            "court_id": None,
+        }
+        await send_tournament_request(
+            HTTPMethod.PUT, f"matches/{match_inserted.id}", auth_context, None, body
+        )
+        await send_tournament_request(
+            HTTPMethod.DELETE, f"courts/{court_inserted.id}", auth_context
+        )
+
+        changes = (
+            await send_tournament_request(
+                HTTPMethod.GET, f"changes?since={snapshot['version']}", auth_context
+            )
+        )["data"]
+        assert changes["stages"] is None
+        assert changes["version"] > snapshot["version"]
+        assert [match["id"] for match in changes["matches"]] == [match_inserted.id]
+        assert changes["matches"][0]["stage_item_input1_score"] == 42
+        assert changes["matches"][0]["stage_item_input1"]["team"]["id"] == team1_inserted.id
+        assert changes["deleted_court_ids"] == [court_inserted.id]
+
+        no_changes = (
+            await send_tournament_request(
+                HTTPMethod.GET, f"changes?since={changes['version']}", auth_context
+            )
+        )["data"]
+        assert no_changes["version"] == changes["version"]
+        assert no_changes["matches"] == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_changes_are_committed_in_order(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_team(
+            DUMMY_TEAM1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as team_inserted,
+        inserted_court(
+            DUMMY_COURT1.model_copy(update={"tournament_id": auth_context.tournament.id})
+        ) as court_inserted,
+    ):
+        version = (await send_tournament_request(HTTPMethod.GET, "changes", auth_context))["data"][
+            "version"
+        ]
+        connection1 = await asyncpg.connect(str(config.pg_dsn))
+        connection2 = await asyncpg.connect(str(config.pg_dsn))
+        try:
+            transaction = connection1.transaction()
+            await transaction.start()
+            await connection1.execute(
+                "UPDATE courts SET name = 'Court A' WHERE id = $1", court_inserted.id
+            )
+
+            # The second change to the tournament waits until the first one is committed, so
+            # that it can't be committed with a higher version before the first one.
+            update_team = asyncio.create_task(
+                connection2.execute(
+                    "UPDATE teams SET name = 'Team A' WHERE id = $1", team_inserted.id
+                )
+            )
+            await asyncio.sleep(0.1)
+            assert not update_team.done()
+            changes = await send_tournament_request(
+                HTTPMethod.GET, f"changes?since={version}", auth_context
+            )
+            assert changes["data"]["version"] == version
+
+            await transaction.commit()
+            await update_team
+        finally:
+            await connection1.close()
+            await connection2.close()
+
+        changes = await send_tournament_request(
+            HTTPMethod.GET, f"changes?since={version}", auth_context
+        )
+        assert [court["name"] for court in changes["data"]["courts"]] == ["Court A"]
+        assert changes["data"]["version"] > version
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_create_stage(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
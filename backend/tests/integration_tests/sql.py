@@ -41,6 +41,7 @@ from bracket.schema import (
     users,
     users_x_clubs,
 )
+from bracket.sql.cache import invalidate_all_caches
 from bracket.sql.teams import get_teams_by_id
 from bracket.utils.db import insert_generic
 from bracket.utils.dummy_records import DUMMY_CLUB, DUMMY_RANKING1, DUMMY_TOURNAMENT
@@ -52,6 +53,7 @@ from tests.integration_tests.models import AuthContext
 async def assert_row_count_and_clear(table: Table, expected_rows: int) -> None:
     # assert len(await database.fetch_all(query=table.select())) == expected_rows
     await database.execute(query=table.delete())
+    invalidate_all_caches()
 
 
 @asynccontextmanager
@@ -64,6 +66,7 @@ async def inserted_generic[BaseModelT: BaseModel](
         yield row_inserted
     finally:
         await database.execute(query=table.delete().where(table.c.id == last_record_id))
+        invalidate_all_caches()
 
 
 @asynccontextmanager
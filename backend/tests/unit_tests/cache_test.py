@@ -0,0 +1,72 @@
+import pytest
+
+from bracket.sql.cache import (
+    bump_tournament_version,
+    get_cached_stages_response,
+    get_cached_tournament_details,
+    get_tournament_version,
+    invalidate_all_tournaments,
+    set_cached_stages_response,
+    set_cached_tournament_details,
+)
+from bracket.utils.cache import LRUCache
+from bracket.utils.id_types import TournamentId
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = LRUCache[int, str]("test_lru_cache", max_size=2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+
+def test_lru_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 100.0
+    monkeypatch.setattr("bracket.utils.cache.time.monotonic", lambda: now)
+    cache = LRUCache[int, bool]("test_ttl_cache", max_size=2, ttl_seconds=10)
+    cache.set(1, True)
+
+    now = 105.0
+    assert cache.get(1) is True
+
+    now = 111.0
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_tournament_details_cache_versioning() -> None:
+    tournament_id = TournamentId(-1)
+    version = get_tournament_version(tournament_id)
+    set_cached_tournament_details(tournament_id, version, [])
+    assert get_cached_tournament_details(tournament_id) == []
+
+    bump_tournament_version(tournament_id)
+    assert get_cached_tournament_details(tournament_id) is None
+
+    # Snapshots fetched before a write are not stored.
+    set_cached_tournament_details(tournament_id, version, [])
+    assert get_cached_tournament_details(tournament_id) is None
+
+    set_cached_tournament_details(tournament_id, get_tournament_version(tournament_id), [])
+    invalidate_all_tournaments()
+    assert get_cached_tournament_details(tournament_id) is None
+
+
+def test_stages_response_cache_versioning() -> None:
+    tournament_id = TournamentId(-1)
+    version = get_tournament_version(tournament_id)
+    set_cached_stages_response(tournament_id, True, version, b"[]")
+    assert get_cached_stages_response(tournament_id, no_draft_rounds=True) == b"[]"
+    assert get_cached_stages_response(tournament_id, no_draft_rounds=False) is None
+
+    bump_tournament_version(tournament_id)
+    assert get_cached_stages_response(tournament_id, no_draft_rounds=True) is None
+
+    set_cached_stages_response(tournament_id, True, version, b"[]")
+    assert get_cached_stages_response(tournament_id, no_draft_rounds=True) is None
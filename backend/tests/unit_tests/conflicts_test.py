@@ -1,7 +1,15 @@
+from contextvars import Context
 from datetime import timedelta
 
-from bracket.logic.planning.conflicts import get_conflicting_matches
+from bracket.logic.planning.conflicts import (
+    ConflictIndex,
+    conflict_index_cache,
+    get_conflict_index,
+    get_conflicting_matches,
+    update_conflicts_for_matches,
+)
 from bracket.models.db.util import StageWithStageItems
+from bracket.sql.cache import bump_tournament_version
 from bracket.utils.dummy_records import DUMMY_MOCK_TIME
 from bracket.utils.id_types import StageId, TournamentId
 from tests.integration_tests.mocks import MOCK_NOW
@@ -53,3 +61,52 @@ def test_get_conflicting_matches_conflicts_to_clear() -> None:
     )
 
     assert get_conflicting_matches([stage_item]) == ({}, {-1, -2})
+
+
+def test_conflict_index_updates_rescheduled_matches() -> None:
+    """
+    Test `ConflictIndex` sets and clears conflicts when a match is moved into and out of the
+    time slot of another match of the same input
+    """
+    tournament_id = TournamentId(-1)
+    stage_item_inputs = get_stage_item_inputs_mock(tournament_id)
+    match1, match2 = get_2_definitive_matches_mock(
+        stage_item_inputs, DUMMY_MOCK_TIME + timedelta(hours=1)
+    )
+    rounds = get_one_round_with_two_definitive_matches(match1, match2)
+    stage_item = StageWithStageItems(
+        id=StageId(-1),
+        tournament_id=tournament_id,
+        name="",
+        created=MOCK_NOW,
+        is_active=False,
+        stage_items=[get_stage_item_mock(stage_item_inputs, [rounds])],
+    )
+    conflict_index = ConflictIndex([stage_item])
+    assert conflict_index.update_matches([]) == {}
+
+    match1 = match1.model_copy(update={"start_time": DUMMY_MOCK_TIME})
+    assert conflict_index.update_matches([match1]) == {-1: (True, False), -2: (True, False)}
+
+    match1 = match1.model_copy(
+        update={
+            "start_time": DUMMY_MOCK_TIME + timedelta(hours=2),
+            "stage_item_input1_conflict": True,
+        }
+    )
+    assert conflict_index.update_matches([match1]) == {-1: (False, False), -2: (False, False)}
+
+
+async def test_conflict_index_not_cached_after_foreign_modification() -> None:
+    tournament_id = TournamentId(-2)
+
+    # Modifications by the request itself don't prevent the index from being cached again.
+    conflict_index = get_conflict_index(tournament_id, [])
+    bump_tournament_version(tournament_id)
+    await update_conflicts_for_matches(tournament_id, conflict_index, [])
+    assert get_conflict_index(tournament_id, []) is conflict_index
+
+    # Modifications by other requests (with their own context) are not part of the index.
+    Context().run(bump_tournament_version, tournament_id)
+    await update_conflicts_for_matches(tournament_id, conflict_index, [])
+    assert conflict_index_cache.get(tournament_id) is None
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from bracket.logic.planning.delays import MatchDelayPropagation
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.dummy_records import DUMMY_MOCK_TIME, DUMMY_TOURNAMENT
+from bracket.utils.id_types import CourtId, MatchId, StageId, TournamentId
+from tests.integration_tests.mocks import MOCK_NOW
+from tests.unit_tests.mocks import (
+    get_2_definitive_and_2_tentative_matches_mock,
+    get_one_round_with_two_definitive_matches,
+    get_stage_item_inputs_mock,
+    get_stage_item_mock,
+    get_two_round_with_one_tentative_match_each,
+)
+
+
+def get_stages_mock(tournament: Tournament) -> list[StageWithStageItems]:
+    stage_item_inputs = get_stage_item_inputs_mock(tournament.id)
+    match1, match2, match3, match4 = get_2_definitive_and_2_tentative_matches_mock(
+        stage_item_inputs
+    )
+    later_slot = {"start_time": DUMMY_MOCK_TIME + timedelta(minutes=105), "position_in_schedule": 2}
+    rounds = [
+        get_one_round_with_two_definitive_matches(match1, match2),
+        *get_two_round_with_one_tentative_match_each(
+            match3.model_copy(update={**later_slot, "court_id": CourtId(-1)}),
+            match4.model_copy(update={**later_slot, "court_id": CourtId(-2)}),
+        ),
+    ]
+    return [
+        StageWithStageItems(
+            id=StageId(-1),
+            tournament_id=tournament.id,
+            name="",
+            created=MOCK_NOW,
+            is_active=False,
+            stage_items=[get_stage_item_mock(stage_item_inputs, rounds)],
+        )
+    ]
+
+
+def test_delay_match() -> None:
+    """
+    Test `MatchDelayPropagation` absorbs delay in margins and shifts the matches after it
+    """
+    tournament = Tournament(**DUMMY_TOURNAMENT.model_dump(), id=TournamentId(-1))
+    stages = get_stages_mock(tournament)
+    actual_end_time = DUMMY_MOCK_TIME + timedelta(minutes=120)
+
+    # Of the 30 minutes of delay, 10 are absorbed by the margin of the match that overran.
+    shifted_matches = MatchDelayPropagation(stages, tournament).delay_match(
+        MatchId(-1), actual_end_time, shift_dependent_matches=False
+    )
+    assert {
+        match.id: (match.start_time, match.duration_minutes, match.margin_minutes)
+        for match in shifted_matches
+    } == {
+        MatchId(-1): (DUMMY_MOCK_TIME, 120, 5),
+        MatchId(-3): (DUMMY_MOCK_TIME + timedelta(minutes=125), 90, 15),
+    }
+
+    # Match -4 takes the winner of match -3, so it starts once match -3 and its margin have ended.
+    # The gap is added to the margin of the match before it on court -2.
+    shifted_matches = MatchDelayPropagation(stages, tournament).delay_match(
+        MatchId(-1), actual_end_time, shift_dependent_matches=True
+    )
+    assert {
+        match.id: (match.start_time, match.duration_minutes, match.margin_minutes)
+        for match in shifted_matches
+    } == {
+        MatchId(-1): (DUMMY_MOCK_TIME, 120, 5),
+        MatchId(-2): (DUMMY_MOCK_TIME, 90, 140),
+        MatchId(-3): (DUMMY_MOCK_TIME + timedelta(minutes=125), 90, 15),
+        MatchId(-4): (DUMMY_MOCK_TIME + timedelta(minutes=230), 90, 15),
+    }
+
+    # A match that ends early doesn't move any match.
+    assert not MatchDelayPropagation(stages, tournament).delay_match(
+        MatchId(-1), DUMMY_MOCK_TIME + timedelta(minutes=60), shift_dependent_matches=True
+    )
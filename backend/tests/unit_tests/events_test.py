@@ -0,0 +1,40 @@
+from bracket.config import config
+from bracket.logic.events import TournamentEvent, TournamentEventHub, TournamentEventType
+from bracket.utils.id_types import TournamentId
+
+
+async def test_event_hub_broadcasts_to_subscribers_of_tournament() -> None:
+    hub = TournamentEventHub()
+    event = TournamentEvent(
+        type=TournamentEventType.MATCH_UPDATED, tournament_id=TournamentId(1), ids=[3]
+    )
+
+    async with (
+        hub.subscribe(TournamentId(1)) as subscriber1,
+        hub.subscribe(TournamentId(1)) as subscriber2,
+        hub.subscribe(TournamentId(2)) as subscriber3,
+    ):
+        assert hub.subscriber_count == 3
+        hub.publish(event)
+
+        expected = (
+            'event: MATCH_UPDATED\ndata: {"type":"MATCH_UPDATED","tournament_id":1,"ids":[3]}\n\n'
+        )
+        assert await subscriber1.get() == expected
+        assert await subscriber2.get() == expected
+        assert subscriber3.queue.empty()
+
+    assert hub.subscriber_count == 0
+    assert not hub.subscribers
+
+
+async def test_event_hub_resyncs_slow_subscribers() -> None:
+    hub = TournamentEventHub()
+    event = TournamentEvent(type=TournamentEventType.MATCH_UPDATED, tournament_id=TournamentId(1))
+
+    async with hub.subscribe(TournamentId(1)) as subscriber:
+        for _ in range(config.event_queue_size + 1):
+            hub.publish(event)
+
+        assert subscriber.queue.qsize() == 1
+        assert (await subscriber.get()).startswith("event: RESYNC\n")
@@ -0,0 +1,37 @@
+import itertools
+import random
+
+from bracket.logic.scheduling.matching import max_weight_matching
+
+
+def get_best_matching_brute_force(
+    edges: list[tuple[int, int, int]], *, max_cardinality: bool
+) -> tuple[int, int]:
+    best = (0, 0)
+    for size in range(1, len(edges) + 1):
+        for subset in itertools.combinations(edges, size):
+            vertices = [vertex for v, w, _ in subset for vertex in (v, w)]
+            if len(set(vertices)) == len(vertices):
+                weight = sum(weight for _, _, weight in subset)
+                best = max(best, (size, weight) if max_cardinality else (0, weight))
+    return best
+
+
+def test_max_weight_matching_is_optimal() -> None:
+    rng = random.Random(42)
+    for _ in range(100):
+        vertex_count = rng.randint(2, 6)
+        edges = [
+            (v, w, rng.randint(0, 10))
+            for v, w in itertools.combinations(range(vertex_count), 2)
+            if rng.random() < 0.6
+        ]
+        for max_cardinality in (False, True):
+            mate = max_weight_matching(edges, max_cardinality=max_cardinality)
+            matched = [(v, w, weight) for v, w, weight in edges if mate[v] == w]
+            assert all(mate[w] == v for v, w, _ in matched)
+
+            size = len(matched) if max_cardinality else 0
+            assert (size, sum(weight for _, _, weight in matched)) == (
+                get_best_matching_brute_force(edges, max_cardinality=max_cardinality)
+            )
@@ -2,12 +2,15 @@ from decimal import Decimal
 
 from heliclockter import datetime_utc
 
-from bracket.logic.ranking.calculation import determine_ranking_for_stage_item
+from bracket.logic.ranking.calculation import (
+    determine_ranking_delta_for_match,
+    determine_ranking_for_stage_item,
+)
 from bracket.logic.ranking.statistics import TeamStatistics
 from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
 from bracket.models.db.ranking import Ranking
 from bracket.models.db.stage_item import StageType
-from bracket.models.db.stage_item_inputs import StageItemInputFinal
+from bracket.models.db.stage_item_inputs import StageItemInput, StageItemInputFinal
 from bracket.models.db.team import Team
 from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
 from bracket.utils.dummy_records import DUMMY_TEAM1, DUMMY_TEAM2
@@ -271,3 +274,96 @@ def test_determine_ranking_for_stage_item_swiss_no_matches() -> None:
         -2: TeamStatistics(wins=0, draws=0, losses=0, points=Decimal("1200")),
         -1: TeamStatistics(wins=0, draws=0, losses=0, points=Decimal("1200")),
     }
+
+
+def test_determine_ranking_delta_for_match_matches_full_recalculation() -> None:
+    tournament_id = TournamentId(-1)
+    now = datetime_utc.now()
+    stage_item_inputs: list[StageItemInput] = [
+        StageItemInputFinal(
+            id=StageItemInputId(-i),
+            team_id=TeamId(-i),
+            slot=i,
+            tournament_id=tournament_id,
+            team=Team(**DUMMY_TEAM1.model_dump(), id=TeamId(-i)),
+        )
+        for i in range(1, 4)
+    ]
+    matches = [
+        MatchWithDetailsDefinitive(
+            id=MatchId(-i),
+            stage_item_input1=stage_item_inputs[i - 1],
+            stage_item_input2=stage_item_inputs[i % 3],
+            created=now,
+            duration_minutes=90,
+            margin_minutes=15,
+            round_id=RoundId(-1),
+            stage_item_input1_score=i,
+            stage_item_input2_score=1,
+            stage_item_input1_conflict=False,
+            stage_item_input2_conflict=False,
+        )
+        for i in range(1, 4)
+    ]
+    stage_item = StageItemWithRounds(
+        rounds=[
+            RoundWithMatches(
+                id=RoundId(-1),
+                matches=[*matches],
+                stage_item_id=StageItemId(-1),
+                created=now,
+                is_draft=False,
+                name="",
+            )
+        ],
+        inputs=stage_item_inputs,
+        type_name="Round Robin",
+        team_count=3,
+        ranking_id=None,
+        id=StageItemId(-1),
+        stage_id=StageId(-1),
+        name="",
+        created=now,
+        type=StageType.ROUND_ROBIN,
+    )
+    ranking = Ranking(
+        id=RankingId(-1),
+        tournament_id=tournament_id,
+        created=now,
+        win_points=Decimal("3"),
+        draw_points=Decimal("1"),
+        loss_points=Decimal("0"),
+        add_score_points=True,
+        position=0,
+    )
+
+    for new_scores in [(0, 1), (1, 1), (5, 0)]:
+        updated_match = matches[2].model_copy(
+            update={
+                "stage_item_input1_score": new_scores[0],
+                "stage_item_input2_score": new_scores[1],
+            }
+        )
+        stage_item_updated = stage_item.model_copy(
+            update={
+                "rounds": [
+                    stage_item.rounds[0].model_copy(
+                        update={"matches": [*matches[:2], updated_match]}
+                    )
+                ]
+            }
+        )
+        before = determine_ranking_for_stage_item(stage_item, ranking)
+        after = determine_ranking_for_stage_item(stage_item_updated, ranking)
+        delta = determine_ranking_delta_for_match(
+            matches[2], updated_match, ranking, stage_item_updated
+        )
+
+        for input_id, stats in after.items():
+            input_delta = delta.get(input_id, TeamStatistics())
+            assert stats == TeamStatistics(
+                wins=before[input_id].wins + input_delta.wins,
+                draws=before[input_id].draws + input_delta.draws,
+                losses=before[input_id].losses + input_delta.losses,
+                points=before[input_id].points + input_delta.points,
+            )
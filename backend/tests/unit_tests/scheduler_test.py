@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from bracket.logic.planning.scheduler import ListScheduler, ScheduleResult
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.dummy_records import DUMMY_MOCK_TIME, DUMMY_TOURNAMENT
+from bracket.utils.id_types import CourtId, MatchId, StageId, TournamentId
+from tests.integration_tests.mocks import MOCK_NOW
+from tests.unit_tests.mocks import (
+    get_2_definitive_and_2_tentative_matches_mock,
+    get_one_round_with_two_definitive_matches,
+    get_stage_item_inputs_mock,
+    get_stage_item_mock,
+    get_two_round_with_one_tentative_match_each,
+)
+
+
+def test_list_scheduler_respects_rest_time_and_dependencies() -> None:
+    """
+    Test `ListScheduler` waits for inputs to rest and for matches of which the winners advance
+    """
+    tournament = Tournament(**DUMMY_TOURNAMENT.model_dump(), id=TournamentId(-1))
+    stage_item_inputs = get_stage_item_inputs_mock(tournament.id)
+    match1, match2, match3, match4 = get_2_definitive_and_2_tentative_matches_mock(
+        stage_item_inputs
+    )
+    unscheduled = {"start_time": None, "position_in_schedule": None, "court_id": None}
+    rounds = [
+        get_one_round_with_two_definitive_matches(
+            match1.model_copy(update=unscheduled), match2.model_copy(update=unscheduled)
+        ),
+        *get_two_round_with_one_tentative_match_each(match3, match4),
+    ]
+    stage = StageWithStageItems(
+        id=StageId(-1),
+        tournament_id=tournament.id,
+        name="",
+        created=MOCK_NOW,
+        is_active=False,
+        stage_items=[get_stage_item_mock(stage_item_inputs, rounds)],
+    )
+
+    scheduler = ListScheduler([CourtId(-1), CourtId(-2)], tournament, min_rest_minutes=10)
+    assert scheduler.schedule([stage]) == ScheduleResult(
+        scheduled_match_count=4,
+        end_time=DUMMY_MOCK_TIME + timedelta(minutes=90),
+        makespan_minutes=90,
+    )
+
+    # The first two matches share an input, so the second one starts after 15 minutes of play
+    # and 10 minutes of rest. The gaps before the later rounds are added to the margins.
+    schedule = {
+        match_id: (
+            match.court_id,
+            match.start_time,
+            match.position_in_schedule,
+            match.margin_minutes,
+        )
+        for match_id, match in scheduler.rescheduled_matches.items()
+    }
+    assert schedule == {
+        MatchId(-1): (CourtId(-1), DUMMY_MOCK_TIME, 0, 40),
+        MatchId(-2): (CourtId(-2), DUMMY_MOCK_TIME + timedelta(minutes=25), 0, 40),
+        MatchId(-3): (CourtId(-1), DUMMY_MOCK_TIME + timedelta(minutes=50), 1, 5),
+        MatchId(-4): (CourtId(-2), DUMMY_MOCK_TIME + timedelta(minutes=75), 1, 5),
+    }
@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from bracket.utils.security import (
+    PasswordHashingPool,
+    hash_password_async,
+    password_hashing_pool,
+    verify_password_async,
+)
+
+
+async def test_hash_and_verify_password_on_pool() -> None:
+    hashed_password = await hash_password_async("some password")
+
+    assert await verify_password_async("some password", hashed_password)
+    assert not await verify_password_async("other password", hashed_password)
+    assert password_hashing_pool.in_flight == 0
+    assert password_hashing_pool.queue_depth == 0
+
+
+async def test_queue_depth_of_busy_pool() -> None:
+    pool = PasswordHashingPool(max_workers=1)
+    tasks = [asyncio.create_task(pool.run(lambda: time.sleep(0.05))) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert pool.in_flight == 3
+    assert pool.queue_depth == 2
+
+    await asyncio.gather(*tasks)
+    assert pool.in_flight == 0
+    assert pool.queue_depth == 0
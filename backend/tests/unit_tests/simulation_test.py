@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from bracket.logic.planning.simulation import simulate_schedule
+from bracket.models.db.match import ScheduleSimulationBody
+from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.dummy_records import DUMMY_MOCK_TIME, DUMMY_TOURNAMENT
+from bracket.utils.id_types import CourtId, MatchId, StageId, TournamentId
+from tests.integration_tests.mocks import MOCK_NOW
+from tests.unit_tests.mocks import (
+    get_2_definitive_and_2_tentative_matches_mock,
+    get_one_round_with_two_definitive_matches,
+    get_stage_item_inputs_mock,
+    get_stage_item_mock,
+    get_two_round_with_one_tentative_match_each,
+)
+
+
+def test_simulate_schedule() -> None:
+    """
+    Test `simulate_schedule` applies a new match duration and schedules unscheduled matches
+    without modifying the stages
+    """
+    tournament = Tournament(**DUMMY_TOURNAMENT.model_dump(), id=TournamentId(-1))
+    stage_item_inputs = get_stage_item_inputs_mock(tournament.id)
+    match1, match2, match3, match4 = get_2_definitive_and_2_tentative_matches_mock(
+        stage_item_inputs
+    )
+    rounds = [
+        get_one_round_with_two_definitive_matches(match1, match2),
+        *get_two_round_with_one_tentative_match_each(match3, match4),
+    ]
+    stages = [
+        StageWithStageItems(
+            id=StageId(-1),
+            tournament_id=tournament.id,
+            name="",
+            created=MOCK_NOW,
+            is_active=False,
+            stage_items=[get_stage_item_mock(stage_item_inputs, rounds)],
+        )
+    ]
+
+    simulation = simulate_schedule(
+        tournament,
+        [CourtId(-1), CourtId(-2)],
+        stages,
+        ScheduleSimulationBody(duration_minutes=20, schedule_unscheduled_matches=True),
+    )
+    assert simulation.scheduled_match_count == 2
+    assert simulation.end_time == DUMMY_MOCK_TIME + timedelta(minutes=75)
+    assert simulation.makespan_minutes == 75
+    assert [
+        (match.id, match.court_id, match.start_time, match.end_time) for match in simulation.matches
+    ] == [
+        (MatchId(-2), CourtId(-2), DUMMY_MOCK_TIME, DUMMY_MOCK_TIME + timedelta(minutes=50)),
+        (MatchId(-1), CourtId(-1), DUMMY_MOCK_TIME, DUMMY_MOCK_TIME + timedelta(minutes=25)),
+        (
+            MatchId(-3),
+            CourtId(-1),
+            DUMMY_MOCK_TIME + timedelta(minutes=25),
+            DUMMY_MOCK_TIME + timedelta(minutes=50),
+        ),
+        (
+            MatchId(-4),
+            CourtId(-2),
+            DUMMY_MOCK_TIME + timedelta(minutes=50),
+            DUMMY_MOCK_TIME + timedelta(minutes=75),
+        ),
+    ]
+    assert stages[0].stage_items[0].rounds[0].matches[0].duration_minutes == 90
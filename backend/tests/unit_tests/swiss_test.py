@@ -1,7 +1,21 @@
+import random
+from collections import defaultdict
 from decimal import Decimal
+from itertools import combinations
 
-from bracket.logic.scheduling.ladder_teams import get_possible_upcoming_matches_for_swiss
-from bracket.models.db.match import Match, MatchFilter, MatchWithDetailsDefinitive, SuggestedMatch
+from bracket.logic.scheduling.ladder_teams import (
+    SwissCandidate,
+    get_candidates_for_swiss,
+    get_possible_upcoming_matches_for_swiss,
+)
+from bracket.models.db.match import (
+    Match,
+    MatchFilter,
+    MatchWithDetailsDefinitive,
+    SuggestedMatch,
+    SwissPairingMode,
+    get_match_hash,
+)
 from bracket.models.db.stage_item_inputs import (
     StageItemInput,
     StageItemInputFinal,
@@ -107,3 +121,119 @@ def test_constraints() -> None:
             player_behind_schedule_count=0,
         ),
     ]
+
+
+def test_max_weight_matching_pairs_whole_round() -> None:
+    stage_item_input_dummy = StageItemInputFinal(
+        id=StageItemInputId(-1),
+        tournament_id=TournamentId(-1),
+        team_id=TeamId(-1),
+        slot=0,
+        team=Team(**DUMMY_TEAM1.model_dump(), id=TeamId(-1)),
+    )
+    inputs: list[StageItemInput] = [
+        stage_item_input_dummy.model_copy(update={"id": -i, "points": Decimal(points)})
+        for i, points in enumerate(["0", "10", "20", "100", "110", "200"], start=1)
+    ]
+    match_filter = MATCH_FILTER.model_copy(
+        update={"elo_diff_threshold": 200, "pairing_mode": SwissPairingMode.MAX_WEIGHT_MATCHING}
+    )
+    result = get_possible_upcoming_matches_for_swiss(match_filter, [], inputs)
+
+    # Greedily pairing the closest inputs would result in 0-10, 100-110 and 20-200.
+    assert [(match.stage_item_input1.id, match.stage_item_input2.id) for match in result] == [
+        (-2, -1),
+        (-4, -3),
+        (-6, -5),
+    ]
+    assert all(match.is_recommended for match in result)
+
+
+def get_input(input_id: int, points: str) -> StageItemInputFinal:
+    return StageItemInputFinal(
+        id=StageItemInputId(input_id),
+        tournament_id=TournamentId(-1),
+        team_id=TeamId(-1),
+        slot=0,
+        points=Decimal(points),
+        team=Team(**DUMMY_TEAM1.model_dump(), id=TeamId(-1)),
+    )
+
+
+def get_candidate_pairs(candidates: list[SwissCandidate]) -> set[tuple[int, int]]:
+    return {
+        (candidate.stage_item_input1.id, candidate.stage_item_input2.id) for candidate in candidates
+    }
+
+
+def get_played_hashes(played_pairs: list[tuple[int, int]]) -> frozenset[str]:
+    return frozenset(
+        get_match_hash(StageItemInputId(id1), StageItemInputId(id2))
+        for pair in played_pairs
+        for id1, id2 in (pair, pair[::-1])
+    )
+
+
+def test_candidates_for_swiss_window_bounds() -> None:
+    inputs: list[StageItemInput] = [
+        get_input(4, "101"),
+        get_input(1, "0"),
+        get_input(3, "100"),
+        get_input(2, "50"),
+    ]
+    candidates = get_candidates_for_swiss(inputs, frozenset(), defaultdict(int), 50)
+
+    # A difference of exactly the threshold is included, 0-100 and 50-101 are outside the window.
+    assert get_candidate_pairs(candidates) == {(1, 2), (2, 3), (3, 4)}
+    assert sorted(candidate.elo_diff for candidate in candidates) == [1.0, 50.0, 50.0]
+
+
+def test_candidates_for_swiss_skip_played_pairs() -> None:
+    inputs: list[StageItemInput] = [get_input(1, "0"), get_input(2, "10"), get_input(3, "20")]
+    previous_match_input_hashes = get_played_hashes([(1, 2)])
+    times_played_per_input = defaultdict(int, {1: 1, 2: 1})
+
+    candidates = get_candidates_for_swiss(
+        inputs, previous_match_input_hashes, times_played_per_input, 100
+    )
+
+    assert get_candidate_pairs(candidates) == {(1, 3), (2, 3)}
+    assert {candidate.times_played_sum for candidate in candidates} == {1}
+
+
+def test_candidates_for_swiss_match_exhaustive_search() -> None:
+    rng = random.Random(42)
+    inputs: list[StageItemInput] = [
+        get_input(input_id, str(rng.randrange(0, 300))) for input_id in range(1, 13)
+    ]
+    played_pairs = rng.sample(list(combinations(range(1, 13), 2)), 10)
+    previous_match_input_hashes = get_played_hashes(played_pairs)
+    times_played_per_input = defaultdict(int, {id_: rng.randrange(0, 3) for id_ in range(1, 13)})
+    elo_diff_threshold = 75
+
+    expected = [
+        SwissCandidate(
+            times_played_per_input[input1.id] + times_played_per_input[input2.id],
+            abs(float(input1.elo - input2.elo)),
+            input1,
+            input2,
+        )
+        for input1, input2 in combinations(sorted(inputs, key=lambda input_: input_.id), 2)
+        if abs(input1.elo - input2.elo) <= elo_diff_threshold
+        and get_match_hash(input1.id, input2.id) not in previous_match_input_hashes
+    ]
+    candidates = get_candidates_for_swiss(
+        inputs, previous_match_input_hashes, times_played_per_input, elo_diff_threshold
+    )
+
+    assert get_candidate_pairs(candidates) == get_candidate_pairs(expected)
+
+    def sort_key(candidate: SwissCandidate) -> tuple[int, float, int, int]:
+        return (
+            candidate.times_played_sum,
+            candidate.elo_diff,
+            candidate.stage_item_input1.id,
+            candidate.stage_item_input2.id,
+        )
+
+    assert min(candidates, key=sort_key) == min(expected, key=sort_key)